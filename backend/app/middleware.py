@@ -0,0 +1,121 @@
+"""
+Middleware profiling the SQL, serialization and rendering of each request.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """Query count and seconds spent in each stage of a request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {}
+        self.render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper timing every query run by the request."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def timed(self, name, func):
+        """
+        Wrap `func` to add its duration to the `name` stage, less the SQL
+        it runs, which is already counted as `db`.
+        """
+        def wrapper(*args, **kwargs):
+            started, db_time = time.perf_counter(), self.db_time
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - started
+                         - (self.db_time - db_time))
+        return wrapper
+
+    def start_render(self):
+        self.render_started = (time.perf_counter(), self.db_time)
+
+    def end_render(self):
+        if self.render_started is not None:
+            started, db_time = self.render_started
+            self.add('render', time.perf_counter() - started
+                     - (self.db_time - db_time))
+            self.render_started = None
+
+    def get_metrics(self):
+        """Milliseconds of each stage, in the order they happen."""
+        seconds = {
+            'db': self.db_time,
+            **self.timings,
+            'total': time.perf_counter() - self.started,
+        }
+        return {
+            name: round(value * 1000, 2) for name, value in seconds.items()
+        }
+
+
+class ProfilingMiddleware:
+    """
+    With PROFILING_ENABLED, time every query through
+    connection.execute_wrapper, the serializers of the viewsets (see
+    SerializerProfilingMixin) and the rendering of the response, and send
+    them in a Server-Timing header:
+
+        Server-Timing: db;dur=8.1;desc="6 queries", serialize;dur=3.2,
+        render;dur=0.9, total;dur=14.7
+
+    A PROFILING_SAMPLE_RATE share of the requests is also logged as one
+    JSON line. Disabled, requests go straight through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+
+        profile = request.profile = RequestProfile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        profile.end_render()
+
+        metrics = profile.get_metrics()
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration}'
+            + (f';desc="{profile.queries} queries"' if name == 'db' else '')
+            for name, duration in metrics.items())
+        if random.random() < settings.PROFILING_SAMPLE_RATE:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': profile.queries,
+                **{f'{name}_ms': value for name, value in metrics.items()},
+            }))
+        return response
+
+    def process_template_response(self, request, response):
+        # The last hook before the response (a DRF Response) is rendered.
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            profile.start_render()
+        return response
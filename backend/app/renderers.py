@@ -0,0 +1,63 @@
+"""
+JSON renderer and parser backed by orjson.
+
+orjson is optional: without it both classes behave exactly like the DRF
+JSONRenderer and JSONParser they extend.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Render with orjson producing the same bytes as JSONRenderer: compact,
+    UTF-8, and every value orjson does not encode the same way (dates and
+    times, Decimal, lazy strings, querysets...) goes through the DRF
+    encoder. Indented output (the browsable API) and the ASCII or non
+    compact settings keep the stdlib encoder.
+    """
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii
+                or not self.compact or self.get_indent(
+                    accepted_media_type or '', renderer_context or {})):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=JSONEncoder().default, option=self.options)
+        except (orjson.JSONEncodeError, TypeError):
+            # Values orjson rejects (integers over 64 bits, keys of other
+            # types) are left to the stdlib encoder.
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        # Same escaping of the line and paragraph separators as DRF.
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(
+            PARAGRAPH_SEPARATOR, b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    """Parse JSON request bodies with orjson."""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -234,8 +235,12 @@ REST_FRAMEWORK = {
         'user.auth.cookie_jwt.CookieJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'app.renderers.ORJSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
@@ -252,6 +257,35 @@ SIMPLE_JWT = {
 
 COOKIE_DOMAIN = os.environ.get("COOKIE_DOMAIN", "")
 
+# Seconds a sync token is moved back, so the rows committed by requests
+# still running when a list was read come again in the next sync.
+SYNC_TOKEN_OVERLAP_SECONDS = int(
+    os.environ.get("SYNC_TOKEN_OVERLAP_SECONDS", 300))
+
+# Days prune_deleted_records keeps the tombstones of deleted rows; older
+# sync tokens are rejected and the client starts a full sync.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get("SYNC_TOMBSTONE_RETENTION_DAYS", 90))
+
+# The reference data version is read from the database, so a cache per
+# worker stays correct; a shared one (memcached, database...) saves each
+# worker building the payloads and counting the list totals again.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Per-request query count, SQL, serializer and render times sent as
+# Server-Timing headers; PROFILING_SAMPLE_RATE of the requests (0 to 1)
+# is also logged to app.middleware.
+PROFILING_ENABLED = os.environ.get(
+    "PROFILING_ENABLED", "False").lower() in ("true", "1", "yes")
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get("PROFILING_SAMPLE_RATE", 0.01))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Decorestilo API",
     "VERSION": "1.0.0",
@@ -294,6 +328,12 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        # Muestras del perfilado de requests
+        'app.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         # Queries SQL
         'django.db.backends': {
             'handlers': ['console'],
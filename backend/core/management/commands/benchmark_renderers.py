@@ -0,0 +1,64 @@
+"""
+Django command to benchmark the JSON renderers of the API.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from app.renderers import ORJSONRenderer, orjson
+from sale.views import CatalogView, SaleViewSet
+
+
+class Command(BaseCommand):
+    """
+    Render the catalog and a page of the sale list with the DRF
+    JSONRenderer and with ORJSONRenderer, report the time of each one and
+    check both produce the same bytes.
+    """
+    help = 'Benchmark the JSON renderers over catalog and sale payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--limit', type=int, default=100)
+
+    def handle(self, *args, **options):
+        """Entry point for command."""
+        if orjson is None:
+            raise CommandError('orjson no está instalado.')
+
+        payloads = {
+            'catalogo': self._get_data(CatalogView.as_view(), {}),
+            'ventas': self._get_data(
+                SaleViewSet.as_view({'get': 'list'}),
+                {'limit': options['limit']}),
+        }
+        iterations = options['iterations']
+        for name, data in payloads.items():
+            expected = JSONRenderer().render(data)
+            actual = ORJSONRenderer().render(data)
+            stdlib = self._time(JSONRenderer(), data, iterations)
+            fast = self._time(ORJSONRenderer(), data, iterations)
+            self.stdout.write(
+                f"{name}: {len(expected)} bytes, json {stdlib * 1000:.2f}ms, "
+                f"orjson {fast * 1000:.2f}ms, {stdlib / fast:.1f}x")
+            if actual == expected:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{name}: salida idéntica"))
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f"{name}: la salida es distinta"))
+
+    def _get_data(self, view, params):
+        request = APIRequestFactory().get('/', params)
+        force_authenticate(request, user=get_user_model()(is_superuser=True))
+        return view(request).data
+
+    def _time(self, renderer, data, iterations):
+        """Average seconds to render the payload."""
+        started = time.perf_counter()
+        for _ in range(iterations):
+            renderer.render(data)
+        return (time.perf_counter() - started) / iterations
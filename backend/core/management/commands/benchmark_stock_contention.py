@@ -0,0 +1,134 @@
+"""
+Django command to benchmark concurrent updates of product stocks.
+"""
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from core.models import (
+    Batch, Category, MeasureUnit, Product, ProductStock, Warehouse,
+)
+from sale.services.stock_version_service import OptimisticStockUpdateService
+
+
+class Command(BaseCommand):
+    """
+    Run many concurrent writers incrementing the same product stocks of a
+    throwaway test database and report throughput, retries and lost
+    updates.
+    """
+    help = (
+        'Benchmark concurrent product stock updates with optimistic '
+        'concurrency control (PostgreSQL only).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=50)
+        parser.add_argument('--increments', type=int, default=20)
+        parser.add_argument('--rows', type=int, default=1)
+        parser.add_argument(
+            '--max-retries', type=int,
+            default=OptimisticStockUpdateService.MAX_RETRIES)
+
+    def handle(self, *args, **options):
+        """Entry point for command."""
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                'El benchmark de concurrencia requiere PostgreSQL.')
+
+        # The writers use their own connections, so the rows cannot be
+        # kept in a transaction rolled back at the end: run against a
+        # throwaway test database instead of the configured one.
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True)
+        try:
+            self._benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _benchmark(self, options):
+        writers = options['writers']
+        increments = options['increments']
+        max_retries = options['max_retries']
+        product_stocks = self._create_product_stocks(options['rows'])
+        results = {'retries': 0, 'failures': 0, 'succeeded': 0}
+        lock = threading.Lock()
+
+        def writer(index):
+            product_stock = product_stocks[index % len(product_stocks)]
+            retries = failures = succeeded = 0
+            try:
+                for _ in range(increments):
+                    service = OptimisticStockUpdateService(
+                        product_stock.id, max_retries=max_retries)
+                    try:
+                        service.increment(stock=1, available_stock=1)
+                        succeeded += 1
+                    except ValidationError:
+                        failures += 1
+                    retries += service.attempts - 1
+            finally:
+                connections.close_all()
+            with lock:
+                results['retries'] += retries
+                results['failures'] += failures
+                results['succeeded'] += succeeded
+
+        threads = [
+            threading.Thread(target=writer, args=(index,))
+            for index in range(writers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        actual = sum(
+            ProductStock.objects.filter(
+                id__in=[stock.id for stock in product_stocks],
+            ).values_list('stock', flat=True)
+        )
+        expected = Decimal(results['succeeded'])
+
+        self.stdout.write(
+            f"Escritores: {writers}, incrementos por escritor: "
+            f"{increments}, filas: {len(product_stocks)}")
+        self.stdout.write(
+            f"Tiempo: {elapsed:.2f}s, "
+            f"{results['succeeded'] / elapsed:.1f} actualizaciones/s")
+        self.stdout.write(
+            f"Reintentos: {results['retries']}, "
+            f"fallidos: {results['failures']}")
+        lost = expected - actual
+        style = self.style.SUCCESS if lost == 0 else self.style.ERROR
+        self.stdout.write(style(
+            f"Esperado: {expected}, actual: {actual}, "
+            f"actualizaciones perdidas: {lost}"))
+
+    def _create_product_stocks(self, rows):
+        suffix = uuid.uuid4().hex[:8]
+        product = Product.objects.create(
+            name=f'Benchmark {suffix}',
+            code=f'BENCH-{suffix}',
+            category=Category.objects.create(name=f'Benchmark {suffix}'),
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=1,
+            maximum_sale_price=1,
+        )
+        warehouse = Warehouse.objects.create(
+            name=f'Benchmark {suffix}', location='Benchmark')
+        return [
+            ProductStock.objects.create(
+                product=product,
+                warehouse=warehouse,
+                batch=Batch.objects.create(name=f'Benchmark {suffix} {row}'),
+                maximum_stock=10 ** 9,
+            )
+            for row in range(rows)
+        ]
@@ -0,0 +1,17 @@
+"""
+Django command to delete the old tombstones of the delta sync.
+"""
+from django.core.management.base import BaseCommand
+
+from sale.services.sync_service import SyncService
+
+
+class Command(BaseCommand):
+    """Delete the tombstones past their retention."""
+    help = 'Delete the old tombstones of the delta sync.'
+
+    def handle(self, *args, **options):
+        """Entry point for command."""
+        pruned = SyncService.prune()
+        self.stdout.write(self.style.SUCCESS(
+            f"Registros de eliminación depurados: {pruned}"))
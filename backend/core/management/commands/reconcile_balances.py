@@ -0,0 +1,54 @@
+"""
+Django command to check the balances of sales and purchases.
+"""
+from django.core.management.base import BaseCommand
+
+from sale.services.balance_reconciliation_service import (
+    BalanceReconciliationService,
+)
+
+TRANSACTION_NAMES = {
+    'venta': 'Ventas',
+    'compra': 'Compras',
+}
+
+
+class Command(BaseCommand):
+    """
+    Report the sales and purchases whose balance does not match their
+    payments and optionally repair them.
+    """
+    help = 'Reconcile the balances of sales and purchases with payments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair', action='store_true',
+            help='Overwrite the drifted balances with the expected ones.')
+        parser.add_argument(
+            '--limit', type=int, default=50,
+            help='Drifted transactions listed per transaction type.')
+
+    def handle(self, *args, **options):
+        """Entry point for command."""
+        service = BalanceReconciliationService()
+        report = service.report(options['limit'])
+        for transaction_type, drift in report.items():
+            name = TRANSACTION_NAMES[transaction_type]
+            style = (
+                self.style.SUCCESS if not drift['total']
+                else self.style.WARNING)
+            self.stdout.write(style(
+                f"{name} con diferencias: {drift['total']}"))
+            for row in drift['rows']:
+                self.stdout.write(
+                    f"  {row['id']}: saldo {row['balance_due']} "
+                    f"(esperado {row['expected_balance_due']}), pagado "
+                    f"{row['amount_paid']} "
+                    f"(esperado {row['expected_amount_paid']})")
+
+        if options['repair']:
+            repaired = service.repair()
+            for transaction_type, count in repaired.items():
+                self.stdout.write(self.style.SUCCESS(
+                    f"{TRANSACTION_NAMES[transaction_type]} reparadas: "
+                    f"{count}"))
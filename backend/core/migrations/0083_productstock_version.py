@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0082_move_batch_to_productstock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productstock',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:02
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+def repair_product_stocks(apps, schema_editor):
+    """Bring existing rows in line with the new check constraints."""
+    ProductStock = apps.get_model('core', 'ProductStock')
+    F = models.F
+
+    for field in ('stock', 'reserved_stock', 'damaged_stock'):
+        ProductStock.objects.filter(**{f'{field}__lt': 0}).update(
+            **{field: 0})
+    ProductStock.objects.filter(
+        minimum_stock__gt=F('maximum_stock')).update(
+            maximum_stock=F('minimum_stock'))
+    ProductStock.objects.filter(damaged_stock__gt=F('stock')).update(
+        damaged_stock=F('stock'))
+    ProductStock.objects.filter(
+        reserved_stock__gt=F('stock') - F('damaged_stock')).update(
+            reserved_stock=F('stock') - F('damaged_stock'))
+    ProductStock.objects.exclude(
+        available_stock=(
+            F('stock') - F('reserved_stock') - F('damaged_stock'))).update(
+                available_stock=(
+                    F('stock') - F('reserved_stock') - F('damaged_stock')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0083_productstock_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            repair_product_stocks,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='productstock',
+            constraint=models.CheckConstraint(check=models.Q(('stock__gte', 0)), name='productstock_stock_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='productstock',
+            constraint=models.CheckConstraint(check=models.Q(('reserved_stock__gte', 0)), name='productstock_reserved_stock_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='productstock',
+            constraint=models.CheckConstraint(check=models.Q(('available_stock__gte', 0)), name='productstock_available_stock_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='productstock',
+            constraint=models.CheckConstraint(check=models.Q(('damaged_stock__gte', 0)), name='productstock_damaged_stock_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='productstock',
+            constraint=models.CheckConstraint(check=models.Q(('available_stock', django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.F('stock'), '-', django.db.models.expressions.F('reserved_stock')), '-', django.db.models.expressions.F('damaged_stock')))), name='productstock_available_stock_balance'),
+        ),
+        migrations.AddConstraint(
+            model_name='productstock',
+            constraint=models.CheckConstraint(check=models.Q(('minimum_stock__lte', django.db.models.expressions.F('maximum_stock'))), name='productstock_minimum_lte_maximum'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0084_productstock_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendiente', 'Pendiente'), ('aplicado', 'Aplicado')], default='pendiente', max_length=20)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('note', models.CharField(blank=True, max_length=300)),
+                ('applied_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('applied_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='applied_inventory_counts', to=settings.AUTH_USER_MODEL)),
+                ('counted_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='inventory_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InventoryCountLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('counted_quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('system_quantity', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('variance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.batch')),
+                ('inventory_count', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='core.inventorycount')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.product')),
+                ('product_stock', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='core.productstock')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.warehouse')),
+            ],
+            options={
+                'unique_together': {('inventory_count', 'warehouse', 'product', 'batch')},
+            },
+        ),
+    ]
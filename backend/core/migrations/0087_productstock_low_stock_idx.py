@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:10
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0086_transfer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productstock',
+            index=models.Index(condition=models.Q(('available_stock__lt', django.db.models.expressions.F('minimum_stock'))), fields=['warehouse', 'product'], name='productstock_low_stock_idx'),
+        ),
+    ]
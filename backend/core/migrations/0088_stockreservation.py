@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_open_reservations(apps, schema_editor):
+    """Record the stock already reserved by the sales not dispatched."""
+    SaleItem = apps.get_model('core', 'SaleItem')
+    StockReservation = apps.get_model('core', 'StockReservation')
+    items = SaleItem.objects.filter(
+        sale__status='realizado',
+        quantity__gt=models.F('dispatched_stock'),
+    ).only('id', 'sale_id', 'product_stock_id', 'quantity')
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            sale_id=item.sale_id,
+            sale_item_id=item.id,
+            product_stock_id=item.product_stock_id,
+            quantity=item.quantity,
+        )
+        for item in items.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0087_productstock_low_stock_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('activa', 'Activa'), ('liberada', 'Liberada'), ('vencida', 'Vencida')], default='activa', max_length=20)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product_stock', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservations', to='core.productstock')),
+                ('sale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='core.sale')),
+                ('sale_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='core.saleitem')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='stockreservation',
+            index=models.Index(condition=models.Q(('status', 'activa')), fields=['expires_at'], name='reservation_active_expiry_idx'),
+        ),
+        migrations.RunPython(
+            create_open_reservations,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0088_stockreservation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['transaction_type', 'transaction_id'], name='payment_transaction_idx'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+PAYMENT_METHOD_BITS = {'efectivo': 1, 'tarjeta': 2, 'qr': 4}
+
+
+def fill_payment_summaries(apps, schema_editor):
+    """Compute the payment summary of the existing sales and purchases."""
+    Payment = apps.get_model('core', 'Payment')
+    models_by_type = {
+        'venta': apps.get_model('core', 'Sale'),
+        'compra': apps.get_model('core', 'Purchase'),
+    }
+    summaries = {}
+    for row in Payment.objects.values(
+            'transaction_type', 'transaction_id', 'payment_method').annotate(
+                total=models.Sum('amount'),
+                count=models.Count('id'),
+                last_date=models.Max('payment_date')):
+        key = (row['transaction_type'], row['transaction_id'])
+        summary = summaries.setdefault(key, {
+            'amount_paid': 0,
+            'payment_count': 0,
+            'last_payment_date': None,
+            'payment_methods': 0,
+        })
+        summary['amount_paid'] += row['total']
+        summary['payment_count'] += row['count']
+        if (summary['last_payment_date'] is None
+                or row['last_date'] > summary['last_payment_date']):
+            summary['last_payment_date'] = row['last_date']
+        summary['payment_methods'] |= PAYMENT_METHOD_BITS.get(
+            row['payment_method'], 0)
+
+    for transaction_type, model in models_by_type.items():
+        ids = [
+            transaction_id for (kind, transaction_id) in summaries
+            if kind == transaction_type
+        ]
+        transactions = list(model.objects.filter(id__in=ids))
+        for transaction in transactions:
+            for field, value in summaries[
+                    (transaction_type, transaction.id)].items():
+                setattr(transaction, field, value)
+        model.objects.bulk_update(transactions, [
+            'amount_paid', 'payment_count', 'last_payment_date',
+            'payment_methods',
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0089_payment_transaction_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='last_payment_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='payment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='payment_methods',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='last_payment_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='payment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='payment_methods',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            fill_payment_summaries,
+            migrations.RunPython.noop,
+        ),
+    ]
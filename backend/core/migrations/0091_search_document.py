@@ -0,0 +1,98 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:49
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+
+SEARCH_DOCUMENTS = {
+    'Sale': (
+        'id', 'client__name', 'selling_channel__name', 'seller__first_name',
+        'seller__last_name', 'pre_invoice_number', 'invoice_number',
+    ),
+    'Entry': (
+        'id', 'invoice_number', 'warehouse_keeper__first_name',
+        'warehouse_keeper__last_name', 'supplier__name',
+    ),
+    'Output': (
+        'id', 'warehouse_keeper__first_name', 'warehouse_keeper__last_name',
+        'client__name',
+    ),
+    'Purchase': (
+        'id', 'buyer__first_name', 'buyer__last_name', 'supplier__name',
+        'invoice_number',
+    ),
+    'Client': ('id', 'name', 'phone', 'email', 'nit'),
+}
+
+
+def fill_search_documents(apps, schema_editor):
+    """Build the search document of the existing rows."""
+    for model_name, paths in SEARCH_DOCUMENTS.items():
+        model = apps.get_model('core', model_name)
+        parts = []
+        for path in paths:
+            if parts:
+                parts.append(Value(' '))
+            parts.append(Coalesce(Cast(path, TextField()), Value('')))
+        document = model.objects.filter(pk=OuterRef('pk')).annotate(
+            document=Concat(*parts, output_field=TextField()),
+        ).values('document')[:1]
+        model.objects.update(search_document=Subquery(document))
+
+
+def create_search_indexes(apps, schema_editor):
+    """GIN index over the tsvector of the documents, PostgreSQL only."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in SEARCH_DOCUMENTS:
+        table = apps.get_model('core', model_name)._meta.db_table
+        schema_editor.execute(
+            f'CREATE INDEX "{table}_search_idx" ON "{table}" USING gin '
+            f"(to_tsvector('spanish'::regconfig, "
+            f"COALESCE(\"search_document\", '')))")
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in SEARCH_DOCUMENTS:
+        table = apps.get_model('core', model_name)._meta.db_table
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{table}_search_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0090_payment_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(
+            fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
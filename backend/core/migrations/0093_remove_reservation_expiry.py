@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0092_delta_sync'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='stockreservation',
+            name='reservation_active_expiry_idx',
+        ),
+        migrations.RemoveField(
+            model_name='stockreservation',
+            name='expires_at',
+        ),
+        migrations.AlterField(
+            model_name='stockreservation',
+            name='status',
+            field=models.CharField(choices=[('activa', 'Activa'), ('liberada', 'Liberada')], default='activa', max_length=20),
+        ),
+    ]
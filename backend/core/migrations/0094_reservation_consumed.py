@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0093_remove_reservation_expiry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stockreservation',
+            name='status',
+            field=models.CharField(choices=[('activa', 'Activa'), ('liberada', 'Liberada'), ('consumida', 'Consumida')], default='activa', max_length=20),
+        ),
+    ]
@@ -87,7 +87,7 @@ class Agency(models.Model):
         choices=CITY_CHOICES,
         default='Potosi')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.name}"
@@ -164,7 +164,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(auto_now_add=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = UserManager()
 
@@ -201,7 +201,7 @@ class Setting(models.Model):
         blank=False,
         default='')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -261,7 +261,8 @@ class Client(models.Model):
         choices=CLIENT_TYPE_CHOICES,
         default='showroom')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     def __str__(self):
         return self.name
@@ -299,7 +300,7 @@ class Warehouse(models.Model):
         ]
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Category(models.Model):
@@ -319,7 +320,7 @@ class Category(models.Model):
         ]
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -341,7 +342,7 @@ class Batch(models.Model):
         ]
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -350,7 +351,7 @@ class Batch(models.Model):
 class MeasureUnit(models.Model):
     name = models.CharField(max_length=50)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -399,7 +400,7 @@ class Product(models.Model):
     maximum_sale_price = models.DecimalField(
         max_digits=10, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ('code', 'name')
@@ -462,9 +463,41 @@ class ProductStock(models.Model):
         max_digits=10, decimal_places=2, default=0)
     maximum_stock = models.DecimalField(
         max_digits=10, decimal_places=2, default=0)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("product", "warehouse", "batch")
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(stock__gte=0),
+                name='productstock_stock_non_negative'),
+            models.CheckConstraint(
+                check=models.Q(reserved_stock__gte=0),
+                name='productstock_reserved_stock_non_negative'),
+            models.CheckConstraint(
+                check=models.Q(available_stock__gte=0),
+                name='productstock_available_stock_non_negative'),
+            models.CheckConstraint(
+                check=models.Q(damaged_stock__gte=0),
+                name='productstock_damaged_stock_non_negative'),
+            models.CheckConstraint(
+                check=models.Q(available_stock=(
+                    models.F('stock') - models.F('reserved_stock')
+                    - models.F('damaged_stock'))),
+                name='productstock_available_stock_balance'),
+            models.CheckConstraint(
+                check=models.Q(minimum_stock__lte=models.F('maximum_stock')),
+                name='productstock_minimum_lte_maximum'),
+        ]
+        indexes = [
+            # Partial index: only the rows below their reorder point.
+            models.Index(
+                fields=['warehouse', 'product'],
+                condition=models.Q(
+                    available_stock__lt=models.F('minimum_stock')),
+                name='productstock_low_stock_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if self.minimum_stock > self.maximum_stock:
@@ -519,7 +552,7 @@ class Supplier(models.Model):
         blank=True)
     address = models.CharField(max_length=150, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -532,7 +565,7 @@ class SellingChannel(models.Model):
         through='ProductChannelPrice')
     name = models.CharField(max_length=50)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -547,9 +580,37 @@ class ProductChannelPrice(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     start_date = models.DateField(null=True, blank=True)
     end_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+
+# Bits of the payment methods stored in PaymentSummary.payment_methods.
+PAYMENT_METHOD_BITS = {
+    'efectivo': 1,
+    'tarjeta': 2,
+    'qr': 4,
+}
+
+
+class PaymentSummary(models.Model):
+    """Running totals of the payments made to a sale or purchase."""
+    amount_paid = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0)
+    payment_count = models.PositiveIntegerField(default=0)
+    last_payment_date = models.DateField(null=True, blank=True)
+    payment_methods = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def get_payment_methods(self):
+        """Return the payment methods used, decoded from the bitmap."""
+        return [
+            method for method, bit in PAYMENT_METHOD_BITS.items()
+            if self.payment_methods & bit
+        ]
 
 
-class Purchase(models.Model):
+class Purchase(PaymentSummary):
     STATUS_CHOICES = (
         ('realizado', 'Realizada'),
         ('terminado', 'Terminada'),
@@ -588,7 +649,8 @@ class Purchase(models.Model):
     total = models.DecimalField(max_digits=10, decimal_places=2)
     balance_due = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     class Meta:
         unique_together = ('supplier', 'invoice_number')
@@ -630,7 +692,8 @@ class PurchaseItem(models.Model):
             purchase.status = 'terminado'
             purchase.purchase_end_date = date.today()
 
-        purchase.save(update_fields=['status', 'purchase_end_date'])
+        purchase.save(
+            update_fields=['status', 'purchase_end_date', 'updated_at'])
 
     def get_remaining_quantity(self):
         return self.quantity - self.entered_stock
@@ -659,7 +722,8 @@ class Entry(models.Model):
     )
     note = models.CharField(max_length=300, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     def __str__(self):
         return f"{self.supplier.name} - {self.entry_date}"
@@ -697,7 +761,8 @@ class Output(models.Model):
     output_date = models.DateField()
     note = models.CharField(max_length=300, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     def __str__(self):
         return f"{self.client.name} - {self.output_date}"
@@ -721,7 +786,7 @@ class OutputItem(models.Model):
         return f"{self.product.name} - {self.quantity}"
 
 
-class Sale(models.Model):
+class Sale(PaymentSummary):
     STATUS_CHOICES = (
         ('proforma', 'Proforma'),
         ('realizado', 'Realizada'),
@@ -767,7 +832,8 @@ class Sale(models.Model):
     sale_done_date = models.DateField(null=True, blank=True)
     observation = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     def __str__(self):
         return (
@@ -817,7 +883,7 @@ class SaleItem(models.Model):
             sale.status = 'terminado'
             sale.sale_done_date = date.today()
 
-        sale.save(update_fields=['status', 'sale_done_date'])
+        sale.save(update_fields=['status', 'sale_done_date', 'updated_at'])
 
     def get_remaining_quantity(self):
         return self.quantity - self.dispatched_stock
@@ -853,7 +919,158 @@ class Payment(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     payment_date = models.DateField(null=False, blank=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Payments are always looked up by their sale or purchase.
+            models.Index(
+                fields=['transaction_type', 'transaction_id'],
+                name='payment_transaction_idx'),
+        ]
 
     def __str__(self):
         return f"{self.payment_method}"
+
+
+class InventoryCount(models.Model):
+    STATUS_CHOICES = (
+        ('pendiente', 'Pendiente'),
+        ('aplicado', 'Aplicado'),
+    )
+    counted_by = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='inventory_counts')
+    applied_by = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+        related_name='applied_inventory_counts')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pendiente')
+    file_name = models.CharField(max_length=255, blank=True)
+    note = models.CharField(max_length=300, blank=True)
+    applied_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Conteo {self.id} - {self.status}"
+
+
+class InventoryCountLine(models.Model):
+    """Staging row with the counted quantity of a product stock."""
+    inventory_count = models.ForeignKey(
+        InventoryCount,
+        on_delete=models.CASCADE,
+        related_name='lines')
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT)
+    product = models.ForeignKey(Product, on_delete=models.PROTECT)
+    batch = models.ForeignKey(Batch, on_delete=models.PROTECT)
+    product_stock = models.ForeignKey(
+        ProductStock,
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True)
+    counted_quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    system_quantity = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0)
+    variance = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("inventory_count", "warehouse", "product", "batch")
+
+    def __str__(self):
+        return f"{self.product.name} - {self.counted_quantity}"
+
+
+class Transfer(models.Model):
+    source_warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='outgoing_transfers')
+    destination_warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='incoming_transfers')
+    user = models.ForeignKey(User, on_delete=models.PROTECT)
+    transfer_date = models.DateField()
+    note = models.CharField(max_length=300, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return (f"{self.source_warehouse.name} - "
+                f"{self.destination_warehouse.name} - {self.transfer_date}")
+
+
+class TransferItem(models.Model):
+    """Movement of a quantity from a product stock to another warehouse."""
+    transfer = models.ForeignKey(
+        Transfer,
+        on_delete=models.PROTECT,
+        related_name='transfer_items')
+    product_stock = models.ForeignKey(
+        ProductStock,
+        on_delete=models.PROTECT,
+        related_name='outgoing_transfer_items')
+    destination_product_stock = models.ForeignKey(
+        ProductStock,
+        on_delete=models.PROTECT,
+        related_name='incoming_transfer_items')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.product_stock.product.name} - {self.quantity}"
+
+
+class StockReservation(models.Model):
+    """Stock of a product stock reserved by a sale item."""
+    STATUS_CHOICES = (
+        ('activa', 'Activa'),
+        ('liberada', 'Liberada'),
+        ('consumida', 'Consumida'),
+    )
+    sale = models.ForeignKey(
+        'Sale',
+        on_delete=models.CASCADE,
+        related_name='reservations')
+    sale_item = models.ForeignKey(
+        'SaleItem',
+        on_delete=models.CASCADE,
+        related_name='reservations')
+    product_stock = models.ForeignKey(
+        ProductStock,
+        on_delete=models.PROTECT,
+        related_name='reservations')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='activa')
+    released_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sale_id} - {self.product_stock_id} - {self.quantity}"
+
+
+class DeletedRecord(models.Model):
+    """Tombstone of a deleted row, read by the delta sync of the lists."""
+    model = models.CharField(max_length=50)
+    object_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['model', 'deleted_at'],
+                name='deletedrecord_model_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} - {self.object_id}"
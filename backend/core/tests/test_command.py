@@ -1,13 +1,15 @@
 """
 Test custom Django management command
 """
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -32,3 +34,28 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class BenchmarkStockContentionTests(SimpleTestCase):
+    """Test the stock contention benchmark command."""
+
+    @patch('core.management.commands.benchmark_stock_contention.connection')
+    def test_requires_postgresql(self, patched_connection):
+        """Test the benchmark refuses to run on other databases."""
+        patched_connection.vendor = 'sqlite'
+
+        with self.assertRaises(CommandError):
+            call_command('benchmark_stock_contention')
+
+
+class BenchmarkRenderersTests(TestCase):
+    """Test the JSON renderers benchmark command."""
+
+    def test_benchmark_renderers(self):
+        """Test the benchmark reports identical output for both payloads."""
+        out = StringIO()
+
+        call_command('benchmark_renderers', iterations=1, stdout=out)
+
+        self.assertIn('catalogo: salida idéntica', out.getvalue())
+        self.assertIn('ventas: salida idéntica', out.getvalue())
@@ -0,0 +1,96 @@
+"""
+Tests for the request profiling middleware.
+"""
+import json
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Category
+
+CATEGORY_URL = reverse('sale:category-list')
+
+
+def create_user(**params):
+    """Create and return a sample User."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'email': f'test{unique_suffix}@example.com',
+        'ci': f'123{unique_suffix}',
+        'phone': f'7{unique_suffix}',
+        'password': 'testpass123',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def parse_server_timing(header):
+    """Return {metric: (duration, description)} of a Server-Timing."""
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        values = dict(param.split('=', 1) for param in params)
+        metrics[name] = (float(values['dur']), values.get('desc'))
+    return metrics
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Test the Server-Timing header and the sampled log line."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user())
+        Category.objects.create(name='Categoria')
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled(self):
+        """Test nothing is added while profiling is disabled."""
+        res = self.client.get(CATEGORY_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0)
+    def test_server_timing(self):
+        """Test every stage of a list request is reported."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(CATEGORY_URL, {'with_total': 'true'})
+
+        metrics = parse_server_timing(res['Server-Timing'])
+        self.assertEqual(
+            list(metrics), ['db', 'serialize', 'render', 'total'])
+        self.assertEqual(metrics['db'][1], f'"{len(queries)} queries"')
+        for duration, _ in metrics.values():
+            self.assertGreaterEqual(duration, 0)
+        self.assertLessEqual(metrics['db'][0], metrics['total'][0])
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1)
+    def test_sampled_log_line(self):
+        """Test sampled requests are logged as one JSON line."""
+        with self.assertLogs('app.middleware', 'INFO') as logs:
+            self.client.get(CATEGORY_URL)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['method'], 'GET')
+        self.assertEqual(line['path'], CATEGORY_URL)
+        self.assertEqual(line['status'], 200)
+        self.assertEqual(
+            set(line), {
+                'method', 'path', 'status', 'queries', 'db_ms',
+                'serialize_ms', 'render_ms', 'total_ms',
+            })
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        """Test requests out of the sample are not logged."""
+        with patch('app.middleware.logger') as logger:
+            self.client.get(CATEGORY_URL)
+
+        logger.info.assert_not_called()
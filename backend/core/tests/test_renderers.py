@@ -0,0 +1,86 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from app.renderers import ORJSONParser, ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test the orjson renderer."""
+
+    def test_render_matches_json_renderer(self):
+        """Test the output is byte for byte the one of JSONRenderer."""
+        data = {
+            'rows': [OrderedDict([
+                ('id', 1),
+                ('total', '10.50'),
+                ('amount', Decimal('3.25')),
+                ('sale_date', date(2024, 1, 31)),
+                ('created_at', datetime(
+                    2024, 1, 31, 10, 5, 1, 123456, tzinfo=timezone.utc)),
+                ('hour', time(8, 30, 15, 500000)),
+                ('uuid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+                ('name', 'Ñandú «café»   línea'),
+                ('label', gettext_lazy('Realizada')),
+                ('methods', ('efectivo', 'qr')),
+                ('empty', None),
+                ('active', True),
+            ])],
+            'included': {'products': {7: {'id': 7, 'price': 1.5}}},
+            'total': 1,
+        }
+
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_render_none(self):
+        """Test an empty body is rendered as empty bytes."""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_render_indented_uses_json_renderer(self):
+        """Test the indented output of the browsable API is kept."""
+        data = {'id': 1, 'name': 'Producto'}
+        context = {'indent': 4}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, renderer_context=context),
+            JSONRenderer().render(data, renderer_context=context))
+
+    def test_render_large_integer(self):
+        """Test integers orjson rejects fall back to the stdlib encoder."""
+        data = {'value': 2 ** 70}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """Test the orjson parser."""
+
+    def test_parse(self):
+        """Test parsing a JSON body."""
+        body = '{"name": "Ñandú", "items": [1, 2.5, null]}'.encode()
+
+        data = ORJSONParser().parse(BytesIO(body))
+
+        self.assertEqual(data, {'name': 'Ñandú', 'items': [1, 2.5, None]})
+
+    def test_parse_invalid(self):
+        """Test invalid JSON raises a ParseError."""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"name": '))
+
+    def test_parse_rejects_nan(self):
+        """Test non standard constants are rejected like JSONParser."""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"value": NaN}'))
@@ -0,0 +1,20 @@
+"""
+Filter backends for the sale API.
+"""
+from rest_framework import filters
+
+from sale.services.search_service import SEARCH_DOCUMENTS, SearchService
+
+
+class DocumentSearchFilter(filters.SearchFilter):
+    """
+    `?search=` over the search document of the model, ranked on
+    PostgreSQL. Models without a document keep the joins of SearchFilter
+    over the `search_fields` of the view.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if queryset.model not in SEARCH_DOCUMENTS:
+            return super().filter_queryset(request, queryset, view)
+        search = request.query_params.get(self.search_param, '')
+        return SearchService.search(queryset, search)
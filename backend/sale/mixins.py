@@ -0,0 +1,271 @@
+"""
+Mixins shared by the sale viewsets.
+"""
+from rest_framework import serializers
+from sale.prefetch import get_nested_serializer, prefetch_for_serializer
+from sale.serializers import (
+    BatchSerializer, CategorySerializer, MeasureUnitSerializer,
+    ProductSerializer, WarehouseLightSerializer,
+)
+from sale.services.sync_service import SyncService
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+NORMALIZE_PARAM = 'normalize'
+UPDATED_SINCE_PARAM = 'updated_since'
+
+
+def parse_field_paths(value):
+    """
+    Parse a comma separated list of dotted paths into a tree:
+    'id,supplier.name,supplier.nit' -> {'id': {}, 'supplier': {'name': {},
+    'nit': {}}}. Returns None when the parameter is missing or empty.
+    """
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree or None
+
+
+def prune_serializer(serializer, fields, expand):
+    """
+    Remove from the serializer the fields not requested. `fields` keeps
+    only the listed fields; `expand` keeps only the listed nested objects.
+    Both are trees from parse_field_paths, a missing tree keeps everything
+    of its kind.
+    """
+    for name, field in list(serializer.fields.items()):
+        nested = get_nested_serializer(field)
+        in_fields = fields is not None and name in fields
+        in_expand = expand is not None and name in expand
+        if fields is not None and not in_fields and not in_expand:
+            del serializer.fields[name]
+        elif (nested is not None and expand is not None
+                and not in_fields and not in_expand):
+            del serializer.fields[name]
+        elif nested is not None:
+            prune_serializer(
+                nested,
+                fields.get(name) or None if in_fields else None,
+                expand.get(name) or None if in_expand else None,
+            )
+
+
+class SparseFieldsetMixin:
+    """
+    Let list and retrieve requests choose the fields of the response:
+
+    - ?fields=id,invoice_number,suppliers.name returns only those fields,
+      dotted paths select fields of nested objects.
+    - ?expand=purchase_items returns only the listed nested objects, the
+      other nested objects are left out.
+
+    Together with PrefetchPlanMixin the queryset only loads the relations
+    of the remaining fields.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_sparse_fieldset(self):
+        """Return the (fields, expand) trees of the request."""
+        request = getattr(self, 'request', None)
+        if (request is None or request.method != 'GET' or getattr(
+                self, 'action', None) not in self.sparse_fieldset_actions):
+            return None, None
+        return (
+            parse_field_paths(request.query_params.get(FIELDS_PARAM)),
+            parse_field_paths(request.query_params.get(EXPAND_PARAM)),
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields, expand = self.get_sparse_fieldset()
+        if fields is not None or expand is not None:
+            prune_serializer(
+                get_nested_serializer(serializer), fields, expand)
+        return serializer
+
+    def get_sparse_serializer(self):
+        """The serializer of one object, pruned to the request."""
+        return get_nested_serializer(self.get_serializer())
+
+    def is_field_requested(self, name):
+        """Whether the top level field `name` is part of the response."""
+        return name in self.get_sparse_serializer().fields
+
+
+class PrefetchPlanMixin:
+    """
+    Load the relations the serializer renders with the lookups planned by
+    sale.prefetch instead of writing them by hand in get_queryset.
+    """
+    prefetch_plan_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, 'action', None) not in self.prefetch_plan_actions:
+            return queryset
+        return prefetch_for_serializer(queryset, self.get_serializer())
+
+
+class SideLoadedField(serializers.Field):
+    """
+    Render a related object as its id and register it in the `included`
+    registry of the context, to be rendered once by `nested_serializer`.
+    """
+
+    def __init__(self, key, nested_serializer, **kwargs):
+        self.key = key
+        self.nested_serializer = nested_serializer
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        _, objects = self.context['included'].setdefault(
+            self.key, (self.nested_serializer, {}))
+        objects.setdefault(value.pk, value)
+        return value.pk
+
+
+def side_load_serializer(serializer, side_loaded):
+    """
+    Replace the nested objects of the serializer whose serializer class is
+    in `side_loaded` ({serializer class: included key}) by SideLoadedFields,
+    at any depth.
+    """
+    for name, field in list(serializer.fields.items()):
+        nested = get_nested_serializer(field)
+        if nested is None:
+            continue
+        key = side_loaded.get(type(nested))
+        if key is not None and nested is field:
+            kwargs = {} if field.source == name else {'source': field.source}
+            serializer.fields[name] = SideLoadedField(key, nested, **kwargs)
+        side_load_serializer(nested, side_loaded)
+
+
+class NormalizedResponseMixin:
+    """
+    With ?normalize=true the list rows reference the repeated related
+    objects (products, categories, measure units, batches and warehouses)
+    by id, and a top level `included` map carries each of them once:
+    {'rows': [...], 'total': 3, 'included': {'products': {7: {...}}}}.
+    """
+    side_loaded_serializers = {
+        ProductSerializer: 'products',
+        CategorySerializer: 'categories',
+        MeasureUnitSerializer: 'measure_units',
+        BatchSerializer: 'batches',
+        WarehouseLightSerializer: 'warehouses',
+    }
+
+    def is_normalized(self):
+        request = getattr(self, 'request', None)
+        return (
+            request is not None
+            and getattr(self, 'action', None) == 'list'
+            and request.query_params.get(NORMALIZE_PARAM) == 'true'
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.is_normalized():
+            context['included'] = self.included
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.is_normalized():
+            side_load_serializer(
+                get_nested_serializer(serializer),
+                self.side_loaded_serializers)
+        return serializer
+
+    @property
+    def included(self):
+        """Registry of {key: (serializer, {id: object})} of the request."""
+        if not hasattr(self, '_included'):
+            self._included = {}
+        return self._included
+
+    def get_included(self):
+        """
+        Render every registered object once. Rendering an object can
+        register others (the category of a product), so repeat until no
+        new object appears.
+        """
+        rendered = {}
+        pending = True
+        while pending:
+            pending = False
+            for key, (serializer, objects) in list(self.included.items()):
+                done = rendered.setdefault(key, {})
+                for pk, obj in list(objects.items()):
+                    if pk not in done:
+                        done[pk] = serializer.to_representation(obj)
+                        pending = True
+        return rendered
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.is_normalized():
+            response.data['included'] = self.get_included()
+        return response
+
+
+class DeltaSyncMixin:
+    """
+    With ?updated_since=<sync_token> the list only returns the rows saved
+    since the token and adds the ids deleted since then, with the token
+    for the next sync:
+    {'rows': [...], 'total': 2, 'deleted': [4, 9], 'sync_token': '...'}.
+    An empty `updated_since` starts a full sync.
+    """
+
+    def is_delta_sync(self):
+        request = getattr(self, 'request', None)
+        return (
+            request is not None
+            and getattr(self, 'action', None) == 'list'
+            and UPDATED_SINCE_PARAM in request.query_params
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.is_delta_sync():
+            return queryset
+        # Taken before reading, so rows saved meanwhile come again next time.
+        self.sync_token = SyncService.new_token()
+        self.updated_since = SyncService.parse_token(
+            self.request.query_params[UPDATED_SINCE_PARAM])
+        if self.updated_since is not None:
+            queryset = queryset.filter(updated_at__gte=self.updated_since)
+        return queryset
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.is_delta_sync():
+            response.data['deleted'] = SyncService.get_deleted(
+                self.get_queryset().model, self.updated_since)
+            response.data['sync_token'] = self.sync_token
+        return response
+
+
+class SerializerProfilingMixin:
+    """
+    Time the serialization of the response in the request profile of
+    ProfilingMiddleware, when profiling is enabled.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        profile = getattr(self.request, 'profile', None)
+        if profile is not None:
+            # Only the root serializer, nested ones run inside it.
+            serializer.to_representation = profile.timed(
+                'serialize', serializer.to_representation)
+        return serializer
@@ -0,0 +1,113 @@
+"""
+Build the select_related and prefetch_related lookups a serializer needs.
+"""
+from functools import lru_cache
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def get_nested_serializer(field):
+    """
+    Return the serializer of a nested field, or None. Fields rendering a
+    nested serializer somewhere else (see SideLoadedField) expose it as
+    `nested_serializer`.
+    """
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return getattr(field, 'nested_serializer', None)
+
+
+def is_related(field):
+    """Whether rendering the field loads the related objects."""
+    if isinstance(field, serializers.ManyRelatedField):
+        return True
+    return isinstance(field, serializers.RelatedField) and not isinstance(
+        field, serializers.PrimaryKeyRelatedField)
+
+
+@lru_cache(maxsize=None)
+def get_relation(model, attr):
+    """
+    Return the relation of the model reached through the attribute `attr`
+    (a field name or a reverse accessor), or None when `attr` is not a
+    relation.
+    """
+    for field in model._meta.get_fields():
+        if not field.is_relation or field.related_model is None:
+            continue
+        name = field.name
+        if field.auto_created and not field.concrete:
+            name = field.get_accessor_name()
+        if name == attr:
+            return field
+    return None
+
+
+def plan_prefetch(serializer, model=None):
+    """
+    Walk the readable fields of the serializer and return the lookups that
+    load everything it renders, as (select_related, prefetch_related):
+
+    - forward foreign keys and one to one relations are joined with
+      select_related,
+    - reverse foreign keys and many to many relations are prefetched with
+      a Prefetch whose queryset is planned from the nested serializer.
+
+    Primary key fields are read from the row itself and method fields are
+    skipped, the viewset adds by hand whatever they need.
+    """
+    model = model or serializer.Meta.model
+    select_related = set()
+    prefetch_related = {}
+    _walk(serializer, model, '', select_related, prefetch_related)
+    return sorted(select_related), list(prefetch_related.values())
+
+
+def _walk(serializer, model, prefix, select_related, prefetch_related):
+    for field in serializer._readable_fields:
+        if isinstance(field, serializers.SerializerMethodField):
+            continue
+        nested = get_nested_serializer(field)
+        attrs = field.source_attrs
+        if nested is None and not is_related(field):
+            attrs = attrs[:-1]
+
+        current_model, path = model, prefix
+        for index, attr in enumerate(attrs):
+            relation = get_relation(current_model, attr)
+            if relation is None:
+                break
+            path = f'{path}__{attr}' if path else attr
+            if relation.many_to_many or relation.one_to_many:
+                inner = nested if index == len(attrs) - 1 else None
+                if path not in prefetch_related:
+                    prefetch_related[path] = _prefetch(
+                        path, relation.related_model, inner)
+                break
+            select_related.add(path)
+            current_model = relation.related_model
+        else:
+            if nested is not None:
+                _walk(nested, current_model, path, select_related,
+                      prefetch_related)
+
+
+def _prefetch(lookup, model, serializer):
+    queryset = model._default_manager.all()
+    if serializer is not None:
+        select_related, prefetch_related = plan_prefetch(serializer, model)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return Prefetch(lookup, queryset=queryset)
+
+
+def prefetch_for_serializer(queryset, serializer):
+    """Apply the prefetch plan of the serializer to the queryset."""
+    select_related, prefetch_related = plan_prefetch(
+        get_nested_serializer(serializer), queryset.model)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    return queryset.prefetch_related(*prefetch_related)
@@ -6,35 +6,55 @@ from decimal import Decimal
 from django.db import transaction
 from rest_framework import serializers
 from core.models import (
-    Agency, Batch, Category, Client, Entry, EntryItem,
-    Output, OutputItem, Payment, Product, ProductChannelPrice,
-    ProductStock, Purchase, PurchaseItem, Sale, SaleItem,
-    SellingChannel, Supplier, User, Warehouse, MeasureUnit,
+    Agency, Batch, Category, Client, Entry, EntryItem, InventoryCount,
+    InventoryCountLine, Output, OutputItem, Payment, Product,
+    ProductChannelPrice, ProductStock, Purchase, PurchaseItem, Sale,
+    SaleItem, SellingChannel, StockReservation, Supplier, Transfer,
+    TransferItem, User, Warehouse, MeasureUnit,
 )
 from sale.services.update_product_stock_service import (
     UpdateProductStockService,
 )
-from sale.services.output_service import DecreaseProductStockService
 from sale.services.update_transaction_service import UpdateTransactionService
 from sale.services.entry_purchase_service import UpdatePurchaseItem
 from sale.services.asign_product_warehouse_service import (
     AssignProductWarehouseService,
 )
-from sale.services.output_sale_service import UpdateSaleItem
+from sale.services.bulk_output_service import BulkDispatchService
+from sale.services.bulk_payment_service import BulkPaymentService
+from sale.services.stock_allocation_service import StockAllocationService
+from sale.services.transfer_service import TransferService
+from sale.services.inventory_count_service import (
+    InventoryCountService,
+    parse_inventory_count_file,
+)
+from sale.services.stock_constraint_service import (
+    GuardedStockUpdateService,
+    stock_constraint_errors,
+)
+from sale.services.stock_reservation_service import StockReservationService
+from sale.services.stock_version_service import OptimisticStockUpdateService
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import F
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class UserSerializer(serializers.ModelSerializer):
-    """Serializer for User model"""
+class UserReferenceSerializer(serializers.ModelSerializer):
+    """
+    Compact reference of a user nested in other payloads, without its
+    groups and permissions.
+    """
+    name = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        exclude = ['password']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = [
+            'id', 'name', 'first_name', 'last_name', 'user_type', 'agency']
+        read_only_fields = fields
+
+    def get_name(self, instance):
+        return f"{instance.first_name} {instance.last_name}".strip()
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -148,6 +168,38 @@ class CatalogProductSerializer(serializers.Serializer):
     status = serializers.CharField(required=False, allow_null=True)
 
 
+def balance_available_stock(data, instance=None):
+    """
+    Set the available stock of the product stock data to its stock minus
+    the reserved and damaged stock, as required by the check constraint,
+    unless it was given explicitly.
+    """
+    if data.get('available_stock') is not None:
+        return data
+
+    def current(field):
+        if data.get(field) is not None:
+            return data[field]
+        return getattr(instance, field) if instance else 0
+
+    data['available_stock'] = (
+        current('stock') - current('reserved_stock')
+        - current('damaged_stock'))
+    return data
+
+
+def set_product_stock_fields(data):
+    """
+    Change for OptimisticStockUpdateService setting the given fields on
+    the current row, with its available stock balanced against it.
+    """
+    def change(product_stock):
+        for attr, value in balance_available_stock(
+                dict(data), product_stock).items():
+            setattr(product_stock, attr, value)
+    return change
+
+
 class NestedProductStockSerializer(serializers.ModelSerializer):
     """Nested Serializer for intermediate table for product and stock model."""
     product = serializers.PrimaryKeyRelatedField(
@@ -190,8 +242,12 @@ class NestedProductStockSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         try:
-            validated_data['available_stock'] = validated_data['stock']
-            return super().create(validated_data)
+            validated_data.pop('available_stock', None)
+            balance_available_stock(validated_data)
+            with stock_constraint_errors():
+                return super().create(validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"detail": e.messages[0]})
         except Exception as e:
             logger.error(f"Error creating product stock: {e}")
             raise serializers.ValidationError(
@@ -230,11 +286,14 @@ class WarehouseSerializer(serializers.ModelSerializer):
             warehouse = Warehouse.objects.create(**validated_data)
 
             for product_stock_data in products_stock_data:
-                product_stock_data['available_stock'] = (
-                    product_stock_data['stock']
-                )
-                ProductStock.objects.create(
-                    warehouse=warehouse, **product_stock_data)
+                product_stock_data.pop('available_stock', None)
+                balance_available_stock(product_stock_data)
+                with stock_constraint_errors():
+                    ProductStock.objects.create(
+                        warehouse=warehouse, **product_stock_data)
+        except DjangoValidationError as e:
+            logger.error(f"Error creating warehouse: {e}")
+            raise serializers.ValidationError({"detail": e.messages[0]})
         except Exception as e:
             logger.error(f"Error creating warehouse: {e}")
             raise serializers.ValidationError(
@@ -273,24 +332,28 @@ class WarehouseSerializer(serializers.ModelSerializer):
 
                     if item is not None:
                         matched_ids.add(item.id)
-                        for attr, value in item_data.items():
-                            if attr != 'id':
-                                setattr(item, attr, value)
-                        item.save()
+                        item_data = {
+                            attr: value for attr, value in item_data.items()
+                            if attr != 'id'}
+                        OptimisticStockUpdateService(item.id).apply(
+                            set_product_stock_fields(item_data))
                     else:
                         item_data_copy = item_data.copy()
                         item_data_copy.pop('id', None)
-                        item_data_copy['available_stock'] = (
-                            item_data_copy['stock']
-                        )
+                        item_data_copy.pop('available_stock', None)
+                        balance_available_stock(item_data_copy)
                         item_data_copy.pop('warehouse', None)
-                        new_item = ProductStock.objects.create(
-                            warehouse=instance, **item_data_copy)
+                        with stock_constraint_errors():
+                            new_item = ProductStock.objects.create(
+                                warehouse=instance, **item_data_copy)
                         matched_ids.add(new_item.id)
 
                 for item in existing_items:
                     if item.id not in matched_ids:
                         item.delete()
+        except DjangoValidationError as e:
+            logger.error(f"Error updating warehouse: {e}")
+            raise serializers.ValidationError({"detail": e.messages[0]})
         except Exception as e:
             logger.error(f"Error updating warehouse: {e}")
             raise serializers.ValidationError(
@@ -355,14 +418,39 @@ class ProductStockSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        validated_data['available_stock'] = validated_data['stock']
+        validated_data.pop('available_stock', None)
+        balance_available_stock(validated_data)
         try:
-            return super().create(validated_data)
+            with stock_constraint_errors():
+                return super().create(validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"detail": e.messages[0]})
         except Exception as e:
             logger.error(f"Error creating product stock: {e}")
             raise serializers.ValidationError(
                 {"detail": "Error al crear el stock del producto."})
 
+    def update(self, instance, validated_data):
+        try:
+            return OptimisticStockUpdateService(instance.id).apply(
+                set_product_stock_fields(validated_data))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"detail": e.messages[0]})
+
+
+class LowStockProductStockSerializer(ProductStockSerializer):
+    """Product stock below its minimum with the quantity to reorder."""
+    suggested_quantity = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta(ProductStockSerializer.Meta):
+        fields = ProductStockSerializer.Meta.fields + ['suggested_quantity']
+
+
+class LowStockQuerySerializer(serializers.Serializer):
+    """Query parameters of the low stock reports."""
+    warehouse_id = serializers.IntegerField(required=False, min_value=1)
+
 
 class IncrementDamagedStockSerializer(serializers.Serializer):
     """Serializer for incrementing damaged stock."""
@@ -393,6 +481,102 @@ class IncrementDamagedStockSerializer(serializers.Serializer):
         return data
 
 
+class StockAllocationLineSerializer(serializers.Serializer):
+    """Serializer for a product quantity to allocate."""
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+
+class StockAllocationSerializer(serializers.Serializer):
+    """Serializer for allocating product quantities across stocks."""
+    agency = serializers.PrimaryKeyRelatedField(
+        queryset=Agency.objects.all(), required=False, allow_null=True)
+    policy = serializers.ChoiceField(
+        choices=StockAllocationService.POLICY_CHOICES, default='fifo')
+    lines = StockAllocationLineSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        if data['policy'] == 'nearest' and not data.get('agency'):
+            raise serializers.ValidationError({
+                'agency': "La agencia es requerida para asignar por cercanía."
+            })
+        return data
+
+
+class StockAllocationResultSerializer(serializers.Serializer):
+    """Serializer for a split line returned by the stock allocation."""
+    product = serializers.IntegerField(source='product_stock.product_id')
+    product_stock = serializers.IntegerField(source='product_stock.id')
+    warehouse = serializers.CharField(source='product_stock.warehouse.name')
+    batch = serializers.CharField(source='product_stock.batch.name')
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class InventoryCountLineSerializer(serializers.ModelSerializer):
+    """Serializer for a counted product stock and its variance."""
+    warehouse_name = serializers.CharField(
+        source='warehouse.name', read_only=True)
+    product_name = serializers.CharField(
+        source='product.name', read_only=True)
+    product_code = serializers.CharField(
+        source='product.code', read_only=True)
+    batch_name = serializers.CharField(source='batch.name', read_only=True)
+
+    class Meta:
+        model = InventoryCountLine
+        fields = [
+            'id', 'warehouse', 'warehouse_name', 'product', 'product_name',
+            'product_code', 'batch', 'batch_name', 'product_stock',
+            'counted_quantity', 'system_quantity', 'variance']
+        read_only_fields = fields
+
+
+class InventoryCountSerializer(serializers.ModelSerializer):
+    """Serializer for uploading and reviewing an inventory count."""
+    file = serializers.FileField(write_only=True)
+    counted_by = UserReferenceSerializer(read_only=True)
+    applied_by = UserReferenceSerializer(read_only=True)
+    line_count = serializers.IntegerField(read_only=True)
+    variance_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = InventoryCount
+        fields = [
+            'id', 'file', 'file_name', 'note', 'status', 'counted_by',
+            'applied_by', 'applied_at', 'line_count', 'variance_count',
+            'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'file_name', 'status', 'applied_at', 'created_at',
+            'updated_at']
+
+    def validate_file(self, value):
+        try:
+            self.context['counts'] = parse_inventory_count_file(value)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages[0])
+        return value
+
+    @transaction.atomic
+    def create(self, validated_data):
+        file = validated_data.pop('file')
+        try:
+            inventory_count = InventoryCount.objects.create(
+                file_name=file.name, **validated_data)
+            InventoryCountService(inventory_count).load_lines(
+                self.context['counts'])
+            inventory_count.line_count = len(self.context['counts'])
+            inventory_count.variance_count = inventory_count.lines.exclude(
+                variance=0).count()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"detail": e.messages[0]})
+        except Exception as e:
+            logger.error(f"Error creating inventory count: {e}")
+            raise serializers.ValidationError(
+                {"detail": "Error al cargar el conteo de inventario."})
+        return inventory_count
+
+
 class ProductMinimumSerializer(serializers.ModelSerializer):
     """Serializer for products in sales, purchases and suppliers."""
 
@@ -450,7 +634,7 @@ class ClientSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Client
-        fields = '__all__'
+        exclude = ['search_document']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def validate_nit(self, value):
@@ -747,19 +931,64 @@ class PaymentSerializer(serializers.ModelSerializer):
         payment_amount = validated_data['amount']
         transaction_type = validated_data['transaction_type']
         payment_type = validated_data['payment_type']
+        service = UpdateTransactionService(
+            transaction_id,
+            payment_amount,
+            transaction_type)
         if(payment_type == 'anticipo'):
-            UpdateTransactionService(
-                transaction_id,
-                payment_amount,
-                transaction_type).update_transaction_credit_balance()
+            service.update_transaction_credit_balance()
         else:
-            UpdateTransactionService(
-                transaction_id,
-                payment_amount,
-                transaction_type).update_transaction_balance_due()
+            service.update_transaction_balance_due()
+        service.update_transaction_payment_summary(
+            payment.payment_date, payment.payment_method)
 
         return payment
 
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        previous = (instance.transaction_id, instance.transaction_type)
+        payment = super().update(instance, validated_data)
+        # The method, amount or date may change: rebuild the summaries.
+        current = (payment.transaction_id, payment.transaction_type)
+        try:
+            for transaction_id, transaction_type in {previous, current}:
+                UpdateTransactionService(
+                    transaction_id, payment.amount, transaction_type,
+                ).refresh_transaction_payment_summary()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"detail": e.messages[0]})
+        return payment
+
+
+class BulkPaymentItemSerializer(serializers.ModelSerializer):
+    """Serializer for a payment of a bulk payment."""
+
+    class Meta:
+        model = Payment
+        fields = [
+            'transaction_id',
+            'payment_method',
+            'payment_type',
+            'transaction_type',
+            'amount',
+            'payment_date']
+        extra_kwargs = {'transaction_type': {'required': True}}
+
+
+class BulkPaymentSerializer(serializers.Serializer):
+    """Serializer to apply many payments in one request."""
+    payments = BulkPaymentItemSerializer(many=True)
+
+    def create(self, validated_data):
+        try:
+            return BulkPaymentService(validated_data['payments']).apply()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"detail": e.messages[0]})
+        except Exception as e:
+            logger.error(f"Error creating bulk payments: {e}")
+            raise serializers.ValidationError(
+                {"detail": "Error al registrar los pagos."})
+
 
 class EntryItemSerializer(serializers.ModelSerializer):
     """Serializer for EntryItem model"""
@@ -833,7 +1062,7 @@ class EntryItemSerializer(serializers.ModelSerializer):
 
 class EntrySerializer(serializers.ModelSerializer):
     """Serializer for Entry model"""
-    warehouse_keeper = UserSerializer(read_only=True)
+    warehouse_keeper = UserReferenceSerializer(read_only=True)
     suppliers = SupplierSerializer(read_only=True, source='supplier')
     supplier = serializers.PrimaryKeyRelatedField(
         write_only=True, queryset=Supplier.objects.all())
@@ -963,7 +1192,11 @@ class PurchaseSerializer(serializers.ModelSerializer):
         write_only=True,
     )
     payments = NestedPaymentSerializer(required=False)
-    buyer = UserSerializer(read_only=True)
+    buyer = UserReferenceSerializer(read_only=True)
+    payment_methods = serializers.ListField(
+        child=serializers.CharField(),
+        source='get_payment_methods',
+        read_only=True)
 
     class Meta:
         model = Purchase
@@ -981,18 +1214,29 @@ class PurchaseSerializer(serializers.ModelSerializer):
             'invoice_number',
             'total',
             'balance_due',
+            'amount_paid',
+            'payment_count',
+            'last_payment_date',
+            'payment_methods',
             'status',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'amount_paid', 'payment_count', 'last_payment_date',
+            'created_at', 'updated_at']
 
     def to_representation(self, instance):
         """Custom representation to include payments in GET requests."""
         data = super().to_representation(instance)
-        # Get payments for this purchase
-        payments = Payment.objects.filter(
-            transaction_id=instance.id,
-            transaction_type='compra'
-        )
+        if 'payments' not in self.fields:
+            return data
+        # Use batched payments attached by the view (see
+        # PurchaseViewSet.list) to avoid one query per purchase.
+        payments = getattr(instance, 'prefetched_payments', None)
+        if payments is None:
+            payments = Payment.objects.filter(
+                transaction_id=instance.id,
+                transaction_type='compra'
+            )
         data['payments'] = NestedPaymentSerializer(payments, many=True).data
         return data
 
@@ -1038,8 +1282,12 @@ class PurchaseSerializer(serializers.ModelSerializer):
                         {"detail": "Error al crear el item de compra."})
 
             try:
-                Payment.objects.create(
+                payment = Payment.objects.create(
                     transaction_id=purchase.id, **payment_data)
+                UpdateTransactionService(
+                    purchase.id, payment.amount, 'compra',
+                ).update_transaction_payment_summary(
+                    payment.payment_date, payment.payment_method)
             except Exception as e:
                 logger.error(f"Error creating payment: {e}")
                 raise serializers.ValidationError(
@@ -1052,17 +1300,65 @@ class PurchaseSerializer(serializers.ModelSerializer):
         return purchase
 
 
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField resolved from instances loaded in batch.
+
+    The parent list serializer loads every referenced instance with one
+    query and stores them in the context, so validating N items does not
+    run N lookups by primary key.
+    """
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get('prefetched_instances', {}).get(
+            self.get_queryset().model)
+        if prefetched is None:
+            return super().to_internal_value(data)
+        try:
+            return prefetched[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class PrefetchedListSerializer(serializers.ListSerializer):
+    """Load the related instances referenced by all the items at once."""
+    prefetch_fields = ()
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            prefetched = self.context.setdefault('prefetched_instances', {})
+            for field_name, queryset in self.prefetch_fields:
+                ids = {
+                    str(item.get(field_name)) for item in data
+                    if isinstance(item, dict)
+                    and str(item.get(field_name)).isdigit()
+                }
+                prefetched.setdefault(queryset.model, {}).update(
+                    queryset.in_bulk(ids))
+        return super().to_internal_value(data)
+
+
+class OutputItemListSerializer(PrefetchedListSerializer):
+    """Load the product stocks and sale items of all the items at once."""
+    prefetch_fields = (
+        ('product_stock', ProductStock.objects.select_related('product')),
+        ('sale_item', SaleItem.objects.all()),
+    )
+
+
 class OutputItemSerializer(serializers.ModelSerializer):
     """Serializer for OutputItem model"""
-    product_stock = serializers.PrimaryKeyRelatedField(
+    product_stock = PrefetchedPrimaryKeyRelatedField(
         write_only=True, queryset=ProductStock.objects.all())
     products_stock = ProductStockSerializer(
         read_only=True, source='product_stock')
-    sale_item = serializers.PrimaryKeyRelatedField(
+    sale_item = PrefetchedPrimaryKeyRelatedField(
         write_only=True, required=False, queryset=SaleItem.objects.all())
 
     class Meta:
         model = OutputItem
+        list_serializer_class = OutputItemListSerializer
         fields = [
             'id',
             'sale_item',
@@ -1108,25 +1404,10 @@ class OutputItemSerializer(serializers.ModelSerializer):
 
     @transaction.atomic
     def create(self, validated_data):
-        sale_item_exists = validated_data.get('sale_item') is not None
         try:
-            output_item = super().create(validated_data)
-            product_stock = validated_data['product_stock']
-            if sale_item_exists:
-                UpdateSaleItem(
-                    output_item, product_stock).update_sale_item()
-            DecreaseProductStockService(
-                output_item, product_stock, sale_item_exists
-            ).decrease_product_stock()
-            # Obtener el último invoice_number de todas las salidas
-            last_output = Output.objects.filter(
-                invoice_number__gt=0).order_by('-invoice_number').first()
-            if last_output:
-                output_item.invoice_number = last_output.invoice_number + 1
-            else:
-                output_item.invoice_number = 1
-            output_item.save()
-            return output_item
+            output_items = BulkDispatchService(
+                validated_data['output'], [validated_data]).dispatch()
+            return output_items[0]
         except serializers.ValidationError:
             # Already a well-formed, user-facing validation error
             # (e.g. from a nested serializer) - don't mask its message.
@@ -1144,7 +1425,7 @@ class OutputItemSerializer(serializers.ModelSerializer):
 
 class OutputSerializer(serializers.ModelSerializer):
     """Serializer for Output model"""
-    warehouse_keeper = UserSerializer(read_only=True)
+    warehouse_keeper = UserReferenceSerializer(read_only=True)
     clients = ClientSerializer(read_only=True, source='client')
     client = serializers.PrimaryKeyRelatedField(
         queryset=Client.objects.all(), write_only=True)
@@ -1163,23 +1444,27 @@ class OutputSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         try:
             items_data = validated_data.pop('output_items')
-            output = Output.objects.create(**validated_data)
-            for item_data in items_data:
-                item_data['output'] = output
-                OutputItemSerializer().create(item_data)
-            # Obtener el último invoice_number de todas las ventas
-            last_output = Output.objects.filter(
+            # Obtener el último invoice_number de todas las salidas
+            last_output = Output.objects.select_for_update().filter(
                 invoice_number__gt=0).order_by('-invoice_number').first()
             if last_output:
-                output.invoice_number = last_output.invoice_number + 1
+                validated_data['invoice_number'] = (
+                    last_output.invoice_number + 1
+                )
             else:
-                output.invoice_number = 1
-            output.save()
+                validated_data['invoice_number'] = 1
+            output = Output.objects.create(**validated_data)
+            BulkDispatchService(output, items_data).dispatch()
 
         except serializers.ValidationError:
             # Already a well-formed, user-facing validation error
             # (e.g. propagated from OutputItemSerializer) - don't mask it.
             raise
+        except DjangoValidationError as e:
+            logger.error(f"Error creating output: {e}")
+            message = e.messages[0] if getattr(
+                e, 'messages', None) else str(e)
+            raise serializers.ValidationError({"detail": message})
         except Exception as e:
             logger.error(f"Error creating output: {e}")
             raise serializers.ValidationError(
@@ -1233,6 +1518,81 @@ class OutputSerializer(serializers.ModelSerializer):
         return instance
 
 
+class TransferItemListSerializer(PrefetchedListSerializer):
+    """Load the product stocks of all the transfer items at once."""
+    prefetch_fields = (
+        ('product_stock', ProductStock.objects.all()),
+    )
+
+
+class TransferItemSerializer(serializers.ModelSerializer):
+    """Serializer for TransferItem model"""
+    product_stock = PrefetchedPrimaryKeyRelatedField(
+        write_only=True, queryset=ProductStock.objects.all())
+    products_stock = ProductStockSerializer(
+        read_only=True, source='product_stock')
+    quantity = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+    class Meta:
+        model = TransferItem
+        list_serializer_class = TransferItemListSerializer
+        fields = [
+            'id',
+            'product_stock',
+            'products_stock',
+            'destination_product_stock',
+            'quantity']
+        read_only_fields = ['id', 'destination_product_stock']
+
+
+class TransferSerializer(serializers.ModelSerializer):
+    """Serializer for Transfer model"""
+    user = UserReferenceSerializer(read_only=True)
+    source_warehouses = WarehouseLightSerializer(
+        read_only=True, source='source_warehouse')
+    destination_warehouses = WarehouseLightSerializer(
+        read_only=True, source='destination_warehouse')
+    transfer_items = TransferItemSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = Transfer
+        fields = [
+            'id', 'user', 'source_warehouse', 'source_warehouses',
+            'destination_warehouse', 'destination_warehouses',
+            'transfer_date', 'note', 'transfer_items', 'created_at',
+            'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+        extra_kwargs = {
+            'source_warehouse': {'write_only': True},
+            'destination_warehouse': {'write_only': True},
+        }
+
+    def validate(self, data):
+        if data['source_warehouse'] == data['destination_warehouse']:
+            raise serializers.ValidationError({
+                'destination_warehouse': (
+                    "El almacén de origen y destino no pueden ser el mismo.")
+            })
+        return data
+
+    @transaction.atomic
+    def create(self, validated_data):
+        items_data = validated_data.pop('transfer_items')
+        try:
+            transfer = Transfer.objects.create(**validated_data)
+            TransferService(transfer, items_data).transfer_items()
+        except DjangoValidationError as e:
+            logger.error(f"Error creating transfer: {e}")
+            raise serializers.ValidationError({"detail": e.messages[0]})
+        except Exception as e:
+            logger.error(f"Error creating transfer: {e}")
+            raise serializers.ValidationError(
+                {"detail": "Error al crear el traspaso."})
+
+        return transfer
+
+
 class SaleItemSerializer(serializers.ModelSerializer):
     """Serializer for Sale Item model."""
     products_stock = ProductStockSerializer(
@@ -1305,8 +1665,12 @@ class SaleSerializer(serializers.ModelSerializer):
         write_only=True,
     )
     payments = NestedPaymentSerializer(required=False)
-    seller = UserSerializer(read_only=True)
+    seller = UserReferenceSerializer(read_only=True)
     outputs = OutputSerializer(many=True, read_only=True)
+    payment_methods = serializers.ListField(
+        child=serializers.CharField(),
+        source='get_payment_methods',
+        read_only=True)
 
     class Meta:
         model = Sale
@@ -1324,6 +1688,10 @@ class SaleSerializer(serializers.ModelSerializer):
             'total',
             'balance_due',
             'credit_balance',
+            'amount_paid',
+            'payment_count',
+            'last_payment_date',
+            'payment_methods',
             'status',
             'sale_type',
             'sale_anticipation',
@@ -1336,11 +1704,15 @@ class SaleSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'amount_paid', 'payment_count', 'last_payment_date',
+            'created_at', 'updated_at']
 
     def to_representation(self, instance):
         """Custom representation to include payments in GET requests."""
         data = super().to_representation(instance)
+        if 'payments' not in self.fields:
+            return data
         # Use batched payments attached by the view (see SaleViewSet.list)
         # to avoid one extra query per sale when serializing a list.
         payments = getattr(instance, 'prefetched_payments', None)
@@ -1422,6 +1794,9 @@ class SaleSerializer(serializers.ModelSerializer):
 
         items_data = validated_data.pop('sale_items', None)
         payments_data = validated_data.pop('payments', None)
+        becoming_rechazado = (
+            validated_data.get('status') == 'rechazado'
+            and instance.status != 'rechazado')
         try:
             if validated_data.get(
                     'status') == 'realizado' and instance.invoice_number == 0:
@@ -1440,14 +1815,21 @@ class SaleSerializer(serializers.ModelSerializer):
                 setattr(instance, attr, value)
             instance.save()
 
+            if becoming_rechazado:
+                StockReservationService(instance.reservations.all()).release()
+
             if items_data is not None:
+                reservations = []
                 existing_items = instance.sale_items.all()
-                for item in existing_items:
-                    if item.id not in [
-                            item_data.get('id')
-                            for item_data in items_data
-                            if item_data.get('id')]:
-                        item.delete()
+                removed_items = existing_items.exclude(id__in=[
+                    item_data['id'] for item_data in items_data
+                    if item_data.get('id')])
+                # The stock reserved by the removed items goes back to
+                # available before the reservations are deleted with them.
+                StockReservationService(StockReservation.objects.filter(
+                    sale_item__in=removed_items)).release()
+                for item in removed_items:
+                    item.delete()
 
                 for item_data in items_data:
                     if item_data.get('id'):
@@ -1458,7 +1840,8 @@ class SaleSerializer(serializers.ModelSerializer):
                         item.save()
                     else:
                         try:
-                            SaleItem.objects.create(sale=instance, **item_data)
+                            item = SaleItem.objects.create(
+                                sale=instance, **item_data)
                         except Exception as e:
                             logger.error(f"Error creating sale item: {e}")
                             raise serializers.ValidationError(
@@ -1470,19 +1853,24 @@ class SaleSerializer(serializers.ModelSerializer):
                         try:
                             item_quantity = Decimal(
                                 str(item_data['quantity']))
-                            ProductStock.objects.filter(
-                                id=item_data['product_stock'].id,
-                                available_stock__gte=item_quantity
-                            ).update(
-                                reserved_stock=(
-                                    F('reserved_stock')
-                                    + item_quantity
-                                ),
-                                available_stock=(
-                                    F('available_stock')
-                                    - item_quantity
-                                ),
-                            )
+                            GuardedStockUpdateService(
+                                item_data['product_stock'].id, messages={
+                                    'productstock_available_stock_'
+                                    'non_negative': (
+                                        "No se puede vender una cantidad "
+                                        "mayor al stock actual."),
+                                }).increment(
+                                    reserved_stock=item_quantity,
+                                    available_stock=-item_quantity)
+                            reservations.append(StockReservation(
+                                sale=instance,
+                                sale_item=item,
+                                product_stock=item_data['product_stock'],
+                                quantity=item_quantity,
+                            ))
+                        except DjangoValidationError as e:
+                            raise serializers.ValidationError(
+                                {"detail": e.messages[0]})
                         except Exception as e:
                             logger.error(f"Error saving product stock: {e}")
                             raise serializers.ValidationError(
@@ -1490,6 +1878,7 @@ class SaleSerializer(serializers.ModelSerializer):
                                     "Error al actualizar el "
                                     "stock del producto."
                                 )})
+                StockReservation.objects.bulk_create(reservations)
 
             if payments_data is not None:
                 payment_amount = payments_data['amount']
@@ -1507,10 +1896,15 @@ class SaleSerializer(serializers.ModelSerializer):
                     instance.balance_due -= instance.credit_balance
                     instance.credit_balance = 0
                 instance.balance_due -= payment_amount
-                instance.save(update_fields=['balance_due', 'credit_balance'])
+                instance.save(update_fields=[
+                    'balance_due', 'credit_balance', 'updated_at'])
                 try:
-                    Payment.objects.create(
+                    payment = Payment.objects.create(
                         transaction_id=instance.id, **payments_data)
+                    UpdateTransactionService(
+                        instance.id, payment.amount, 'venta',
+                    ).update_transaction_payment_summary(
+                        payment.payment_date, payment.payment_method)
                 except Exception as e:
                     logger.error(f"Error creating payment: {e}")
                     raise serializers.ValidationError(
@@ -1523,3 +1917,65 @@ class SaleSerializer(serializers.ModelSerializer):
                 {"detail": "Error al actualizar la venta."})
 
         return instance
+
+
+class SaleSummarySerializer(serializers.ModelSerializer):
+    """
+    Flat representation of a sale for lists. Every value comes from the
+    sale row or from the annotations of SaleViewSet, no nested items.
+    """
+    client_name = serializers.CharField(read_only=True)
+    seller_name = serializers.CharField(read_only=True)
+    selling_channel_name = serializers.CharField(read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
+    quantity_total = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True)
+    dispatched_total = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True)
+    dispatch_progress = serializers.SerializerMethodField()
+    payment_methods = serializers.ListField(
+        child=serializers.CharField(),
+        source='get_payment_methods',
+        read_only=True)
+
+    class Meta:
+        model = Sale
+        fields = [
+            'id',
+            'agency',
+            'client',
+            'client_name',
+            'seller',
+            'seller_name',
+            'selling_channel',
+            'selling_channel_name',
+            'pre_invoice_number',
+            'invoice_number',
+            'total',
+            'balance_due',
+            'credit_balance',
+            'amount_paid',
+            'payment_count',
+            'last_payment_date',
+            'payment_methods',
+            'status',
+            'sale_type',
+            'sale_anticipation',
+            'sale_date',
+            'sale_perform_date',
+            'sale_done_date',
+            'item_count',
+            'quantity_total',
+            'dispatched_total',
+            'dispatch_progress',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+    def get_dispatch_progress(self, instance):
+        """Percentage of the sold quantity already dispatched."""
+        if not instance.quantity_total:
+            return 0
+        return round(
+            instance.dispatched_total * 100 / instance.quantity_total, 2)
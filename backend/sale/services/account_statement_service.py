@@ -0,0 +1,117 @@
+"""
+Service to build the account statement of a client or supplier.
+"""
+from decimal import Decimal
+from django.db import connection
+from django.db.models import DateField
+from core.models import Payment, Purchase, Sale
+
+STATEMENTS = {
+    'client': {
+        'model': Sale,
+        'transaction_type': 'venta',
+        'party_field': 'client_id',
+        'date_field': 'sale_date',
+        'statuses': ('realizado', 'terminado'),
+    },
+    'supplier': {
+        'model': Purchase,
+        'transaction_type': 'compra',
+        'party_field': 'supplier_id',
+        'date_field': 'purchase_date',
+        'statuses': ('realizado', 'terminado'),
+    },
+}
+CENTS = Decimal('0.01')
+
+
+class AccountStatementService:
+    def __init__(self, party_type, party_id):
+        self.statement = STATEMENTS[party_type]
+        self.party_id = party_id
+
+    def get_page(self, limit, offset=0):
+        """
+        Return one page of the chronological movements of the party, as
+        (rows, total). Every sale or purchase is a charge and every payment
+        a credit; the running balance and the total are computed by window
+        functions over the whole statement in the same query.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(self._get_sql(), self._get_params(limit, offset))
+            rows = cursor.fetchall()
+
+        total = rows[0][-1] if rows else self._count()
+        return [self._to_movement(row) for row in rows], total
+
+    def _get_sql(self):
+        quote = connection.ops.quote_name
+        transactions = quote(self.statement['model']._meta.db_table)
+        payments = quote(Payment._meta.db_table)
+        party_field = quote(self.statement['party_field'])
+        date_field = quote(self.statement['date_field'])
+        statuses = ', '.join(['%s'] * len(self.statement['statuses']))
+        return f"""
+            WITH movements AS (
+                SELECT 0 AS kind, t.id AS id, t.id AS transaction_id,
+                    t.{date_field} AS movement_date, t.total AS charge,
+                    0 AS credit, NULL AS payment_method
+                FROM {transactions} t
+                WHERE t.{party_field} = %s AND t.status IN ({statuses})
+                UNION ALL
+                SELECT 1 AS kind, p.id AS id, p.transaction_id,
+                    p.payment_date AS movement_date, 0 AS charge,
+                    p.amount AS credit, p.payment_method
+                FROM {payments} p
+                INNER JOIN {transactions} t ON t.id = p.transaction_id
+                WHERE p.transaction_type = %s AND t.{party_field} = %s
+                    AND t.status IN ({statuses})
+            )
+            SELECT kind, id, transaction_id, movement_date, charge, credit,
+                payment_method,
+                SUM(charge - credit) OVER (
+                    ORDER BY movement_date, kind, id
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                ) AS balance,
+                COUNT(*) OVER () AS total
+            FROM movements
+            ORDER BY movement_date, kind, id
+            LIMIT %s OFFSET %s
+        """
+
+    def _get_params(self, limit, offset):
+        statuses = list(self.statement['statuses'])
+        return [
+            self.party_id, *statuses,
+            self.statement['transaction_type'], self.party_id, *statuses,
+            limit, offset,
+        ]
+
+    def _count(self):
+        """Total of movements when the requested page is past the end."""
+        transactions = self.statement['model'].objects.filter(**{
+            self.statement['party_field']: self.party_id,
+            'status__in': self.statement['statuses'],
+        })
+        return transactions.count() + Payment.objects.filter(
+            transaction_type=self.statement['transaction_type'],
+            transaction_id__in=transactions.values('id'),
+        ).count()
+
+    def _to_movement(self, row):
+        kind, id, transaction_id, movement_date, charge, credit, method = (
+            row[:7])
+        return {
+            'type': 'pago' if kind else self.statement['transaction_type'],
+            'id': id,
+            'transaction_id': transaction_id,
+            'date': DateField().to_python(movement_date),
+            'charge': self._money(charge),
+            'credit': self._money(credit),
+            'payment_method': method,
+            'balance': self._money(row[7]),
+        }
+
+    def _money(self, value):
+        # SQLite returns numbers as int/float, PostgreSQL as Decimal.
+        return Decimal(str(value)).quantize(CENTS)
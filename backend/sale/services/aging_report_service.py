@@ -0,0 +1,75 @@
+"""
+Service to compute the aging of receivables and payables.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from core.models import Purchase, Sale
+
+BUCKETS = (
+    ('current', 0, 30),
+    ('days_31_60', 31, 60),
+    ('days_61_90', 61, 90),
+    ('over_90', 91, None),
+)
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+class AgingReportService:
+    def __init__(self, as_of=None):
+        self.as_of = as_of or date.today()
+
+    def get_receivables(self):
+        """
+        Open balance of the credit sales of every client split in the
+        0-30, 31-60, 61-90 and 90+ days buckets by sale date.
+        """
+        return self._aging(
+            Sale.objects.filter(
+                sale_type='credito',
+                status__in=['realizado', 'terminado'],
+            ),
+            'sale_date',
+            party='client',
+        )
+
+    def get_payables(self):
+        """
+        Open balance of the credit purchases of every supplier split in
+        the 0-30, 31-60, 61-90 and 90+ days buckets by purchase date.
+        """
+        return self._aging(
+            Purchase.objects.filter(purchase_type='credito'),
+            'purchase_date',
+            party='supplier',
+        )
+
+    def _aging(self, queryset, date_field, party):
+        """One grouped query with a conditional sum per bucket."""
+        buckets = {
+            name: self._bucket_sum(date_field, low, high)
+            for name, low, high in BUCKETS
+        }
+        return list(queryset.filter(balance_due__gt=0).values(
+            party_id=F(f'{party}_id'),
+            party_name=F(f'{party}__name'),
+        ).annotate(
+            **buckets,
+            total=Sum('balance_due'),
+        ).order_by('-total', 'party_name'))
+
+    def _bucket_sum(self, date_field, low, high):
+        # Dates after `as_of` stay in the first bucket.
+        condition = Q()
+        if low > 0:
+            condition &= Q(**{f'{date_field}__lte': self.as_of - timedelta(
+                days=low)})
+        if high is not None:
+            condition &= Q(**{f'{date_field}__gte': self.as_of - timedelta(
+                days=high)})
+        return Coalesce(
+            Sum(Case(When(condition, then='balance_due'), output_field=MONEY)),
+            Value(Decimal('0')),
+            output_field=MONEY,
+        )
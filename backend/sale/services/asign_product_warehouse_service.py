@@ -5,6 +5,7 @@ Service to assign a product to a warehouse
 import logging
 from decimal import Decimal
 from core.models import ProductStock
+from sale.services.stock_constraint_service import GuardedStockUpdateService
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +34,10 @@ class AssignProductWarehouseService:
                 }
             )
             if not created:
+                GuardedStockUpdateService(product_stock.id).increment(
+                    stock=self.quantity, available_stock=self.quantity)
                 product_stock.stock += self.quantity
                 product_stock.available_stock += self.quantity
-                product_stock.save(update_fields=['stock', 'available_stock'])
 
             return product_stock
         except Exception as e:
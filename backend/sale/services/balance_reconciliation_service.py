@@ -0,0 +1,120 @@
+"""
+Service to check and repair the balances of sales and purchases.
+"""
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import (
+    Count, DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Q,
+    Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from core.models import Payment, Purchase, Sale
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_MODELS = {
+    'venta': Sale,
+    'compra': Purchase,
+}
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+REPORT_LIMIT = 50
+
+
+class BalanceReconciliationService:
+    """
+    Recompute the balances of sales and purchases from their payments:
+    a purchase owes total - paid, and a sale owes total - paid plus its
+    unapplied credit balance. Proforma sales are skipped, their balance is
+    set when they are realized.
+    """
+
+    def get_expected(self, transaction_type):
+        """
+        Return the expressions of the expected balance_due, amount_paid and
+        payment_count of a transaction, aggregating its payments through
+        the (transaction_type, transaction_id) index.
+        """
+        payments = Payment.objects.filter(
+            transaction_type=transaction_type,
+            transaction_id=OuterRef('pk'),
+        ).order_by().values('transaction_id')
+        paid = Coalesce(
+            Subquery(payments.annotate(paid=Sum('amount')).values('paid')),
+            Value(Decimal('0')),
+            output_field=MONEY,
+        )
+        count = Coalesce(
+            Subquery(payments.annotate(count=Count('id')).values('count')),
+            Value(0),
+            output_field=IntegerField(),
+        )
+        balance_due = F('total') - paid
+        if transaction_type == 'venta':
+            balance_due = balance_due + F('credit_balance')
+        return {
+            'balance_due': ExpressionWrapper(balance_due, output_field=MONEY),
+            'amount_paid': paid,
+            'payment_count': count,
+        }
+
+    def get_drift(self, transaction_type):
+        """
+        Return the transactions whose balance or payment summary does not
+        match their payments, annotated with the expected values, in a
+        single query.
+        """
+        model = TRANSACTION_MODELS[transaction_type]
+        queryset = model.objects.all()
+        if transaction_type == 'venta':
+            queryset = queryset.exclude(status='proforma')
+        queryset = queryset.annotate(**{
+            f'expected_{field}': expression
+            for field, expression in self.get_expected(
+                transaction_type).items()
+        })
+        return queryset.filter(
+            ~Q(balance_due=F('expected_balance_due'))
+            | ~Q(amount_paid=F('expected_amount_paid'))
+            | ~Q(payment_count=F('expected_payment_count'))
+        ).order_by('id')
+
+    def report(self, limit=REPORT_LIMIT):
+        """
+        Return the number of drifted transactions of every transaction
+        type with the first `limit` of them.
+        """
+        report = {}
+        for transaction_type in TRANSACTION_MODELS:
+            drift = self.get_drift(transaction_type)
+            report[transaction_type] = {
+                'total': drift.count(),
+                'rows': list(drift.values(
+                    'id', 'total', 'balance_due', 'expected_balance_due',
+                    'amount_paid', 'expected_amount_paid', 'payment_count',
+                    'expected_payment_count',
+                )[:limit]),
+            }
+        return report
+
+    @transaction.atomic
+    def repair(self):
+        """
+        Overwrite the drifted balances and payment summaries with their
+        expected values with one UPDATE per table. Returns the number of
+        repaired transactions per transaction type.
+        """
+        try:
+            repaired = {}
+            for transaction_type, model in TRANSACTION_MODELS.items():
+                drift = self.get_drift(transaction_type)
+                repaired[transaction_type] = model.objects.filter(
+                    id__in=Subquery(drift.values('id')),
+                ).update(
+                    updated_at=timezone.now(),
+                    **self.get_expected(transaction_type))
+            return repaired
+        except Exception as e:
+            logger.error(f"Error repairing transaction balances: {e}")
+            raise e
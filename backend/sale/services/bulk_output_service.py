@@ -0,0 +1,182 @@
+"""
+Service to dispatch every item of an output in a single pass.
+"""
+from datetime import date
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Exists, F, OuterRef, Value, When
+from django.utils import timezone
+from core.models import (
+    OutputItem, ProductStock, Sale, SaleItem, StockReservation)
+from sale.services.stock_constraint_service import (
+    get_stock_constraint_message)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BulkDispatchService:
+    def __init__(self, output, items_data):
+        self.output = output
+        self.items_data = items_data
+
+    @transaction.atomic
+    def dispatch(self):
+        """
+        Dispatch all the output items with a fixed number of queries:
+        lock the product stocks and sale items involved, validate the
+        whole output against them, create the output items with one
+        INSERT and apply the stock, dispatched and reserved quantities
+        with one UPDATE per table. Returns the created output items.
+        """
+        try:
+            lines = [self._build_line(item) for item in self.items_data]
+            product_stocks = self._lock(
+                ProductStock, {line['product_stock'] for line in lines})
+            sale_items = self._lock(
+                SaleItem,
+                {line['sale_item'] for line in lines if line['sale_item']})
+
+            dispatched = self._apply_lines(lines, product_stocks, sale_items)
+            for product_stock in product_stocks.values():
+                product_stock.version += 1
+
+            output_items = OutputItem.objects.bulk_create([
+                OutputItem(
+                    output=self.output,
+                    product_stock=product_stocks[line['product_stock']],
+                    sale_item=sale_items.get(line['sale_item']),
+                    quantity=line['quantity'],
+                )
+                for line in lines
+            ])
+            now = timezone.now()
+            for product_stock in product_stocks.values():
+                product_stock.updated_at = now
+            try:
+                ProductStock.objects.bulk_update(
+                    product_stocks.values(), [
+                        'stock', 'reserved_stock', 'available_stock',
+                        'version', 'updated_at'])
+            except IntegrityError as e:
+                # The whole dispatch is rolled back, no savepoint needed.
+                message = get_stock_constraint_message(e)
+                if message is None:
+                    raise
+                raise ValidationError(message)
+            if sale_items:
+                SaleItem.objects.bulk_update(
+                    sale_items.values(), ['dispatched_stock', 'status'])
+                self._consume_reservations(sale_items, dispatched)
+                self._update_sales(
+                    {item.sale_id for item in sale_items.values()})
+
+            return output_items
+        except Exception as e:
+            logger.error(f"Error dispatching output items: {e}")
+            raise e
+
+    def _build_line(self, item_data):
+        product_stock = item_data['product_stock']
+        sale_item = item_data.get('sale_item')
+        return {
+            'product_stock': getattr(product_stock, 'id', product_stock),
+            'sale_item': getattr(sale_item, 'id', sale_item),
+            'quantity': Decimal(str(item_data.get('quantity', 0))),
+        }
+
+    def _lock(self, model, ids):
+        """Lock and return the rows of `model` with the given ids."""
+        if not ids:
+            return {}
+        rows = {
+            row.id: row
+            for row in model.objects.select_for_update().filter(
+                id__in=ids).order_by('id')
+        }
+        if len(rows) != len(ids):
+            raise ValidationError(
+                "Uno de los items de la salida ya no existe.")
+        return rows
+
+    def _apply_lines(self, lines, product_stocks, sale_items):
+        """
+        Apply every line to the locked rows in memory, validating the
+        accumulated quantities the same way OutputItemSerializer does for
+        a single line. Returns the quantity dispatched per sale item.
+        """
+        dispatched = {}
+        for line in lines:
+            quantity = line['quantity']
+            product_stock = product_stocks[line['product_stock']]
+            sale_item = sale_items.get(line['sale_item'])
+
+            if product_stock.stock - quantity < 0:
+                raise ValidationError(
+                    "La cantidad excede el stock disponible.")
+            product_stock.stock -= quantity
+
+            if sale_item is None:
+                if product_stock.available_stock - quantity < 0:
+                    raise ValidationError(
+                        "La cantidad excede el stock disponible/real.")
+                product_stock.available_stock -= quantity
+                continue
+
+            if product_stock.reserved_stock - quantity < 0:
+                raise ValidationError(
+                    "La cantidad excede el stock reservado.")
+            product_stock.reserved_stock -= quantity
+
+            if sale_item.dispatched_stock + quantity > sale_item.quantity:
+                raise ValidationError(
+                    "La cantidad despachada excede la cantidad vendida.")
+            sale_item.dispatched_stock += quantity
+            dispatched[sale_item.id] = (
+                dispatched.get(sale_item.id, Decimal('0')) + quantity)
+            if sale_item.dispatched_stock < sale_item.quantity:
+                sale_item.status = 'parcial'
+            if sale_item.dispatched_stock == sale_item.quantity:
+                sale_item.status = 'completado'
+        return dispatched
+
+    def _consume_reservations(self, sale_items, dispatched):
+        """
+        Take the dispatched quantities out of the active reservations of
+        the sale items with one UPDATE: the reservations of the completed
+        items are consumed and the others hold only what is left.
+        """
+        completed = [
+            sale_item.id for sale_item in sale_items.values()
+            if sale_item.status == 'completado']
+        StockReservation.objects.filter(
+            sale_item_id__in=dispatched, status='activa').update(
+                status=Case(
+                    When(sale_item_id__in=completed,
+                         then=Value('consumida')),
+                    default=F('status')),
+                quantity=Case(
+                    *[
+                        When(sale_item_id=sale_item_id,
+                             then=F('quantity') - Value(quantity))
+                        for sale_item_id, quantity in dispatched.items()
+                        if sale_item_id not in completed
+                    ],
+                    default=F('quantity')))
+
+    def _update_sales(self, sale_ids):
+        """
+        Touch the sales of the dispatched items, so the delta sync sends
+        their items again, and finish those whose items are all completed.
+        """
+        completed = ~Exists(SaleItem.objects.filter(
+            sale=OuterRef('pk')).exclude(status='completado'))
+        Sale.objects.filter(id__in=sale_ids).update(
+            status=Case(
+                When(completed, then=Value('terminado')),
+                default=F('status')),
+            sale_done_date=Case(
+                When(completed, then=Value(date.today())),
+                default=F('sale_done_date')),
+            updated_at=timezone.now())
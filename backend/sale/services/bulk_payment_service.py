@@ -0,0 +1,138 @@
+"""
+Service to apply many payments to sales and purchases at once.
+"""
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from core.models import PAYMENT_METHOD_BITS, Payment, Purchase, Sale
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_MODELS = {
+    'venta': Sale,
+    'compra': Purchase,
+}
+TRANSACTION_NAMES = {
+    'venta': 'la venta',
+    'compra': 'la compra',
+}
+SUMMARY_FIELDS = [
+    'balance_due', 'amount_paid', 'payment_count', 'last_payment_date',
+    'payment_methods',
+]
+
+
+class BulkPaymentService:
+    def __init__(self, payments_data):
+        self.payments_data = payments_data
+
+    @transaction.atomic
+    def apply(self):
+        """
+        Apply every payment ({'transaction_id', 'transaction_type',
+        'payment_type', 'payment_method', 'amount', 'payment_date'}) in one
+        transaction: the target sales and purchases are locked with one
+        SELECT ... FOR UPDATE per table ordered by id, the whole batch is
+        validated before writing, the payments are inserted with one INSERT
+        and the balances and payment summaries are written with one UPDATE
+        per table. Returns the created payments.
+        """
+        try:
+            if not self.payments_data:
+                raise ValidationError("Debe registrar al menos un pago.")
+
+            transactions = self._lock_transactions()
+            payments = [
+                self._apply_payment(transactions, payment_data)
+                for payment_data in self.payments_data
+            ]
+
+            for transaction_type, model in TRANSACTION_MODELS.items():
+                locked = transactions[transaction_type].values()
+                if not locked:
+                    continue
+                fields = [*SUMMARY_FIELDS, 'updated_at']
+                if transaction_type == 'venta':
+                    fields.append('credit_balance')
+                now = timezone.now()
+                for record in locked:
+                    record.updated_at = now
+                model.objects.bulk_update(locked, fields)
+
+            return Payment.objects.bulk_create(payments)
+        except Exception as e:
+            logger.error(f"Error applying bulk payments: {e}")
+            raise e
+
+    def _lock_transactions(self):
+        transactions = {}
+        for transaction_type, model in TRANSACTION_MODELS.items():
+            ids = {
+                payment['transaction_id'] for payment in self.payments_data
+                if payment['transaction_type'] == transaction_type
+            }
+            transactions[transaction_type] = {
+                obj.id: obj
+                for obj in model.objects.select_for_update().filter(
+                    id__in=ids).order_by('id')
+            } if ids else {}
+            missing = sorted(ids - set(transactions[transaction_type]))
+            if missing:
+                raise ValidationError(
+                    f"No existe {TRANSACTION_NAMES[transaction_type]} "
+                    f"{missing[0]}.")
+        return transactions
+
+    def _apply_payment(self, transactions, payment_data):
+        """
+        Validate the payment against the balances left by the previous
+        payments of the batch and apply it to the locked transaction.
+        """
+        transaction_type = payment_data['transaction_type']
+        target = transactions[transaction_type][
+            payment_data['transaction_id']]
+        name = f"{TRANSACTION_NAMES[transaction_type]} {target.id}"
+        amount = Decimal(str(payment_data['amount']))
+        payment_date = payment_data['payment_date']
+        payment_method = payment_data.get('payment_method', 'efectivo')
+
+        if amount <= 0:
+            raise ValidationError(
+                f"El monto del pago de {name} debe ser mayor a 0.")
+        transaction_date = (
+            target.sale_date if transaction_type == 'venta'
+            else target.purchase_date)
+        if payment_date < transaction_date:
+            raise ValidationError(
+                f"La fecha de pago no puede ser anterior a la fecha de "
+                f"{name}.")
+
+        if (payment_data.get('payment_type') == 'anticipo'
+                and transaction_type == 'venta'):
+            if target.credit_balance + amount > target.total:
+                raise ValidationError(
+                    f"El pago excede el total de {name}.")
+            target.credit_balance += amount
+        else:
+            if target.balance_due - amount < 0:
+                raise ValidationError(
+                    f"El pago excede el saldo pendiente de {name}.")
+            target.balance_due -= amount
+
+        target.amount_paid += amount
+        target.payment_count += 1
+        if (target.last_payment_date is None
+                or payment_date > target.last_payment_date):
+            target.last_payment_date = payment_date
+        target.payment_methods |= PAYMENT_METHOD_BITS.get(payment_method, 0)
+
+        return Payment(
+            transaction_id=target.id,
+            transaction_type=transaction_type,
+            payment_type=payment_data.get('payment_type', 'venta'),
+            payment_method=payment_method,
+            amount=amount,
+            payment_date=payment_date,
+        )
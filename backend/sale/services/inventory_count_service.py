@@ -0,0 +1,228 @@
+"""
+Service to load a physical inventory count and post its adjustments.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+from zipfile import BadZipFile
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import (
+    DecimalField, Exists, F, OuterRef, Subquery, Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from core.models import (
+    Batch, InventoryCount, InventoryCountLine, Product, ProductStock,
+    Warehouse,
+)
+from sale.services.stock_constraint_service import stock_constraint_errors
+import logging
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('ID_ALMACEN', 'ID_PRODUCTO', 'ID_LOTE', 'CANTIDAD')
+BATCH_SIZE = 1000
+
+
+def parse_inventory_count_file(file):
+    """
+    Read the counted quantities of a CSV or XLSX file with the columns
+    ID_ALMACEN, ID_PRODUCTO, ID_LOTE and CANTIDAD. Returns a dict of
+    (warehouse_id, product_id, batch_id) to quantity; repeated rows of the
+    same product stock are added up.
+    """
+    name = getattr(file, 'name', '').lower()
+    if name.endswith('.xlsx'):
+        rows = _read_rows(_read_xlsx, file)
+    elif name.endswith('.csv'):
+        rows = _read_rows(_read_csv, file)
+    else:
+        raise ValidationError("El archivo debe ser CSV o XLSX.")
+
+    header = [str(cell or '').strip().upper() for cell in next(rows, [])]
+    missing = [column for column in COLUMNS if column not in header]
+    if missing:
+        raise ValidationError(
+            f"Faltan las columnas: {', '.join(missing)}.")
+    positions = [header.index(column) for column in COLUMNS]
+
+    counts = {}
+    for number, row in enumerate(rows, start=2):
+        values = [row[position] if position < len(row) else None
+                  for position in positions]
+        if all(value in (None, '') for value in values):
+            continue
+        try:
+            key = tuple(int(value) for value in values[:3])
+            quantity = Decimal(str(values[3]).strip())
+        except (TypeError, ValueError, InvalidOperation):
+            raise ValidationError(f"La fila {number} no es válida.")
+        if not quantity.is_finite():
+            raise ValidationError(f"La fila {number} no es válida.")
+        if quantity < 0:
+            raise ValidationError(
+                f"La cantidad de la fila {number} no puede ser negativa.")
+        counts[key] = counts.get(key, Decimal('0')) + quantity
+
+    if not counts:
+        raise ValidationError("El archivo no tiene cantidades contadas.")
+    return counts
+
+
+def _read_rows(reader, file):
+    """
+    Yield the rows of the reader, turning the errors of a file that can't
+    be decoded or opened into a ValidationError.
+    """
+    try:
+        yield from reader(file)
+    except UnicodeDecodeError:
+        raise ValidationError("El archivo CSV debe estar codificado en UTF-8.")
+    except (csv.Error, BadZipFile, InvalidFileException, KeyError, OSError):
+        raise ValidationError("No se pudo leer el archivo.")
+
+
+def _read_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig')
+    return iter(csv.reader(text))
+
+
+def _read_xlsx(file):
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    return workbook.active.iter_rows(values_only=True)
+
+
+class InventoryCountService:
+    def __init__(self, inventory_count):
+        self.inventory_count = inventory_count
+
+    @transaction.atomic
+    def load_lines(self, counts):
+        """
+        Store the counted quantities ({(warehouse, product, batch): qty})
+        in the staging lines with bulk inserts and compute their variances.
+        """
+        try:
+            self._validate_references(counts)
+            InventoryCountLine.objects.bulk_create([
+                InventoryCountLine(
+                    inventory_count=self.inventory_count,
+                    warehouse_id=warehouse_id,
+                    product_id=product_id,
+                    batch_id=batch_id,
+                    counted_quantity=quantity,
+                )
+                for (warehouse_id, product_id, batch_id), quantity
+                in counts.items()
+            ], batch_size=BATCH_SIZE)
+            self.compute_variances()
+        except Exception as e:
+            logger.error(f"Error loading inventory count: {e}")
+            raise e
+
+    def _validate_references(self, counts):
+        for model, position, message in (
+                (Warehouse, 0, "El almacén {} no existe."),
+                (Product, 1, "El producto {} no existe."),
+                (Batch, 2, "El lote {} no existe.")):
+            ids = {key[position] for key in counts}
+            existing = set(model.objects.filter(
+                id__in=ids).values_list('id', flat=True))
+            missing = sorted(ids - existing)
+            if missing:
+                raise ValidationError(message.format(missing[0]))
+
+    def compute_variances(self):
+        """
+        Match every line with its product stock and store the system
+        quantity and the variance with a single UPDATE joined against
+        ProductStock.
+        """
+        stocks = ProductStock.objects.filter(
+            warehouse_id=OuterRef('warehouse_id'),
+            product_id=OuterRef('product_id'),
+            batch_id=OuterRef('batch_id'),
+        )
+        system_quantity = Coalesce(
+            Subquery(stocks.values('stock')[:1]),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+        self.inventory_count.lines.update(
+            product_stock=Subquery(stocks.values('id')[:1]),
+            system_quantity=system_quantity,
+            variance=F('counted_quantity') - system_quantity,
+        )
+
+    @transaction.atomic
+    def apply(self, user):
+        """
+        Post the count: every product stock with a variance takes the
+        counted quantity as its stock (the difference goes to the available
+        stock) with one UPDATE, and the counted product stocks that do not
+        exist yet are created with one INSERT.
+        """
+        try:
+            inventory_count = InventoryCount.objects.select_for_update().get(
+                id=self.inventory_count.id)
+            if inventory_count.status != 'pendiente':
+                raise ValidationError("El conteo ya fue aplicado.")
+
+            # Stock may have moved since the review: post current figures.
+            self.compute_variances()
+            lines = InventoryCountLine.objects.filter(
+                inventory_count=inventory_count,
+                product_stock=OuterRef('pk'),
+            ).exclude(variance=0)
+            counted = Subquery(lines.values('counted_quantity')[:1])
+            with stock_constraint_errors({
+                'productstock_available_stock_non_negative': (
+                    "La cantidad contada es menor al stock reservado "
+                    "y dañado."),
+            }):
+                ProductStock.objects.filter(Exists(lines)).update(
+                    available_stock=F('available_stock') + counted
+                    - F('stock'),
+                    stock=counted,
+                    version=F('version') + 1,
+                    updated_at=timezone.now(),
+                )
+            self._create_missing_product_stocks(inventory_count)
+
+            inventory_count.status = 'aplicado'
+            inventory_count.applied_by = user
+            inventory_count.applied_at = timezone.now()
+            inventory_count.save(
+                update_fields=[
+                    'status', 'applied_by', 'applied_at', 'updated_at'])
+            self.inventory_count = inventory_count
+            return inventory_count
+        except Exception as e:
+            logger.error(f"Error applying inventory count: {e}")
+            raise e
+
+    def _create_missing_product_stocks(self, inventory_count):
+        new_lines = list(inventory_count.lines.filter(
+            product_stock__isnull=True, counted_quantity__gt=0))
+        if not new_lines:
+            return
+        ProductStock.objects.bulk_create([
+            ProductStock(
+                warehouse_id=line.warehouse_id,
+                product_id=line.product_id,
+                batch_id=line.batch_id,
+                stock=line.counted_quantity,
+                available_stock=line.counted_quantity,
+            )
+            for line in new_lines
+        ], batch_size=BATCH_SIZE)
+        InventoryCountLine.objects.filter(
+            id__in=[line.id for line in new_lines]).update(
+                product_stock=Subquery(ProductStock.objects.filter(
+                    warehouse_id=OuterRef('warehouse_id'),
+                    product_id=OuterRef('product_id'),
+                    batch_id=OuterRef('batch_id'),
+                ).values('id')[:1]))
@@ -0,0 +1,67 @@
+"""
+Service to find the product stocks below their reorder point.
+"""
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from core.models import ProductStock
+
+SUGGESTED_QUANTITY = ExpressionWrapper(
+    F('maximum_stock') - F('available_stock'),
+    output_field=DecimalField(max_digits=10, decimal_places=2),
+)
+
+
+class LowStockService:
+    def __init__(self, warehouse_id=None):
+        self.warehouse_id = warehouse_id
+
+    def get_queryset(self):
+        """
+        Product stocks whose available stock is below the minimum stock,
+        annotated with the suggested order quantity (maximum - available).
+        The filter matches the partial index productstock_low_stock_idx.
+        """
+        queryset = ProductStock.objects.filter(
+            available_stock__lt=F('minimum_stock'))
+        if self.warehouse_id:
+            queryset = queryset.filter(warehouse_id=self.warehouse_id)
+        return queryset.annotate(suggested_quantity=SUGGESTED_QUANTITY)
+
+    def get_reorder_suggestions(self):
+        """
+        Suggested order quantities per product, grouped by the suppliers of
+        the product (Supplier.product), computed with one grouped query.
+        Products without supplier are grouped under a null supplier.
+        """
+        rows = self.get_queryset().values(
+            'product__suppliers__id',
+            'product__suppliers__name',
+            'product_id',
+            'product__name',
+            'product__code',
+        ).annotate(
+            available=Sum('available_stock'),
+            suggested=Sum(SUGGESTED_QUANTITY),
+        ).order_by(
+            'product__suppliers__name',
+            'product__suppliers__id',
+            'product__name',
+        )
+
+        suppliers = {}
+        for row in rows:
+            supplier_id = row['product__suppliers__id']
+            supplier = suppliers.setdefault(supplier_id, {
+                'supplier': supplier_id and {
+                    'id': supplier_id,
+                    'name': row['product__suppliers__name'],
+                },
+                'products': [],
+            })
+            supplier['products'].append({
+                'id': row['product_id'],
+                'name': row['product__name'],
+                'code': row['product__code'],
+                'available_stock': row['available'],
+                'suggested_quantity': row['suggested'],
+            })
+        return list(suppliers.values())
@@ -0,0 +1,24 @@
+"""
+Service to load the payments of many sales or purchases at once.
+"""
+from core.models import Payment
+
+
+def prefetch_payments(objects, transaction_type):
+    """
+    Attach to every sale or purchase the list of its payments as
+    `prefetched_payments` with a single query.
+    """
+    objects = list(objects)
+    ids = {obj.id for obj in objects}
+    payments_by_transaction = {}
+    if ids:
+        for payment in Payment.objects.filter(
+            transaction_type=transaction_type,
+            transaction_id__in=ids,
+        ).order_by('id'):
+            payments_by_transaction.setdefault(
+                payment.transaction_id, []).append(payment)
+    for obj in objects:
+        obj.prefetched_payments = payments_by_transaction.get(obj.id, [])
+    return objects
@@ -0,0 +1,90 @@
+"""
+Service to build and cache the reference data the frontend loads on start.
+"""
+import hashlib
+from django.core.cache import cache
+from django.db.models import Count, Max, Value
+from core.models import (
+    Agency, Batch, Category, Client, MeasureUnit, Payment, Product, Purchase,
+    Sale, SellingChannel, Supplier, User, Warehouse,
+)
+
+CACHE_TIMEOUT = 60 * 60
+
+# Models whose changes invalidate the cached reference data.
+REFERENCE_MODELS = (
+    Agency, Batch, Category, Client, MeasureUnit, Product, SellingChannel,
+    Supplier, Warehouse,
+)
+
+
+def get_choices(choices):
+    return [{'value': value, 'label': label} for value, label in choices]
+
+
+class ReferenceDataService:
+    """
+    The reference lists and choice tables are cached under the current
+    version, read from the database so every worker agrees on it whatever
+    the cache backend: stale payloads are never read again and expire on
+    their own.
+    """
+
+    @staticmethod
+    def get_version():
+        """
+        Fingerprint of the last `updated_at` (indexed) and the row count
+        of every reference model, read with one query: a save changes the
+        former and a deletion the latter.
+        """
+        first, *rest = [
+            # Grouped by a constant: one row per table, even when empty.
+            model.objects.order_by().annotate(
+                table=Value(model._meta.label),
+            ).values('table').annotate(
+                last=Max('updated_at'), total=Count('id'),
+            ).values_list('table', 'last', 'total')
+            for model in REFERENCE_MODELS
+        ]
+        rows = sorted(first.union(*rest, all=True), key=lambda row: row[0])
+        return hashlib.md5(repr(rows).encode()).hexdigest()
+
+    def get(self, version=None):
+        """Return (version, reference data), building it on a cache miss."""
+        version = version or self.get_version()
+        key = f'reference_data:{version}'
+        data = cache.get(key)
+        if data is None:
+            data = self.build()
+            cache.set(key, data, CACHE_TIMEOUT)
+        return version, data
+
+    def build(self):
+        """The lists of the `all` endpoints and the choice tables."""
+        def values(model, *fields):
+            return list(model.objects.order_by('-id').values('id', *fields))
+
+        return {
+            'agencies': values(Agency, 'name'),
+            'warehouses': values(Warehouse, 'name'),
+            'categories': values(Category, 'name'),
+            'batches': values(Batch, 'name'),
+            'measure_units': values(MeasureUnit, 'name'),
+            'selling_channels': values(SellingChannel, 'name'),
+            'clients': values(Client, 'name'),
+            'suppliers': values(Supplier, 'name'),
+            'products': values(Product, 'name', 'code', 'category__name'),
+            'choices': {
+                'agency_cities': get_choices(Agency.CITY_CHOICES),
+                'client_types': get_choices(Client.CLIENT_TYPE_CHOICES),
+                'user_types': get_choices(User.CHOICES),
+                'sale_statuses': get_choices(Sale.STATUS_CHOICES),
+                'sale_types': get_choices(Sale.SALE_TYPE_CHOICES),
+                'purchase_statuses': get_choices(Purchase.STATUS_CHOICES),
+                'purchase_types': get_choices(
+                    Purchase.PURCHASE_TYPE_CHOICES),
+                'payment_types': get_choices(Payment.PAYMENT_TYPE_CHOICES),
+                'payment_methods': get_choices(
+                    Payment.PAYMENT_METHOD_CHOICES),
+            },
+        }
@@ -0,0 +1,140 @@
+"""
+Service to maintain and query the search document of the list endpoints.
+"""
+import logging
+import re
+from django.db import connection
+from django.db.models import OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+from core.models import Client, Entry, Output, Purchase, Sale
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'spanish'
+
+# Fields concatenated in the search document of each model, the same the
+# viewsets searched with joins before.
+SEARCH_DOCUMENTS = {
+    Sale: (
+        'id', 'client__name', 'selling_channel__name', 'seller__first_name',
+        'seller__last_name', 'pre_invoice_number', 'invoice_number',
+    ),
+    Entry: (
+        'id', 'invoice_number', 'warehouse_keeper__first_name',
+        'warehouse_keeper__last_name', 'supplier__name',
+    ),
+    Output: (
+        'id', 'warehouse_keeper__first_name', 'warehouse_keeper__last_name',
+        'client__name',
+    ),
+    Purchase: (
+        'id', 'buyer__first_name', 'buyer__last_name', 'supplier__name',
+        'invoice_number',
+    ),
+    Client: ('id', 'name', 'phone', 'email', 'nit'),
+}
+
+
+def document_expression(paths):
+    """Expression concatenating the fields of the document."""
+    parts = []
+    for path in paths:
+        if parts:
+            parts.append(Value(' '))
+        parts.append(Coalesce(Cast(path, TextField()), Value('')))
+    return Concat(*parts, output_field=TextField())
+
+
+def get_terms(search):
+    """Split the search into words, dropping the tsquery operators."""
+    return re.findall(r'\w+', search.lower())
+
+
+class SearchService:
+    """
+    Every searchable row stores its search document, refreshed by the
+    signals of the row and of the related rows it copies names from. On
+    PostgreSQL the document is matched with a prefix tsquery against the
+    GIN index of its tsvector and ranked; other databases match every term
+    with icontains over the document column alone, without joins.
+    """
+
+    @staticmethod
+    def get_fields(model, lookup=None):
+        """
+        Fields of the model copied into its document, or with `lookup`,
+        fields of the related model copied through that relation.
+        """
+        fields = set()
+        for path in SEARCH_DOCUMENTS[model]:
+            first, _, rest = path.partition('__')
+            if lookup is None:
+                fields.add(first)
+            elif first == lookup and rest:
+                fields.add(rest.split('__')[0])
+        return fields
+
+    @staticmethod
+    def get_related_models():
+        """Models whose fields are copied into some search document."""
+        return {
+            searchable._meta.get_field(path.split('__')[0]).related_model
+            for searchable, paths in SEARCH_DOCUMENTS.items()
+            for path in paths if '__' in path
+        }
+
+    @staticmethod
+    def get_dependents(model):
+        """
+        Return (searchable model, lookup, fields) for each document copying
+        `fields` of `model` through the relation `lookup`.
+        """
+        dependents = []
+        for searchable, paths in SEARCH_DOCUMENTS.items():
+            lookups = {path.split('__')[0] for path in paths if '__' in path}
+            for lookup in sorted(lookups):
+                related = searchable._meta.get_field(lookup).related_model
+                if issubclass(model, related):
+                    dependents.append((
+                        searchable, lookup,
+                        SearchService.get_fields(searchable, lookup)))
+        return dependents
+
+    @staticmethod
+    def refresh(queryset):
+        """Rebuild the search document of the rows of the queryset."""
+        model = queryset.model
+        try:
+            document = model.objects.filter(pk=OuterRef('pk')).annotate(
+                document=document_expression(SEARCH_DOCUMENTS[model]),
+            ).values('document')[:1]
+            return queryset.update(search_document=Subquery(document))
+        except Exception as e:
+            logger.error(f"Error updating search documents: {e}")
+            raise
+
+    @staticmethod
+    def search(queryset, search):
+        """Filter the queryset by the search, best matches first."""
+        terms = get_terms(search)
+        if not terms:
+            return queryset
+        if connection.vendor != 'postgresql':
+            condition = Q()
+            for term in terms:
+                condition &= Q(search_document__icontains=term)
+            return queryset.filter(condition)
+
+        from django.contrib.postgres.search import (
+            SearchQuery, SearchRank, SearchVector,
+        )
+        # Same expression as the index, so the planner can use it.
+        vector = SearchVector('search_document', config=SEARCH_CONFIG)
+        query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            config=SEARCH_CONFIG, search_type='raw')
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.annotate(
+            search_vector=vector,
+            search_rank=SearchRank(vector, query),
+        ).filter(search_vector=query).order_by('-search_rank', *ordering)
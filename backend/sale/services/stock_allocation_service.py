@@ -0,0 +1,120 @@
+"""
+Service to split requested product quantities across product stocks.
+"""
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db.models import Case, IntegerField, Q, Value, When
+from core.models import ProductStock
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StockAllocationService:
+    POLICY_CHOICES = (
+        ('fifo', 'Primero el lote más antiguo'),
+        ('nearest', 'Almacén más cercano a la agencia'),
+        ('largest', 'Mayor stock disponible'),
+    )
+
+    def __init__(self, lines, agency=None, policy='fifo'):
+        self.lines = lines
+        self.agency = agency
+        self.policy = policy
+
+    def allocate(self):
+        """
+        Split the quantity of every line ({'product', 'quantity', ...})
+        across the available product stocks of its product, following the
+        allocation policy. All the candidate stocks are read with one
+        query; nothing is reserved, so the split is only a suggestion.
+        Returns the split lines with a `product_stock` and its `quantity`;
+        any other key of a line (e.g. unit_price) is copied to each of its
+        splits.
+        """
+        try:
+            product_ids = {
+                getattr(line['product'], 'id', line['product'])
+                for line in self.lines
+            }
+            stocks_by_product = {}
+            for product_stock in self._get_queryset(product_ids):
+                stocks_by_product.setdefault(
+                    product_stock.product_id, []).append(product_stock)
+
+            remaining = {}
+            allocations = []
+            for line in self.lines:
+                allocations.extend(
+                    self._split_line(line, stocks_by_product, remaining))
+
+            return allocations
+        except Exception as e:
+            logger.error(f"Error allocating product stock: {e}")
+            raise e
+
+    def _get_queryset(self, product_ids):
+        queryset = ProductStock.objects.filter(
+            product_id__in=product_ids,
+            available_stock__gt=0,
+        ).select_related('product', 'warehouse', 'batch')
+
+        if self.policy == 'fifo':
+            return queryset.order_by('batch__created_at', 'batch_id', 'id')
+        if self.policy == 'largest':
+            return queryset.order_by('-available_stock', 'id')
+        if self.policy == 'nearest':
+            if self.agency is None:
+                raise ValidationError(
+                    "La agencia es requerida para asignar por cercanía.")
+            # A blank location or city would match every warehouse.
+            nearby = Q()
+            location = (self.agency.location or '').strip()
+            city = (self.agency.city or '').strip()
+            if location:
+                nearby |= Q(warehouse__location__iexact=location)
+            if city:
+                nearby |= Q(warehouse__location__icontains=city)
+            if not nearby:
+                return queryset.order_by('batch__created_at', 'id')
+            return queryset.annotate(
+                distance=Case(
+                    When(nearby, then=Value(0)),
+                    default=Value(1),
+                    output_field=IntegerField(),
+                )
+            ).order_by('distance', 'batch__created_at', 'id')
+        raise ValidationError(
+            f'Política de asignación no válida: {self.policy}')
+
+    def _split_line(self, line, stocks_by_product, remaining):
+        """Take the line quantity from the product stocks in order."""
+        product_id = getattr(line['product'], 'id', line['product'])
+        quantity = Decimal(str(line['quantity']))
+        extra = {
+            key: value for key, value in line.items()
+            if key not in ('product', 'quantity')
+        }
+
+        splits = []
+        for product_stock in stocks_by_product.get(product_id, []):
+            if quantity <= 0:
+                break
+            available = remaining.get(
+                product_stock.id, product_stock.available_stock)
+            if available <= 0:
+                continue
+            taken = min(available, quantity)
+            remaining[product_stock.id] = available - taken
+            quantity -= taken
+            splits.append({
+                **extra,
+                'product_stock': product_stock,
+                'quantity': taken,
+            })
+
+        if quantity > 0:
+            raise ValidationError(
+                "No hay stock disponible suficiente para el producto "
+                f"{product_id}.")
+        return splits
@@ -0,0 +1,87 @@
+"""
+Service to write product stocks relying on the database check constraints.
+"""
+from contextlib import contextmanager
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from core.models import ProductStock
+import logging
+
+logger = logging.getLogger(__name__)
+
+STOCK_CONSTRAINT_MESSAGES = {
+    'productstock_stock_non_negative': (
+        "La cantidad excede el stock disponible."),
+    'productstock_reserved_stock_non_negative': (
+        "La cantidad excede el stock reservado."),
+    'productstock_available_stock_non_negative': (
+        "La cantidad excede el stock disponible/real."),
+    'productstock_damaged_stock_non_negative': (
+        "El stock dañado no puede ser negativo."),
+    'productstock_available_stock_balance': (
+        "El stock disponible debe ser igual al stock menos el "
+        "reservado y el dañado."),
+    'productstock_minimum_lte_maximum': (
+        "El stock mínimo no puede ser mayor al stock máximo."),
+}
+
+
+def get_stock_constraint_message(error, messages=None):
+    """
+    Return the validation message of the ProductStock check constraint
+    violated by `error`, or None if it is not one of them. `messages`
+    overrides the default message of some constraints.
+    """
+    messages = {**STOCK_CONSTRAINT_MESSAGES, **(messages or {})}
+    for name, message in messages.items():
+        if name in str(error):
+            return message
+    return None
+
+
+@contextmanager
+def stock_constraint_errors(messages=None):
+    """
+    Run the block in a savepoint and raise the ProductStock check
+    constraint violations as ValidationError with their message.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as e:
+        message = get_stock_constraint_message(e, messages)
+        if message is None:
+            raise
+        raise ValidationError(message)
+
+
+class GuardedStockUpdateService:
+    def __init__(self, product_stock_id, messages=None):
+        self.product_stock_id = product_stock_id
+        self.messages = messages
+
+    def increment(self, **deltas):
+        """
+        Add the given quantities (negative to subtract) to the product
+        stock fields with a single UPDATE. No previous read is needed: the
+        check constraints reject the update if a bucket would become
+        negative or unbalanced.
+        """
+        try:
+            values = {
+                field: F(field) + Decimal(str(quantity))
+                for field, quantity in deltas.items()
+            }
+            with stock_constraint_errors(self.messages):
+                updated = ProductStock.objects.filter(
+                    id=self.product_stock_id).update(
+                        version=F('version') + 1, updated_at=timezone.now(),
+                        **values)
+            if updated == 0:
+                raise ValidationError("El stock del producto no existe.")
+        except Exception as e:
+            logger.error(f"Error updating product stock: {e}")
+            raise e
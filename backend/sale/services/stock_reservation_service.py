@@ -0,0 +1,57 @@
+"""
+Service to release the stock reserved by sales.
+"""
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import (
+    DecimalField, Exists, F, OuterRef, Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from core.models import ProductStock, StockReservation
+from sale.services.stock_constraint_service import stock_constraint_errors
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StockReservationService:
+    def __init__(self, reservations):
+        self.reservations = reservations
+
+    @transaction.atomic
+    def release(self):
+        """
+        Release the active reservations of the queryset: the quantity they
+        still hold goes back from the reserved to the available stock
+        of every product stock with one UPDATE, and the reservations are
+        marked as released with another. Returns the released count.
+        """
+        try:
+            active = StockReservation.objects.filter(
+                id__in=self.reservations.filter(
+                    status='activa').values('id'))
+            pending = active.filter(
+                product_stock=OuterRef('pk'),
+                quantity__gt=0,
+            )
+            released = Coalesce(
+                Subquery(
+                    pending.values('product_stock').annotate(
+                        total=Sum('quantity'),
+                    ).values('total')[:1]),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+            with stock_constraint_errors():
+                ProductStock.objects.filter(Exists(pending)).update(
+                    reserved_stock=F('reserved_stock') - released,
+                    available_stock=F('available_stock') + released,
+                    version=F('version') + 1,
+                    updated_at=timezone.now(),
+                )
+            return active.update(
+                status='liberada', released_at=timezone.now())
+        except Exception as e:
+            logger.error(f"Error releasing stock reservations: {e}")
+            raise e
@@ -0,0 +1,99 @@
+"""
+Service to update a product stock with optimistic concurrency control.
+"""
+import random
+import time
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.utils import timezone
+from core.models import ProductStock
+from sale.services.stock_constraint_service import stock_constraint_errors
+import logging
+
+logger = logging.getLogger(__name__)
+
+STOCK_CONFLICT_MESSAGE = (
+    "El stock fue modificado por otro usuario, intente nuevamente.")
+
+# Fields a change may modify; `version` and `updated_at` are set here.
+STOCK_FIELDS = tuple(
+    field.attname for field in ProductStock._meta.concrete_fields
+    if not field.primary_key and field.attname not in (
+        'version', 'updated_at'))
+
+
+class OptimisticStockUpdateService:
+    MAX_RETRIES = 10
+    BACKOFF_SECONDS = 0.005
+
+    def __init__(self, product_stock_id, max_retries=MAX_RETRIES):
+        self.product_stock_id = product_stock_id
+        self.max_retries = max_retries
+        self.attempts = 0
+
+    def apply(self, change):
+        """
+        Read the product stock, let `change` modify it in memory and write
+        the modified fields only if nobody else wrote the row in between
+        (compare-and-swap on `version`). On conflict the row is read again
+        and `change` re-applied, up to `max_retries` times. `change` may
+        raise ValidationError to reject the update. Returns the updated
+        ProductStock.
+        """
+        self.attempts = 0
+        while self.attempts < self.max_retries:
+            self.attempts += 1
+            try:
+                product_stock = ProductStock.objects.get(
+                    id=self.product_stock_id)
+            except ProductStock.DoesNotExist:
+                raise ValidationError("El stock del producto no existe.")
+            current_version = product_stock.version
+            original = {
+                field: getattr(product_stock, field) for field in STOCK_FIELDS
+            }
+
+            change(product_stock)
+
+            changed = {
+                field: getattr(product_stock, field)
+                for field in STOCK_FIELDS
+                if getattr(product_stock, field) != original[field]
+            }
+            if not changed:
+                return product_stock
+
+            with stock_constraint_errors():
+                updated = ProductStock.objects.filter(
+                    id=self.product_stock_id, version=current_version,
+                ).update(
+                    version=F('version') + 1, updated_at=timezone.now(),
+                    **changed)
+            if updated:
+                product_stock.version = current_version + 1
+                return product_stock
+
+            # Another writer won the race: back off with jitter and retry.
+            time.sleep(
+                random.uniform(0, self.BACKOFF_SECONDS * self.attempts))
+
+        logger.error(
+            f"Error updating product stock {self.product_stock_id}: "
+            f"too many concurrent updates")
+        raise ValidationError(STOCK_CONFLICT_MESSAGE)
+
+    def increment(self, **deltas):
+        """Add the given quantities to the product stock fields."""
+        deltas = {
+            field: Decimal(str(quantity))
+            for field, quantity in deltas.items()
+        }
+
+        def change(product_stock):
+            for field, quantity in deltas.items():
+                setattr(
+                    product_stock, field,
+                    getattr(product_stock, field) + quantity)
+
+        return self.apply(change)
@@ -0,0 +1,103 @@
+"""
+Service for the delta sync of the list endpoints.
+"""
+import logging
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from core.models import (
+    Agency, Batch, Category, Client, DeletedRecord, Entry, InventoryCount,
+    MeasureUnit, Output, Payment, Product, ProductChannelPrice, ProductStock,
+    Purchase, Sale, SellingChannel, Supplier, Transfer, Warehouse,
+)
+
+logger = logging.getLogger(__name__)
+
+# Models served by the list endpoints whose deletions leave a tombstone.
+SYNC_MODELS = (
+    Agency, Batch, Category, Client, Entry, InventoryCount, MeasureUnit,
+    Output, Payment, Product, ProductChannelPrice, ProductStock, Purchase,
+    Sale, SellingChannel, Supplier, Transfer, Warehouse,
+)
+
+
+class SyncService:
+    """
+    A sync token is the time a list was read. Rows saved since then carry
+    a later `updated_at` (indexed) and deleted rows a DeletedRecord, so a
+    client sends back its last token and only receives those.
+
+    `updated_at` is set when a row is saved, not when its transaction
+    commits, so the token goes SYNC_TOKEN_OVERLAP_SECONDS back and the
+    rows of that window are sent twice rather than never.
+    """
+
+    @staticmethod
+    def new_token():
+        """
+        Token of a sync starting now, to send on the next one. In UTC with
+        a Z suffix, so it travels in a query string without escaping.
+        """
+        since = timezone.now() - timedelta(
+            seconds=settings.SYNC_TOKEN_OVERLAP_SECONDS)
+        return since.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    @staticmethod
+    def parse_token(value):
+        """Return the time of the token, or None for a full sync."""
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if not isinstance(since, datetime):
+            raise ValidationError({
+                'updated_since': 'El token de sincronización no es válido.'})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        if since < SyncService.get_retention_limit():
+            # The tombstones of the deletions since then may be pruned.
+            raise ValidationError({
+                'updated_since': (
+                    'El token de sincronización expiró, inicie una '
+                    'sincronización completa.')})
+        return since
+
+    @staticmethod
+    def get_retention_limit():
+        """Time before which the tombstones are pruned."""
+        return timezone.now() - timedelta(
+            days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    @staticmethod
+    def record_deletion(model, object_id):
+        try:
+            return DeletedRecord.objects.create(
+                model=model._meta.model_name, object_id=object_id)
+        except Exception as e:
+            logger.error(f"Error recording deleted row: {e}")
+            raise
+
+    @staticmethod
+    def get_deleted(model, since):
+        """Ids of the rows of the model deleted since the time given."""
+        if since is None:
+            return []
+        return list(DeletedRecord.objects.filter(
+            model=model._meta.model_name, deleted_at__gte=since,
+        ).order_by('object_id').values_list(
+            'object_id', flat=True).distinct())
+
+    @staticmethod
+    def prune():
+        """Delete the tombstones older than the retention days."""
+        try:
+            deleted, _ = DeletedRecord.objects.filter(
+                deleted_at__lt=SyncService.get_retention_limit()).delete()
+            return deleted
+        except Exception as e:
+            logger.error(f"Error pruning deleted rows: {e}")
+            raise
@@ -0,0 +1,174 @@
+"""
+Service to move product stock between warehouses.
+"""
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from core.models import ProductStock, TransferItem
+from sale.services.stock_constraint_service import (
+    get_stock_constraint_message)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TransferService:
+    def __init__(self, transfer, items_data):
+        self.transfer = transfer
+        self.items_data = items_data
+
+    @transaction.atomic
+    def transfer_items(self):
+        """
+        Move every line ({'product_stock', 'quantity'}) from the source
+        warehouse to the destination warehouse in one transaction: the
+        source and destination stocks of the same product and batch are
+        locked with one query, the missing destination stocks are
+        inserted (skipping the ones created meanwhile by another request)
+        and locked, every stock is updated with one UPDATE and one
+        TransferItem is recorded per line. Returns the created transfer
+        items.
+        """
+        try:
+            if (self.transfer.source_warehouse_id
+                    == self.transfer.destination_warehouse_id):
+                raise ValidationError(
+                    "El almacén de origen y destino no pueden ser el mismo.")
+
+            lines = [self._build_line(item) for item in self.items_data]
+            if not lines:
+                raise ValidationError(
+                    "El traspaso debe tener al menos un item.")
+            sources, destinations = self._lock(
+                {line['product_stock'] for line in lines})
+
+            incoming = {}
+            for line in lines:
+                source = sources[line['product_stock']]
+                if source.available_stock - line['quantity'] < 0:
+                    raise ValidationError(
+                        "La cantidad excede el stock disponible.")
+                source.stock -= line['quantity']
+                source.available_stock -= line['quantity']
+                key = (source.product_id, source.batch_id)
+                incoming[key] = incoming.get(key, 0) + line['quantity']
+
+            missing = [
+                source for source in sources.values()
+                if (source.product_id, source.batch_id) not in destinations
+            ]
+            if missing:
+                destinations.update(self._create_destinations(missing))
+            for key, quantity in incoming.items():
+                destinations[key].stock += quantity
+                destinations[key].available_stock += quantity
+
+            self._save_stocks(
+                [*sources.values(), *destinations.values()])
+
+            return TransferItem.objects.bulk_create([
+                TransferItem(
+                    transfer=self.transfer,
+                    product_stock=sources[line['product_stock']],
+                    destination_product_stock=destinations[(
+                        sources[line['product_stock']].product_id,
+                        sources[line['product_stock']].batch_id,
+                    )],
+                    quantity=line['quantity'],
+                )
+                for line in lines
+            ])
+        except Exception as e:
+            logger.error(f"Error transferring product stock: {e}")
+            raise e
+
+    def _build_line(self, item_data):
+        product_stock = item_data['product_stock']
+        quantity = Decimal(str(item_data.get('quantity', 0)))
+        if quantity <= 0:
+            raise ValidationError("La cantidad debe ser mayor a 0.")
+        return {
+            'product_stock': getattr(product_stock, 'id', product_stock),
+            'quantity': quantity,
+        }
+
+    def _lock(self, ids):
+        """
+        Lock the source stocks and the destination stocks of their product
+        batches in one query ordered by id, so transfers in opposite
+        directions lock their rows in the same order and can't deadlock.
+        Returns the sources by id and the destinations by product batch.
+        """
+        same_batch = ProductStock.objects.filter(
+            id__in=ids,
+            product_id=OuterRef('product_id'),
+            batch_id=OuterRef('batch_id'),
+        )
+        rows = ProductStock.objects.select_for_update().filter(
+            Q(id__in=ids)
+            | Q(Exists(same_batch),
+                warehouse_id=self.transfer.destination_warehouse_id),
+        ).order_by('id')
+
+        sources, destinations = {}, {}
+        for product_stock in rows:
+            if product_stock.id in ids:
+                sources[product_stock.id] = product_stock
+            else:
+                destinations[(
+                    product_stock.product_id, product_stock.batch_id,
+                )] = product_stock
+        if len(sources) != len(ids):
+            raise ValidationError(
+                "Uno de los items del traspaso ya no existe.")
+        for product_stock in sources.values():
+            if (product_stock.warehouse_id
+                    != self.transfer.source_warehouse_id):
+                raise ValidationError(
+                    f"El stock {product_stock.id} no pertenece al almacén "
+                    f"de origen.")
+        return sources, destinations
+
+    def _create_destinations(self, sources):
+        """
+        Insert empty destination stocks for the product batches of the
+        sources, skipping the ones another request created since the
+        lock, and lock them all.
+        """
+        ProductStock.objects.bulk_create([
+            ProductStock(
+                warehouse_id=self.transfer.destination_warehouse_id,
+                product_id=source.product_id,
+                batch_id=source.batch_id,
+                minimum_stock=source.minimum_stock,
+                maximum_stock=source.maximum_stock,
+            )
+            for source in sources
+        ], ignore_conflicts=True)
+        keys = Q()
+        for source in sources:
+            keys |= Q(product_id=source.product_id, batch_id=source.batch_id)
+        return {
+            (product_stock.product_id, product_stock.batch_id): product_stock
+            for product_stock in ProductStock.objects.select_for_update(
+            ).filter(
+                keys, warehouse_id=self.transfer.destination_warehouse_id,
+            ).order_by('id')
+        }
+
+    def _save_stocks(self, stocks):
+        now = timezone.now()
+        for stock in stocks:
+            stock.version += 1
+            stock.updated_at = now
+        try:
+            ProductStock.objects.bulk_update(
+                stocks, ['stock', 'available_stock', 'version', 'updated_at'])
+        except IntegrityError as e:
+            # The whole transfer is rolled back, no savepoint needed.
+            message = get_stock_constraint_message(e)
+            if message is None:
+                raise
+            raise ValidationError(message)
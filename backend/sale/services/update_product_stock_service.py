@@ -4,6 +4,7 @@ Service to update product stock when an entry is updated
 
 from decimal import Decimal
 from django.core.exceptions import ValidationError
+from sale.services.stock_version_service import OptimisticStockUpdateService
 
 
 class UpdateProductStockService:
@@ -29,13 +30,8 @@ class UpdateProductStockService:
                         or actual_item_quantity < previous_item_quantity):
                     new_item_quantity = Decimal(str(
                         actual_item_quantity - previous_item_quantity))
-                    if (product_stock.stock + new_item_quantity
-                            > product_stock.maximum_stock):
-                        raise ValidationError(
-                            'El nuevo stock no puede ser mayor '
-                            'al máximo permitido.')
-                    product_stock.stock += new_item_quantity
-                    product_stock.save()
+                    OptimisticStockUpdateService(product_stock.id).apply(
+                        self._increase_stock(new_item_quantity))
         except Exception as e:
             raise e
 
@@ -57,12 +53,31 @@ class UpdateProductStockService:
                         or actual_item_quantity < previous_item_quantity):
                     new_item_quantity = Decimal(str(
                         actual_item_quantity - previous_item_quantity))
-                    if (product_stock.stock - new_item_quantity
-                            < product_stock.minimum_stock):
-                        raise ValidationError(
-                            'El nuevo stock no puede ser menor '
-                            'al mínimo permitido.')
-                    product_stock.stock -= new_item_quantity
-                    product_stock.save()
+                    bucket = (
+                        'reserved_stock' if item.sale_item_id
+                        else 'available_stock')
+                    OptimisticStockUpdateService(product_stock.id).apply(
+                        self._decrease_stock(new_item_quantity, bucket))
         except Exception as e:
             raise e
+
+    def _increase_stock(self, quantity):
+        def change(product_stock):
+            if product_stock.stock + quantity > product_stock.maximum_stock:
+                raise ValidationError(
+                    'El nuevo stock no puede ser mayor '
+                    'al máximo permitido.')
+            product_stock.stock += quantity
+            product_stock.available_stock += quantity
+        return change
+
+    def _decrease_stock(self, quantity, bucket):
+        def change(product_stock):
+            if product_stock.stock - quantity < product_stock.minimum_stock:
+                raise ValidationError(
+                    'El nuevo stock no puede ser menor '
+                    'al mínimo permitido.')
+            product_stock.stock -= quantity
+            setattr(product_stock, bucket,
+                    getattr(product_stock, bucket) - quantity)
+        return change
@@ -1,8 +1,12 @@
 """
 Service to update a sale/purchase balance_due when a payment is done.
 """
+from decimal import Decimal
 from django.core.exceptions import ValidationError
-from core.models import Purchase, Sale
+from django.db.models import Count, DateField, F, Max, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from core.models import PAYMENT_METHOD_BITS, Payment, Purchase, Sale
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,7 +33,7 @@ class UpdateTransactionService:
                 raise ValidationError('El pago excede el saldo pendiente.')
 
             transaction.balance_due -= self.payment_amount
-            transaction.save(update_fields=['balance_due'])
+            transaction.save(update_fields=['balance_due', 'updated_at'])
         except Exception as e:
             logger.error(f"Error updating transaction balance due: {e}")
             raise e
@@ -50,7 +54,76 @@ class UpdateTransactionService:
                 raise ValidationError('El pago excede el total de la venta.')
 
             transaction.credit_balance += self.payment_amount
-            transaction.save(update_fields=['credit_balance'])
+            transaction.save(update_fields=['credit_balance', 'updated_at'])
         except Exception as e:
             logger.error(f"Error updating transaction credit balance: {e}")
             raise e
+
+    def update_transaction_payment_summary(self, payment_date, payment_method):
+        """
+        Add the payment to the payment summary of the transaction (amount
+        paid, count, last date and methods) with a single UPDATE.
+        """
+        try:
+            if self.transaction_type == 'compra':
+                model = Purchase
+            elif self.transaction_type == 'venta':
+                model = Sale
+            else:
+                raise ValidationError(
+                    f'Tipo de transacción no válido: {self.transaction_type}')
+
+            date = Value(payment_date, output_field=DateField())
+            updated = model.objects.filter(id=self.transaction_id).update(
+                amount_paid=F('amount_paid') + self.payment_amount,
+                payment_count=F('payment_count') + 1,
+                last_payment_date=Greatest(
+                    Coalesce('last_payment_date', date), date),
+                payment_methods=F('payment_methods').bitor(
+                    PAYMENT_METHOD_BITS.get(payment_method, 0)),
+                updated_at=timezone.now(),
+            )
+            if updated == 0:
+                raise ValidationError('La transacción no existe.')
+        except Exception as e:
+            logger.error(f"Error updating transaction payment summary: {e}")
+            raise e
+
+    def refresh_transaction_payment_summary(self):
+        """
+        Recompute the payment summary of the transaction from all of its
+        payments, when one of them is edited or moved to another one.
+        """
+        try:
+            if self.transaction_type == 'compra':
+                model = Purchase
+            elif self.transaction_type == 'venta':
+                model = Sale
+            else:
+                raise ValidationError(
+                    f'Tipo de transacción no válido: {self.transaction_type}')
+
+            payments = Payment.objects.filter(
+                transaction_type=self.transaction_type,
+                transaction_id=self.transaction_id,
+            ).order_by()
+            summary = payments.aggregate(
+                amount_paid=Coalesce(Sum('amount'), Value(Decimal('0'))),
+                payment_count=Count('id'),
+                last_payment_date=Max('payment_date'),
+            )
+            methods = {
+                PAYMENT_METHOD_BITS.get(method, 0)
+                for method in payments.values_list(
+                    'payment_method', flat=True).distinct()
+            }
+            updated = model.objects.filter(id=self.transaction_id).update(
+                payment_methods=sum(methods),
+                updated_at=timezone.now(),
+                **summary,
+            )
+            if updated == 0:
+                raise ValidationError('La transacción no existe.')
+        except Exception as e:
+            logger.error(f"Error refreshing transaction payment summary: {e}")
+            raise e
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from sale.services.search_service import SEARCH_DOCUMENTS, SearchService
+from sale.services.sync_service import SYNC_MODELS, SyncService
+
+
+def refresh_search_document(sender, instance, update_fields=None, **kwargs):
+    """Rebuild the search document of a searchable row after its save."""
+    if update_fields and not SearchService.get_fields(sender) & set(
+            update_fields):
+        return
+    SearchService.refresh(sender.objects.filter(pk=instance.pk))
+
+
+def refresh_dependent_search_documents(
+        sender, instance, created, update_fields=None, **kwargs):
+    """Copy the new names of a related row into the search documents."""
+    if created:
+        return
+    for model, lookup, fields in SearchService.get_dependents(sender):
+        if update_fields and not fields & set(update_fields):
+            continue
+        SearchService.refresh(model.objects.filter(**{lookup: instance}))
+
+
+for model in SEARCH_DOCUMENTS:
+    post_save.connect(refresh_search_document, sender=model)
+for model in SearchService.get_related_models():
+    post_save.connect(refresh_dependent_search_documents, sender=model)
+
+
+def record_deletion(sender, instance, **kwargs):
+    """Leave a tombstone so the delta sync reports the deleted row."""
+    SyncService.record_deletion(sender, instance.pk)
+
+
+for model in SYNC_MODELS:
+    post_delete.connect(record_deletion, sender=model)
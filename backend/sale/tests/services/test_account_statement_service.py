@@ -0,0 +1,153 @@
+"""
+Tests for the account statement service.
+"""
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from core.models import (
+    Agency, Client, Payment, Purchase, Sale, SellingChannel, Supplier,
+)
+from sale.services.account_statement_service import AccountStatementService
+import uuid
+
+
+def create_user():
+    unique_suffix = str(uuid.uuid4())[:8]
+    agency = Agency.objects.create(
+        name=f'Agency {unique_suffix}',
+        location='Test location',
+        city='La Paz',
+    )
+    return get_user_model().objects.create_user(
+        email=f'user{unique_suffix}@example.com',
+        password='testpass123',
+        ci=f'CI{unique_suffix}',
+        agency=agency,
+    )
+
+
+def create_sale(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    seller = create_user()
+    defaults = {
+        'agency': seller.agency,
+        'seller': seller,
+        'client': Client.objects.create(
+            name=f'Client {unique_suffix}',
+            phone='78885521',
+            nit=f'NIT{unique_suffix}',
+            email=f'client{unique_suffix}@example.com',
+            address='Test Address 123',
+        ),
+        'selling_channel': SellingChannel.objects.create(
+            name=f'Channel {unique_suffix}'),
+        'status': 'realizado',
+        'sale_type': 'credito',
+        'sale_date': date(2025, 1, 1),
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+def create_purchase(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    buyer = create_user()
+    defaults = {
+        'agency': buyer.agency,
+        'buyer': buyer,
+        'supplier': Supplier.objects.create(
+            name=f'Supplier {unique_suffix}',
+            phone='12345678',
+            nit=f'NIT-{unique_suffix}',
+            email=f'supplier{unique_suffix}@example.com',
+            address='Test Address',
+        ),
+        'purchase_type': 'credito',
+        'purchase_date': date(2025, 1, 1),
+        'invoice_number': str(uuid.uuid4().int)[:10],
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Purchase.objects.create(**defaults)
+
+
+def create_payment(transaction, transaction_type='venta', **params):
+    defaults = {
+        'transaction_id': transaction.id,
+        'transaction_type': transaction_type,
+        'payment_method': 'efectivo',
+        'amount': 40,
+        'payment_date': date(2025, 2, 1),
+    }
+    defaults.update(params)
+    return Payment.objects.create(**defaults)
+
+
+class TestAccountStatementService(TestCase):
+    """Tests for the client and supplier statements."""
+
+    def setUp(self):
+        self.sale = create_sale(sale_date=date(2025, 1, 1), total=100)
+        self.customer = self.sale.client
+        create_payment(self.sale, amount=30, payment_date=date(2025, 1, 5))
+        second_sale = create_sale(
+            client=self.customer, sale_date=date(2025, 1, 5), total=50)
+        create_payment(
+            second_sale, amount=50, payment_method='qr',
+            payment_date=date(2025, 1, 10))
+        # Not part of the statement.
+        create_sale(client=self.customer, status='proforma')
+        create_payment(create_sale(), amount=10)
+
+    def test_statement_running_balance(self):
+        """Test charges and payments are merged with a running balance."""
+        with self.assertNumQueries(1):
+            rows, total = AccountStatementService(
+                'client', self.customer.id).get_page(10)
+
+        self.assertEqual(total, 4)
+        self.assertEqual(
+            [(row['type'], row['date'], row['balance']) for row in rows],
+            [
+                ('venta', date(2025, 1, 1), Decimal('100.00')),
+                ('venta', date(2025, 1, 5), Decimal('150.00')),
+                ('pago', date(2025, 1, 5), Decimal('120.00')),
+                ('pago', date(2025, 1, 10), Decimal('70.00')),
+            ])
+        self.assertEqual(rows[3]['credit'], Decimal('50.00'))
+        self.assertEqual(rows[3]['payment_method'], 'qr')
+
+    def test_statement_page_keeps_running_balance(self):
+        """Test a later page carries the balance of the previous ones."""
+        rows, total = AccountStatementService(
+            'client', self.customer.id).get_page(2, offset=2)
+
+        self.assertEqual(total, 4)
+        self.assertEqual(
+            [row['balance'] for row in rows],
+            [Decimal('120.00'), Decimal('70.00')])
+
+    def test_statement_past_the_end(self):
+        """Test the total is still returned past the last page."""
+        rows, total = AccountStatementService(
+            'client', self.customer.id).get_page(10, offset=10)
+
+        self.assertEqual(rows, [])
+        self.assertEqual(total, 4)
+
+    def test_supplier_statement(self):
+        """Test the supplier statement uses purchases and their payments."""
+        purchase = create_purchase(
+            purchase_date=date(2025, 1, 1), total=80)
+        create_payment(purchase, 'compra', amount=80)
+
+        rows, total = AccountStatementService(
+            'supplier', purchase.supplier_id).get_page(10)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(rows[0]['type'], 'compra')
+        self.assertEqual(rows[-1]['balance'], Decimal('0.00'))
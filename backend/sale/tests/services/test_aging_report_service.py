@@ -0,0 +1,139 @@
+"""
+Tests for the aging report service.
+"""
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from core.models import (
+    Agency, Client, Purchase, Sale, SellingChannel, Supplier,
+)
+from sale.services.aging_report_service import AgingReportService
+import uuid
+
+AS_OF = date(2025, 6, 30)
+
+
+def days_ago(days):
+    return AS_OF - timedelta(days=days)
+
+
+def create_user():
+    unique_suffix = str(uuid.uuid4())[:8]
+    agency = Agency.objects.create(
+        name=f'Agency {unique_suffix}',
+        location='Test location',
+        city='La Paz',
+    )
+    return get_user_model().objects.create_user(
+        email=f'user{unique_suffix}@example.com',
+        password='testpass123',
+        ci=f'CI{unique_suffix}',
+        agency=agency,
+    )
+
+
+def create_sale(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    seller = create_user()
+    defaults = {
+        'agency': seller.agency,
+        'seller': seller,
+        'client': Client.objects.create(
+            name=f'Client {unique_suffix}',
+            phone='78885521',
+            nit=f'NIT{unique_suffix}',
+            email=f'client{unique_suffix}@example.com',
+            address='Test Address 123',
+        ),
+        'selling_channel': SellingChannel.objects.create(
+            name=f'Channel {unique_suffix}'),
+        'status': 'realizado',
+        'sale_type': 'credito',
+        'sale_date': date(2025, 1, 1),
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+def create_purchase(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    buyer = create_user()
+    defaults = {
+        'agency': buyer.agency,
+        'buyer': buyer,
+        'supplier': Supplier.objects.create(
+            name=f'Supplier {unique_suffix}',
+            phone='12345678',
+            nit=f'NIT-{unique_suffix}',
+            email=f'supplier{unique_suffix}@example.com',
+            address='Test Address',
+        ),
+        'purchase_type': 'credito',
+        'purchase_date': date(2025, 1, 1),
+        'invoice_number': str(uuid.uuid4().int)[:10],
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Purchase.objects.create(**defaults)
+
+
+class TestAgingReportService(TestCase):
+    """Tests for the receivable and payable aging."""
+
+    def test_receivables_by_bucket(self):
+        """Test open credit sales are split by age per client."""
+        sale = create_sale(sale_date=days_ago(10), balance_due=100)
+        client = sale.client
+        create_sale(client=client, sale_date=days_ago(30), balance_due=20)
+        create_sale(client=client, sale_date=days_ago(45), balance_due=30)
+        create_sale(client=client, sale_date=days_ago(90), balance_due=40)
+        create_sale(client=client, sale_date=days_ago(91), balance_due=50)
+        create_sale(client=client, sale_date=days_ago(5), balance_due=0)
+        create_sale(
+            client=client, sale_date=days_ago(5), sale_type='contado')
+        create_sale(
+            client=client, sale_date=days_ago(5), status='proforma')
+
+        with self.assertNumQueries(1):
+            rows = AgingReportService(AS_OF).get_receivables()
+
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual(row['party_id'], client.id)
+        self.assertEqual(row['party_name'], client.name)
+        self.assertEqual(row['current'], 120)
+        self.assertEqual(row['days_31_60'], 30)
+        self.assertEqual(row['days_61_90'], 40)
+        self.assertEqual(row['over_90'], 50)
+        self.assertEqual(row['total'], 240)
+
+    def test_receivables_ordered_by_total(self):
+        """Test the clients owing the most come first."""
+        small = create_sale(balance_due=10, sale_date=days_ago(1))
+        large = create_sale(balance_due=90, sale_date=days_ago(1))
+
+        rows = AgingReportService(AS_OF).get_receivables()
+
+        self.assertEqual(
+            [row['party_id'] for row in rows],
+            [large.client_id, small.client_id])
+
+    def test_payables_by_bucket(self):
+        """Test open credit purchases are split by age per supplier."""
+        purchase = create_purchase(
+            purchase_date=days_ago(70), balance_due=60)
+        create_purchase(
+            supplier=purchase.supplier, purchase_date=days_ago(0),
+            balance_due=15)
+        create_purchase(purchase_type='contado', purchase_date=days_ago(3))
+
+        rows = AgingReportService(AS_OF).get_payables()
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['party_id'], purchase.supplier_id)
+        self.assertEqual(rows[0]['current'], 15)
+        self.assertEqual(rows[0]['days_61_90'], 60)
+        self.assertEqual(rows[0]['total'], 75)
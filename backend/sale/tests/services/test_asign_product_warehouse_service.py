@@ -102,6 +102,7 @@ class TestAssignProductWarehouseService(TestCase):
             warehouse=self.warehouse,
             batch=self.batch,
             stock=20,
+            reserved_stock=5,
             available_stock=15,
         )
 
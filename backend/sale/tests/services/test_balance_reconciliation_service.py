@@ -0,0 +1,184 @@
+"""
+Tests for the balance reconciliation service.
+"""
+from datetime import date
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from core.models import (
+    Agency, Client, Payment, Purchase, Sale, SellingChannel, Supplier,
+)
+from sale.services.balance_reconciliation_service import (
+    BalanceReconciliationService,
+)
+import uuid
+
+NO_DRIFT = {
+    'venta': {'total': 0, 'rows': []},
+    'compra': {'total': 0, 'rows': []},
+}
+
+
+def create_user():
+    unique_suffix = str(uuid.uuid4())[:8]
+    agency = Agency.objects.create(
+        name=f'Agency {unique_suffix}',
+        location='Test location',
+        city='La Paz',
+    )
+    return get_user_model().objects.create_user(
+        email=f'user{unique_suffix}@example.com',
+        password='testpass123',
+        ci=f'CI{unique_suffix}',
+        agency=agency,
+    )
+
+
+def create_sale(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    seller = create_user()
+    defaults = {
+        'agency': seller.agency,
+        'seller': seller,
+        'client': Client.objects.create(
+            name=f'Client {unique_suffix}',
+            phone='78885521',
+            nit=f'NIT{unique_suffix}',
+            email=f'client{unique_suffix}@example.com',
+            address='Test Address 123',
+        ),
+        'selling_channel': SellingChannel.objects.create(
+            name=f'Channel {unique_suffix}'),
+        'status': 'realizado',
+        'sale_type': 'credito',
+        'sale_date': date(2025, 1, 1),
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+def create_purchase(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    buyer = create_user()
+    defaults = {
+        'agency': buyer.agency,
+        'buyer': buyer,
+        'supplier': Supplier.objects.create(
+            name=f'Supplier {unique_suffix}',
+            phone='12345678',
+            nit=f'NIT-{unique_suffix}',
+            email=f'supplier{unique_suffix}@example.com',
+            address='Test Address',
+        ),
+        'purchase_type': 'credito',
+        'purchase_date': date(2025, 1, 1),
+        'invoice_number': str(uuid.uuid4().int)[:10],
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Purchase.objects.create(**defaults)
+
+
+def create_payment(transaction, transaction_type='venta', **params):
+    defaults = {
+        'transaction_id': transaction.id,
+        'transaction_type': transaction_type,
+        'payment_method': 'efectivo',
+        'amount': 40,
+        'payment_date': date(2025, 2, 1),
+    }
+    defaults.update(params)
+    return Payment.objects.create(**defaults)
+
+
+class TestBalanceReconciliationService(TestCase):
+    """Tests for reconciling balances with payments."""
+
+    def setUp(self):
+        self.service = BalanceReconciliationService()
+
+    def test_consistent_transactions_have_no_drift(self):
+        """Test balances matching their payments are not reported."""
+        sale = create_sale(
+            balance_due=70, credit_balance=10, amount_paid=40,
+            payment_count=1)
+        create_payment(sale)
+        purchase = create_purchase(
+            balance_due=60, amount_paid=40, payment_count=1)
+        create_payment(purchase, 'compra')
+        create_sale(status='proforma', balance_due=0)
+
+        self.assertEqual(self.service.report(), NO_DRIFT)
+
+    def test_report_drift(self):
+        """Test balances not matching their payments are reported."""
+        sale = create_sale(balance_due=100)
+        create_payment(sale, amount=30)
+        create_payment(sale, amount=20)
+        purchase = create_purchase()
+
+        # A COUNT and a SELECT per table.
+        with self.assertNumQueries(4):
+            report = self.service.report()
+
+        self.assertEqual(report['venta']['total'], 1)
+        row = report['venta']['rows'][0]
+        self.assertEqual(row['id'], sale.id)
+        self.assertEqual(row['expected_balance_due'], 50)
+        self.assertEqual(row['expected_amount_paid'], 50)
+        self.assertEqual(row['expected_payment_count'], 2)
+        self.assertEqual(report['compra'], {'total': 0, 'rows': []})
+        purchase.balance_due = 10
+        purchase.save()
+        self.assertEqual(
+            [row['id'] for row in self.service.report()['compra']['rows']],
+            [purchase.id])
+
+    def test_report_is_capped(self):
+        """Test only the first rows are listed with the full count."""
+        sales = [create_sale(balance_due=90) for _ in range(3)]
+
+        report = self.service.report(limit=2)
+
+        self.assertEqual(report['venta']['total'], 3)
+        self.assertEqual(
+            [row['id'] for row in report['venta']['rows']],
+            [sale.id for sale in sales[:2]])
+
+    def test_repair(self):
+        """Test drifted transactions are repaired with one UPDATE each."""
+        sale = create_sale(balance_due=100, credit_balance=5)
+        create_payment(sale, amount=30)
+        purchase = create_purchase(balance_due=10)
+        ok_sale = create_sale()
+
+        # Savepoint, one UPDATE per table and release.
+        with self.assertNumQueries(4):
+            repaired = self.service.repair()
+
+        self.assertEqual(repaired, {'venta': 1, 'compra': 1})
+        sale.refresh_from_db()
+        self.assertEqual(sale.balance_due, 75)
+        self.assertEqual(sale.amount_paid, 30)
+        self.assertEqual(sale.payment_count, 1)
+        purchase.refresh_from_db()
+        self.assertEqual(purchase.balance_due, 100)
+        ok_sale.refresh_from_db()
+        self.assertEqual(ok_sale.balance_due, 100)
+        self.assertEqual(self.service.report(), NO_DRIFT)
+
+    def test_reconcile_balances_command(self):
+        """Test the command reports and repairs the drift."""
+        sale = create_sale(balance_due=90)
+        out = StringIO()
+
+        call_command('reconcile_balances', '--repair', stdout=out)
+
+        self.assertIn('Ventas con diferencias: 1', out.getvalue())
+        self.assertIn('Ventas reparadas: 1', out.getvalue())
+        sale.refresh_from_db()
+        self.assertEqual(sale.balance_due, 100)
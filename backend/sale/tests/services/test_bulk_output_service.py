@@ -0,0 +1,302 @@
+"""
+Tests for the bulk dispatch service.
+"""
+from datetime import timedelta
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+from core.models import (
+    Agency, Batch, Category, Client, MeasureUnit, Output, OutputItem,
+    Product, ProductStock, Sale, SaleItem, SellingChannel, StockReservation,
+    Warehouse,
+)
+from sale.services.bulk_output_service import BulkDispatchService
+from sale.services.stock_reservation_service import StockReservationService
+from django.contrib.auth import get_user_model
+import uuid
+
+
+def create_user(**params):
+    """Create and return a sample user."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'ci': f'1234567{unique_suffix}',
+        'phone': '12345678',
+        'address': 'Test Address',
+        'email': f't{unique_suffix}@test.com',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_agency(**params):
+    """Create and return a sample agency."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'name': f'Test Agency {unique_suffix}',
+        'location': f'Test Agency Location {unique_suffix}',
+        'city': 'La Paz',
+    }
+    defaults.update(params)
+    return Agency.objects.create(**defaults)
+
+
+def create_client(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'name': f'Client {unique_suffix}',
+        'phone': '78885521',
+        'address': 'Test Address 123',
+    }
+    defaults.update(params)
+    return Client.objects.create(**defaults)
+
+
+def create_product(**params):
+    """Create and return a sample product."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'name': f'Sample Product {unique_suffix}',
+        'category': Category.objects.create(
+            name=f'Category {unique_suffix}'),
+        'code': f'CODE-{unique_suffix}',
+        'measure_unit': MeasureUnit.objects.create(name='Unidad'),
+        'minimum_sale_price': 10,
+        'maximum_sale_price': 100,
+    }
+    defaults.update(params)
+    return Product.objects.create(**defaults)
+
+
+def create_product_stock(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': create_product(),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 0,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+def create_sale(**params):
+    defaults = {
+        'agency': create_agency(),
+        'seller': create_user(),
+        'client': create_client(),
+        'selling_channel': SellingChannel.objects.create(name='Tienda'),
+        'sale_type': 'contado',
+        'status': 'realizado',
+        'sale_date': '2025-10-02',
+        'total': 200,
+        'balance_due': 0,
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+def create_sale_item(sale, product_stock, quantity):
+    return SaleItem.objects.create(
+        sale=sale,
+        product_stock=product_stock,
+        quantity=quantity,
+        unit_price=10,
+        total_price=10 * quantity,
+    )
+
+
+def create_reservation(sale_item):
+    return StockReservation.objects.create(
+        sale=sale_item.sale,
+        sale_item=sale_item,
+        product_stock=sale_item.product_stock,
+        quantity=sale_item.quantity,
+    )
+
+
+class TestBulkDispatchService(TestCase):
+    """Tests for dispatching all the items of an output at once."""
+
+    def setUp(self):
+        self.output = Output.objects.create(
+            agency=create_agency(),
+            warehouse_keeper=create_user(),
+            client=create_client(),
+            output_date=timezone.now().date(),
+        )
+
+    def test_dispatch_without_sale_items(self):
+        """Test free output items decrease stock and available stock."""
+        product_stock = create_product_stock()
+
+        BulkDispatchService(self.output, [
+            {'product_stock': product_stock, 'quantity': 5},
+            {'product_stock': product_stock, 'quantity': 10},
+        ]).dispatch()
+
+        product_stock.refresh_from_db()
+        self.assertEqual(product_stock.stock, 35)
+        self.assertEqual(product_stock.available_stock, 25)
+        self.assertEqual(product_stock.reserved_stock, 10)
+        self.assertEqual(self.output.output_items.count(), 2)
+
+    def test_dispatch_sale_items_finishes_sale(self):
+        """Test dispatching every sale item completes the sale."""
+        sale = create_sale()
+        first_stock = create_product_stock()
+        second_stock = create_product_stock()
+        first_item = create_sale_item(sale, first_stock, 10)
+        second_item = create_sale_item(sale, second_stock, 10)
+
+        BulkDispatchService(self.output, [
+            {'product_stock': first_stock, 'sale_item': first_item,
+             'quantity': 10},
+            {'product_stock': second_stock, 'sale_item': second_item,
+             'quantity': 10},
+        ]).dispatch()
+
+        first_item.refresh_from_db()
+        first_stock.refresh_from_db()
+        sale.refresh_from_db()
+        self.assertEqual(first_item.dispatched_stock, 10)
+        self.assertEqual(first_item.status, 'completado')
+        self.assertEqual(first_stock.stock, 40)
+        self.assertEqual(first_stock.reserved_stock, 0)
+        self.assertEqual(first_stock.available_stock, 40)
+        self.assertEqual(sale.status, 'terminado')
+        self.assertIsNotNone(sale.sale_done_date)
+
+    def test_partial_dispatch_keeps_sale_open(self):
+        """Test a partial dispatch marks the item as partial."""
+        sale = create_sale()
+        product_stock = create_product_stock()
+        sale_item = create_sale_item(sale, product_stock, 10)
+        last_update = timezone.now() - timedelta(hours=1)
+        Sale.objects.filter(id=sale.id).update(updated_at=last_update)
+
+        BulkDispatchService(self.output, [
+            {'product_stock': product_stock, 'sale_item': sale_item,
+             'quantity': 4},
+        ]).dispatch()
+
+        sale_item.refresh_from_db()
+        sale.refresh_from_db()
+        self.assertEqual(sale_item.status, 'parcial')
+        self.assertEqual(sale.status, 'realizado')
+        self.assertIsNone(sale.sale_done_date)
+        # The delta sync sends the sale again with its dispatched items.
+        self.assertGreater(sale.updated_at, last_update)
+
+    def test_dispatch_consumes_reservations(self):
+        """Test completed items consume their reservation."""
+        sale = create_sale()
+        product_stock = create_product_stock()
+        sale_item = create_sale_item(sale, product_stock, 10)
+        reservation = create_reservation(sale_item)
+
+        BulkDispatchService(self.output, [
+            {'product_stock': product_stock, 'sale_item': sale_item,
+             'quantity': 6},
+            {'product_stock': product_stock, 'sale_item': sale_item,
+             'quantity': 4},
+        ]).dispatch()
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'consumida')
+        self.assertEqual(reservation.quantity, 10)
+
+    def test_partial_dispatch_reduces_reservation(self):
+        """Test a partial dispatch leaves only the rest reserved."""
+        sale = create_sale()
+        product_stock = create_product_stock()
+        sale_item = create_sale_item(sale, product_stock, 10)
+        reservation = create_reservation(sale_item)
+
+        BulkDispatchService(self.output, [
+            {'product_stock': product_stock, 'sale_item': sale_item,
+             'quantity': 4},
+        ]).dispatch()
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'activa')
+        self.assertEqual(reservation.quantity, 6)
+
+        StockReservationService(sale.reservations.all()).release()
+
+        product_stock.refresh_from_db()
+        self.assertEqual(product_stock.stock, 46)
+        self.assertEqual(product_stock.reserved_stock, 0)
+        self.assertEqual(product_stock.available_stock, 46)
+
+    def test_accumulated_lines_exceed_reserved_stock(self):
+        """Test lines are validated together against the reserved stock."""
+        sale = create_sale()
+        product_stock = create_product_stock()
+        first_item = create_sale_item(sale, product_stock, 8)
+        second_item = create_sale_item(sale, product_stock, 8)
+
+        with self.assertRaises(ValidationError) as context:
+            BulkDispatchService(self.output, [
+                {'product_stock': product_stock, 'sale_item': first_item,
+                 'quantity': 8},
+                {'product_stock': product_stock, 'sale_item': second_item,
+                 'quantity': 8},
+            ]).dispatch()
+
+        self.assertIn(
+            "La cantidad excede el stock reservado.", str(context.exception))
+        product_stock.refresh_from_db()
+        self.assertEqual(product_stock.reserved_stock, 10)
+        self.assertFalse(OutputItem.objects.filter(
+            output=self.output).exists())
+
+    def test_dispatch_exceeds_sold_quantity(self):
+        """Test dispatching more than sold raises an error."""
+        sale = create_sale()
+        product_stock = create_product_stock(reserved_stock=20,
+                                             available_stock=30)
+        sale_item = create_sale_item(sale, product_stock, 5)
+
+        with self.assertRaises(ValidationError) as context:
+            BulkDispatchService(self.output, [
+                {'product_stock': product_stock, 'sale_item': sale_item,
+                 'quantity': 6},
+            ]).dispatch()
+
+        self.assertIn(
+            "La cantidad despachada excede la cantidad vendida.",
+            str(context.exception))
+
+    def test_dispatch_runs_constant_queries(self):
+        """Test the number of queries does not grow with the lines."""
+        def build_items(count):
+            sale = create_sale()
+            items = []
+            for _ in range(count):
+                product_stock = create_product_stock()
+                sale_item = create_sale_item(sale, product_stock, 5)
+                create_reservation(sale_item)
+                items.append({
+                    'product_stock': product_stock,
+                    'sale_item': sale_item,
+                    'quantity': 5,
+                })
+            return items
+
+        small_items = build_items(2)
+        large_items = build_items(8)
+
+        # Savepoint, lock stocks, lock sale items, insert output items,
+        # update stocks, update sale items, consume the reservations,
+        # update the sales status and release the savepoint.
+        with self.assertNumQueries(9):
+            BulkDispatchService(self.output, small_items).dispatch()
+        with self.assertNumQueries(9):
+            BulkDispatchService(self.output, large_items).dispatch()
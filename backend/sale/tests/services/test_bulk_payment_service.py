@@ -0,0 +1,180 @@
+"""
+Tests for the bulk payment service.
+"""
+from datetime import date
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from core.models import (
+    Agency, Client, Payment, Purchase, Sale, SellingChannel, Supplier,
+)
+from sale.services.bulk_payment_service import BulkPaymentService
+import uuid
+
+
+def create_user():
+    unique_suffix = str(uuid.uuid4())[:8]
+    agency = Agency.objects.create(
+        name=f'Agency {unique_suffix}',
+        location='Test location',
+        city='La Paz',
+    )
+    return get_user_model().objects.create_user(
+        email=f'user{unique_suffix}@example.com',
+        password='testpass123',
+        ci=f'CI{unique_suffix}',
+        agency=agency,
+    )
+
+
+def create_sale(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    seller = create_user()
+    defaults = {
+        'agency': seller.agency,
+        'seller': seller,
+        'client': Client.objects.create(
+            name=f'Client {unique_suffix}',
+            phone='78885521',
+            nit=f'NIT{unique_suffix}',
+            email=f'client{unique_suffix}@example.com',
+            address='Test Address 123',
+        ),
+        'selling_channel': SellingChannel.objects.create(
+            name=f'Channel {unique_suffix}'),
+        'status': 'realizado',
+        'sale_type': 'credito',
+        'sale_date': date(2025, 1, 1),
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+def create_purchase(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    buyer = create_user()
+    defaults = {
+        'agency': buyer.agency,
+        'buyer': buyer,
+        'supplier': Supplier.objects.create(
+            name=f'Supplier {unique_suffix}',
+            phone='12345678',
+            nit=f'NIT-{unique_suffix}',
+            email=f'supplier{unique_suffix}@example.com',
+            address='Test Address',
+        ),
+        'purchase_type': 'credito',
+        'purchase_date': date(2025, 1, 1),
+        'invoice_number': str(uuid.uuid4().int)[:10],
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Purchase.objects.create(**defaults)
+
+
+def payment_data(transaction, transaction_type='venta', **params):
+    defaults = {
+        'transaction_id': transaction.id,
+        'transaction_type': transaction_type,
+        'payment_type': 'venta',
+        'payment_method': 'efectivo',
+        'amount': 40,
+        'payment_date': date(2025, 2, 1),
+    }
+    defaults.update(params)
+    return defaults
+
+
+class TestBulkPaymentService(TestCase):
+    """Tests for applying payments in bulk."""
+
+    def test_apply_payments(self):
+        """Test the payments update balances and payment summaries."""
+        sale = create_sale()
+        purchase = create_purchase()
+
+        payments = BulkPaymentService([
+            payment_data(sale),
+            payment_data(sale, amount=60, payment_method='qr',
+                         payment_date=date(2025, 3, 1)),
+            payment_data(purchase, 'compra', amount=25),
+        ]).apply()
+
+        self.assertEqual(len(payments), 3)
+        self.assertEqual(Payment.objects.count(), 3)
+        sale.refresh_from_db()
+        self.assertEqual(sale.balance_due, 0)
+        self.assertEqual(sale.amount_paid, 100)
+        self.assertEqual(sale.payment_count, 2)
+        self.assertEqual(sale.last_payment_date, date(2025, 3, 1))
+        self.assertEqual(sale.get_payment_methods(), ['efectivo', 'qr'])
+        purchase.refresh_from_db()
+        self.assertEqual(purchase.balance_due, 75)
+        self.assertEqual(purchase.payment_count, 1)
+
+    def test_apply_advance_payment(self):
+        """Test advance payments of a sale go to the credit balance."""
+        sale = create_sale(status='proforma', balance_due=0)
+
+        BulkPaymentService([
+            payment_data(sale, payment_type='anticipo', amount=30),
+        ]).apply()
+
+        sale.refresh_from_db()
+        self.assertEqual(sale.credit_balance, 30)
+        self.assertEqual(sale.amount_paid, 30)
+
+    def test_batch_exceeding_balance_is_rejected(self):
+        """Test the batch is validated as a whole before writing."""
+        sale = create_sale()
+        other_sale = create_sale()
+
+        with self.assertRaises(ValidationError) as context:
+            BulkPaymentService([
+                payment_data(other_sale),
+                payment_data(sale, amount=70),
+                payment_data(sale, amount=40),
+            ]).apply()
+
+        self.assertEqual(
+            context.exception.messages[0],
+            f"El pago excede el saldo pendiente de la venta {sale.id}.")
+        self.assertFalse(Payment.objects.exists())
+        other_sale.refresh_from_db()
+        self.assertEqual(other_sale.balance_due, 100)
+
+    def test_missing_transaction_is_rejected(self):
+        """Test payments of unknown transactions are rejected."""
+        sale = create_sale()
+        sale_id = sale.id
+        data = payment_data(sale)
+        data['transaction_id'] = sale_id + 1000
+
+        with self.assertRaises(ValidationError) as context:
+            BulkPaymentService([data]).apply()
+
+        self.assertEqual(
+            context.exception.messages[0],
+            f"No existe la venta {sale_id + 1000}.")
+
+    def test_payment_before_transaction_date_is_rejected(self):
+        """Test a payment cannot be dated before its transaction."""
+        purchase = create_purchase()
+
+        with self.assertRaises(ValidationError):
+            BulkPaymentService([
+                payment_data(
+                    purchase, 'compra', payment_date=date(2024, 12, 31)),
+            ]).apply()
+
+    def test_apply_query_count_is_constant(self):
+        """Test the payments do not query once per transaction."""
+        sales = [create_sale() for _ in range(5)]
+
+        # Savepoint, lock, one UPDATE, one INSERT and release.
+        with self.assertNumQueries(5):
+            BulkPaymentService(
+                [payment_data(sale) for sale in sales]).apply()
@@ -0,0 +1,284 @@
+"""
+Tests for the inventory count service.
+"""
+import io
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from openpyxl import Workbook
+from core.models import (
+    Batch, Category, InventoryCount, MeasureUnit, Product, ProductStock,
+    Warehouse,
+)
+from sale.services.inventory_count_service import (
+    InventoryCountService,
+    parse_inventory_count_file,
+)
+from django.contrib.auth import get_user_model
+import uuid
+
+
+def create_user(**params):
+    """Create and return a sample user."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'ci': f'1234567{unique_suffix}',
+        'phone': '12345678',
+        'address': 'Test Address',
+        'email': f't{unique_suffix}@test.com',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_product_stock(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 0,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+def count_key(product_stock):
+    return (product_stock.warehouse_id, product_stock.product_id,
+            product_stock.batch_id)
+
+
+class TestParseInventoryCountFile(TestCase):
+    """Tests for reading counted quantities from files."""
+
+    def test_parse_csv_adds_repeated_rows(self):
+        """Test a CSV is read and repeated product stocks are added."""
+        file = SimpleUploadedFile(
+            'conteo.csv',
+            b'ID_ALMACEN,ID_PRODUCTO,ID_LOTE,CANTIDAD\n'
+            b'1,2,3,10\n1,2,3,2.5\n4,5,6,0\n')
+
+        counts = parse_inventory_count_file(file)
+
+        self.assertEqual(counts, {
+            (1, 2, 3): Decimal('12.5'),
+            (4, 5, 6): Decimal('0'),
+        })
+
+    def test_parse_xlsx(self):
+        """Test an XLSX is read."""
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['ID_ALMACEN', 'ID_PRODUCTO', 'ID_LOTE', 'CANTIDAD'])
+        sheet.append([1, 2, 3, 7])
+        content = io.BytesIO()
+        workbook.save(content)
+        file = SimpleUploadedFile('conteo.xlsx', content.getvalue())
+
+        counts = parse_inventory_count_file(file)
+
+        self.assertEqual(counts, {(1, 2, 3): Decimal('7')})
+
+    def test_parse_missing_columns(self):
+        """Test a file without the required columns is rejected."""
+        file = SimpleUploadedFile(
+            'conteo.csv', b'ID_ALMACEN,ID_PRODUCTO,CANTIDAD\n1,2,10\n')
+
+        with self.assertRaises(ValidationError) as context:
+            parse_inventory_count_file(file)
+
+        self.assertIn("Faltan las columnas: ID_LOTE.", str(context.exception))
+
+    def test_parse_invalid_row(self):
+        """Test a row with a non numeric quantity is rejected."""
+        file = SimpleUploadedFile(
+            'conteo.csv',
+            b'ID_ALMACEN,ID_PRODUCTO,ID_LOTE,CANTIDAD\n1,2,3,diez\n')
+
+        with self.assertRaises(ValidationError) as context:
+            parse_inventory_count_file(file)
+
+        self.assertIn("La fila 2 no es válida.", str(context.exception))
+
+    def test_parse_non_finite_quantities(self):
+        """Test NaN and Infinity quantities are rejected."""
+        for quantity in (b'NaN', b'Infinity', b'-Infinity'):
+            file = SimpleUploadedFile(
+                'conteo.csv',
+                b'ID_ALMACEN,ID_PRODUCTO,ID_LOTE,CANTIDAD\n1,2,3,'
+                + quantity + b'\n')
+
+            with self.assertRaises(ValidationError) as context:
+                parse_inventory_count_file(file)
+
+            self.assertIn("La fila 2 no es válida.", str(context.exception))
+
+    def test_parse_csv_not_utf8(self):
+        """Test a CSV in another encoding is rejected."""
+        file = SimpleUploadedFile(
+            'conteo.csv',
+            'ID_ALMACEN,ID_PRODUCTO,ID_LOTE,CANTIDAD,AÑO\n'.encode('latin-1'))
+
+        with self.assertRaises(ValidationError) as context:
+            parse_inventory_count_file(file)
+
+        self.assertIn(
+            "El archivo CSV debe estar codificado en UTF-8.",
+            str(context.exception))
+
+    def test_parse_corrupt_xlsx(self):
+        """Test an XLSX that can't be opened is rejected."""
+        file = SimpleUploadedFile('conteo.xlsx', b'no es un libro')
+
+        with self.assertRaises(ValidationError) as context:
+            parse_inventory_count_file(file)
+
+        self.assertIn("No se pudo leer el archivo.", str(context.exception))
+
+
+class TestInventoryCountService(TestCase):
+    """Tests for loading and applying inventory counts."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.inventory_count = InventoryCount.objects.create(
+            counted_by=self.user)
+        self.service = InventoryCountService(self.inventory_count)
+
+    def test_load_lines_computes_variances(self):
+        """Test the staging lines get the system quantity and variance."""
+        counted_less = create_product_stock()
+        counted_equal = create_product_stock()
+
+        self.service.load_lines({
+            count_key(counted_less): Decimal('45'),
+            count_key(counted_equal): Decimal('50'),
+        })
+
+        lines = {
+            line.product_stock_id: line
+            for line in self.inventory_count.lines.all()
+        }
+        self.assertEqual(lines[counted_less.id].system_quantity, 50)
+        self.assertEqual(lines[counted_less.id].variance, -5)
+        self.assertEqual(lines[counted_equal.id].variance, 0)
+
+    def test_load_lines_unknown_warehouse(self):
+        """Test counts of unknown warehouses are rejected."""
+        product_stock = create_product_stock()
+
+        with self.assertRaises(ValidationError) as context:
+            self.service.load_lines({
+                (0, product_stock.product_id, product_stock.batch_id): 1,
+            })
+
+        self.assertIn("El almacén 0 no existe.", str(context.exception))
+        self.assertFalse(self.inventory_count.lines.exists())
+
+    def test_apply_adjusts_stock_and_available_stock(self):
+        """Test applying sets the counted stock and keeps reservations."""
+        counted_less = create_product_stock()
+        counted_more = create_product_stock()
+        self.service.load_lines({
+            count_key(counted_less): Decimal('45'),
+            count_key(counted_more): Decimal('60'),
+        })
+
+        self.service.apply(self.user)
+
+        counted_less.refresh_from_db()
+        counted_more.refresh_from_db()
+        self.inventory_count.refresh_from_db()
+        self.assertEqual(counted_less.stock, 45)
+        self.assertEqual(counted_less.available_stock, 35)
+        self.assertEqual(counted_less.reserved_stock, 10)
+        self.assertEqual(counted_more.stock, 60)
+        self.assertEqual(counted_more.available_stock, 50)
+        self.assertEqual(self.inventory_count.status, 'aplicado')
+        self.assertEqual(self.inventory_count.applied_by, self.user)
+
+    def test_apply_creates_missing_product_stocks(self):
+        """Test counted product stocks that do not exist are created."""
+        product_stock = create_product_stock()
+        other_batch = Batch.objects.create(name='Counted Batch')
+        self.service.load_lines({
+            (product_stock.warehouse_id, product_stock.product_id,
+             other_batch.id): Decimal('8'),
+        })
+
+        self.service.apply(self.user)
+
+        created = ProductStock.objects.get(
+            product=product_stock.product, batch=other_batch)
+        self.assertEqual(created.stock, 8)
+        self.assertEqual(created.available_stock, 8)
+        self.assertEqual(
+            self.inventory_count.lines.get().product_stock, created)
+
+    def test_apply_below_reserved_stock_rolls_back(self):
+        """Test a count below the reserved stock rejects the whole count."""
+        valid = create_product_stock()
+        below_reserved = create_product_stock()
+        self.service.load_lines({
+            count_key(valid): Decimal('45'),
+            count_key(below_reserved): Decimal('5'),
+        })
+
+        with self.assertRaises(ValidationError) as context:
+            self.service.apply(self.user)
+
+        self.assertIn(
+            "La cantidad contada es menor al stock reservado",
+            str(context.exception))
+        valid.refresh_from_db()
+        self.inventory_count.refresh_from_db()
+        self.assertEqual(valid.stock, 50)
+        self.assertEqual(self.inventory_count.status, 'pendiente')
+
+    def test_apply_twice(self):
+        """Test an applied count cannot be applied again."""
+        product_stock = create_product_stock()
+        self.service.load_lines({count_key(product_stock): Decimal('45')})
+        self.service.apply(self.user)
+
+        with self.assertRaises(ValidationError) as context:
+            self.service.apply(self.user)
+
+        self.assertIn("El conteo ya fue aplicado.", str(context.exception))
+
+    def test_apply_runs_constant_queries(self):
+        """Test posting does not run a query per counted line."""
+        def load(count):
+            inventory_count = InventoryCount.objects.create(
+                counted_by=self.user)
+            service = InventoryCountService(inventory_count)
+            service.load_lines({
+                count_key(create_product_stock()): Decimal('45')
+                for _ in range(count)
+            })
+            return service
+
+        small, large = load(2), load(10)
+
+        # Savepoint, lock the count, variances, savepoint, adjust stocks,
+        # release, find new lines, update the count and release.
+        with self.assertNumQueries(9):
+            small.apply(self.user)
+        with self.assertNumQueries(9):
+            large.apply(self.user)
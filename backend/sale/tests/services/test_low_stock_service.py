@@ -0,0 +1,92 @@
+"""
+Tests for the low stock service.
+"""
+from django.test import TestCase
+from core.models import (
+    Batch, Category, MeasureUnit, Product, ProductStock, Supplier,
+    Warehouse,
+)
+from sale.services.low_stock_service import LowStockService
+import uuid
+
+
+def create_product_stock(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 10,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+def create_low_stock(**params):
+    defaults = {
+        'stock': 5,
+        'reserved_stock': 0,
+        'available_stock': 5,
+    }
+    defaults.update(params)
+    return create_product_stock(**defaults)
+
+
+class TestLowStockService(TestCase):
+    """Tests for the low stock queries."""
+
+    def test_get_queryset_filters_and_suggests(self):
+        """Test only stocks below minimum are returned with suggestions."""
+        low = create_low_stock()
+        create_product_stock()
+        create_product_stock(
+            stock=20, reserved_stock=10, available_stock=10)
+
+        queryset = LowStockService().get_queryset()
+
+        self.assertEqual([stock.id for stock in queryset], [low.id])
+        self.assertEqual(queryset[0].suggested_quantity, 95)
+
+    def test_get_queryset_by_warehouse(self):
+        """Test the low stock can be limited to a warehouse."""
+        low = create_low_stock()
+        create_low_stock()
+
+        queryset = LowStockService(low.warehouse_id).get_queryset()
+
+        self.assertEqual([stock.id for stock in queryset], [low.id])
+
+    def test_reorder_suggestions_by_supplier(self):
+        """Test a product is suggested to each of its suppliers."""
+        low = create_low_stock()
+        create_low_stock(
+            product=low.product, available_stock=2, stock=2,
+            maximum_stock=20)
+        first_supplier = Supplier.objects.create(name='Proveedor A')
+        second_supplier = Supplier.objects.create(name='Proveedor B')
+        first_supplier.product.add(low.product)
+        second_supplier.product.add(low.product)
+
+        with self.assertNumQueries(1):
+            suggestions = LowStockService().get_reorder_suggestions()
+
+        self.assertEqual(
+            [group['supplier']['name'] for group in suggestions],
+            ['Proveedor A', 'Proveedor B'])
+        product = suggestions[0]['products'][0]
+        self.assertEqual(product['id'], low.product.id)
+        self.assertEqual(product['available_stock'], 7)
+        self.assertEqual(product['suggested_quantity'], 113)
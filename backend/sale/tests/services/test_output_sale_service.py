@@ -1,234 +0,0 @@
-from unittest import TestCase
-from django.core.exceptions import ValidationError
-from sale.services.output_sale_service import UpdateSaleItem
-from core.models import (
-    Agency, Batch, Category, Client, MeasureUnit, Output, OutputItem,
-    Product, ProductStock, Sale, SaleItem, SellingChannel, Warehouse,
-)
-from django.contrib.auth import get_user_model
-import uuid
-
-
-def create_user(**params):
-    """Create and return a sample user."""
-    from core.models import Agency
-
-    unique_suffix = str(uuid.uuid4())[:4]
-    agency = Agency.objects.create(
-        name=f'Test Agency {unique_suffix}',
-        location=f'Test Location {unique_suffix}',
-        city='La Paz',
-    )
-
-    defaults = {
-        'first_name': 'Test',
-        'last_name': 'User',
-        'ci': f'1234567{unique_suffix}',
-        'phone': '12345678',
-        'address': 'Test Address',
-        'email': f't{unique_suffix}@test.com',
-        'agency': agency,
-    }
-    defaults.update(params)
-    return get_user_model().objects.create_user(**defaults)
-
-
-def create_agency(**params):
-    """Create and return a sample agency."""
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Test Agency {unique_suffix}',
-        'location': f'Test Agency Location {unique_suffix}',
-        'city': 'La Paz',
-    }
-    defaults.update(params)
-    return Agency.objects.create(**defaults)
-
-
-def create_warehouse(**params):
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Warehouse {unique_suffix}',
-        'location': 'Test location',
-    }
-    defaults.update(params)
-
-    return Warehouse.objects.create(**defaults)
-
-
-def create_client(**params):
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Client {unique_suffix}',
-        'phone': '78885521',
-        'nit': f'123456789{unique_suffix}',
-        'email': f'test{unique_suffix}@example.com',
-        'address': 'Test Address 123',
-    }
-    defaults.update(params)
-
-    return Client.objects.create(**defaults)
-
-
-def create_category(**params):
-    """Create and return a sample category."""
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Sample Category {unique_suffix}',
-    }
-    defaults.update(params)
-    category = Category.objects.create(**defaults)
-    return category
-
-
-def create_batch(**params):
-    """Create and return a sample batch."""
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Sample Batch {unique_suffix}',
-    }
-    defaults.update(params)
-    batch = Batch.objects.create(**defaults)
-    return batch
-
-
-def create_measure_unit(**params):
-    """Create and return a sample measure unit."""
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Unit {unique_suffix}',
-    }
-    defaults.update(params)
-    return MeasureUnit.objects.create(**defaults)
-
-
-def create_product(**params):
-    """Create and return a sample product."""
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Sample Product {unique_suffix}',
-        'category': create_category(),
-        'code': f'Sample Code {unique_suffix}',
-        'measure_unit': create_measure_unit(),
-        'description': 'Sample Description',
-        'image': None,
-        'minimum_sale_price': 100,
-        'maximum_sale_price': 2500,
-    }
-    defaults.update(params)
-
-    return Product.objects.create(**defaults)
-
-
-def create_product_stock(**params):
-    defaults = {
-        'warehouse': create_warehouse(),
-        'product': create_product(),
-        'batch': create_batch(),
-        'stock': 50,
-        'reserved_stock': 10,
-        'available_stock': 40,
-        'minimum_stock': 10,
-        'maximum_stock': 70
-    }
-    defaults.update(params)
-
-    return ProductStock.objects.create(**defaults)
-
-
-def create_selling_channel(**params):
-    unique_suffix = str(uuid.uuid4())[:8]
-    defaults = {
-        'name': f'Canal de ventas {unique_suffix}',
-    }
-    defaults.update(params)
-
-    return SellingChannel.objects.create(**defaults)
-
-
-def create_output(**params):
-    defaults = {
-        'agency': create_agency(),
-        'warehouse_keeper': create_user(),
-        'client': create_client(),
-        'output_date': '2025-10-02',
-    }
-    defaults.update(params)
-
-    return Output.objects.create(**defaults)
-
-
-def create_sale(**params):
-    defaults = {
-        'agency': create_agency(),
-        'seller': create_user(),
-        'client': create_client(),
-        'selling_channel': create_selling_channel(),
-        'sale_type': 'contado',
-        'status': 'proforma',
-        'sale_date': '2025-10-02',
-        'sale_perform_date': '2025-10-05',
-        'sale_done_date': '2025-10-10',
-        'total': 200,
-        'balance_due': 200,
-    }
-    defaults.update(params)
-
-    return Sale.objects.create(**defaults)
-
-
-class TestUpdateSaleItem(TestCase):
-    """Tests for update sale items when an output is done."""
-
-    def setUp(self):
-        self.sale_item = self.create_test_sale_item()
-
-    def create_test_sale_item(self, **kwargs):
-        defaults = {
-            'sale': create_sale(),
-            'product_stock': create_product_stock(),
-            'status': 'pendiente',
-            'quantity': 50,
-            'unit_price': 50,
-            'sub_total_price': 2500,
-            'total_price': 2000,
-            'dispatched_stock': 0,
-        }
-        defaults.update(kwargs)
-
-        return SaleItem.objects.create(**defaults)
-
-    def test_update_sale_item(self):
-        """Test update sale item"""
-        output_item = OutputItem.objects.create(
-            sale_item=self.sale_item,
-            output=create_output(),
-            product_stock=create_product_stock(),
-            quantity=10,
-        )
-        product_stock = create_product_stock()
-
-        service = UpdateSaleItem(output_item, product_stock)
-        service.update_sale_item()
-
-        self.sale_item.refresh_from_db()
-        self.assertEqual(self.sale_item.dispatched_stock, 10)
-
-    def test_dispatched_stock_exceeds_quantity(self):
-        """Test entered stock exceeds quantity selled."""
-        output_item = OutputItem.objects.create(
-            sale_item=self.sale_item,
-            output=create_output(),
-            product_stock=create_product_stock(),
-            quantity=60,
-        )
-        product_stock = create_product_stock()
-
-        service = UpdateSaleItem(output_item, product_stock)
-
-        with self.assertRaises(ValidationError) as context:
-            service.update_sale_item()
-
-        self.assertIn(
-            "La cantidad despachada excede la cantidad vendida.", str(
-                context.exception))
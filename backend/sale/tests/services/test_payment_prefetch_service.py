@@ -0,0 +1,48 @@
+"""
+Tests for the payment prefetch helpers.
+"""
+from django.test import TestCase
+from core.models import Payment
+from sale.services.payment_prefetch_service import prefetch_payments
+
+
+class Transaction:
+    def __init__(self, id):
+        self.id = id
+
+
+def create_payment(transaction_id, **params):
+    defaults = {
+        'transaction_id': transaction_id,
+        'transaction_type': 'venta',
+        'payment_method': 'efectivo',
+        'amount': 10,
+        'payment_date': '2025-01-01',
+    }
+    defaults.update(params)
+    return Payment.objects.create(**defaults)
+
+
+class TestPaymentPrefetchService(TestCase):
+    """Tests for batching payments."""
+
+    def test_prefetch_payments_single_query(self):
+        """Test every transaction gets its own payments in one query."""
+        first = create_payment(1)
+        second = create_payment(1, amount=20)
+        third = create_payment(2)
+        create_payment(1, transaction_type='compra')
+        transactions = [Transaction(1), Transaction(2), Transaction(3)]
+
+        with self.assertNumQueries(1):
+            prefetch_payments(transactions, 'venta')
+
+        self.assertEqual(
+            transactions[0].prefetched_payments, [first, second])
+        self.assertEqual(transactions[1].prefetched_payments, [third])
+        self.assertEqual(transactions[2].prefetched_payments, [])
+
+    def test_prefetch_payments_empty(self):
+        """Test no query is run without transactions."""
+        with self.assertNumQueries(0):
+            self.assertEqual(prefetch_payments([], 'venta'), [])
@@ -0,0 +1,120 @@
+"""
+Tests for the search documents of the list endpoints.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from core.models import Agency, Client, Output, Sale, SellingChannel
+from sale.services.search_service import SearchService
+import uuid
+
+
+def create_user(**params):
+    """Create and return a sample User."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'ci': f'1234567{unique_suffix}',
+        'phone': '12345678',
+        'email': f't{unique_suffix}@test.com',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_client(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'name': f'Test Client {unique_suffix}',
+        'phone': '75871256',
+        'nit': f'12{unique_suffix}',
+        'email': f'test{unique_suffix}@example.com',
+    }
+    defaults.update(params)
+    return Client.objects.create(**defaults)
+
+
+def create_sale(**params):
+    """Create and return a sample Sale."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'agency': Agency.objects.create(
+            name=f'Agency{unique_suffix}', location='Location', city='PT'),
+        'client': create_client(),
+        'selling_channel': SellingChannel.objects.create(name='Tienda'),
+        'seller': create_user(),
+        'total': 10,
+        'balance_due': 10,
+        'sale_date': '2024-01-01',
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+class TestSearchService(TestCase):
+    """Tests for maintaining and matching search documents."""
+
+    def test_document_built_on_save(self):
+        """Test the document copies the fields of the row and relations."""
+        client = create_client(name='Ferreteria Andina')
+        sale = create_sale(
+            client=client,
+            seller=create_user(first_name='Rosa', last_name='Quispe'),
+            invoice_number=345)
+
+        sale.refresh_from_db()
+        for value in (
+                str(sale.id), 'Ferreteria Andina', 'Tienda', 'Rosa',
+                'Quispe', '345'):
+            self.assertIn(value, sale.search_document)
+
+        client.refresh_from_db()
+        self.assertIn(client.email, client.search_document)
+
+    def test_document_follows_related_changes(self):
+        """Test renaming a related row refreshes the documents using it."""
+        client = create_client(name='Cliente Antiguo')
+        sale = create_sale(client=client)
+
+        client.name = 'Cliente Nuevo'
+        client.save()
+
+        sale.refresh_from_db()
+        self.assertIn('Cliente Nuevo', sale.search_document)
+        self.assertNotIn('Antiguo', sale.search_document)
+
+    def test_unrelated_updates_skip_refresh(self):
+        """Test saving fields outside the documents runs no refresh."""
+        sale = create_sale()
+
+        with self.assertNumQueries(1):
+            sale.seller.save(update_fields=['last_login'])
+        with self.assertNumQueries(1):
+            sale.save(update_fields=['status'])
+
+    def test_search_matches_every_term(self):
+        """Test each term must appear in the document."""
+        seller = create_user(first_name='Rosa', last_name='Quispe')
+        match = create_sale(
+            seller=seller, client=create_client(name='Ferreteria Andina'))
+        create_sale(seller=seller)
+        create_sale(client=create_client(name='Ferreteria Central'))
+
+        results = SearchService.search(
+            Sale.objects.all(), 'ferreteria, QUISPE')
+
+        self.assertEqual(list(results), [match])
+
+    def test_search_without_terms(self):
+        """Test a search of only symbols leaves the queryset as is."""
+        create_sale()
+        queryset = Sale.objects.all()
+
+        self.assertIs(SearchService.search(queryset, ' & | '), queryset)
+
+    def test_get_dependents(self):
+        """Test the documents copying fields of a related model."""
+        self.assertEqual(SearchService.get_dependents(Client), [
+            (Sale, 'client', {'name'}),
+            (Output, 'client', {'name'}),
+        ])
@@ -0,0 +1,142 @@
+"""
+Tests for the stock allocation service.
+"""
+from datetime import timedelta
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+from core.models import (
+    Agency, Batch, Category, MeasureUnit, Product, ProductStock, Warehouse,
+)
+from sale.services.stock_allocation_service import StockAllocationService
+import uuid
+
+
+def create_product(**params):
+    """Create and return a sample product."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'name': f'Sample Product {unique_suffix}',
+        'category': Category.objects.create(
+            name=f'Category {unique_suffix}'),
+        'code': f'CODE-{unique_suffix}',
+        'measure_unit': MeasureUnit.objects.create(name='Unidad'),
+        'minimum_sale_price': 10,
+        'maximum_sale_price': 100,
+    }
+    defaults.update(params)
+    return Product.objects.create(**defaults)
+
+
+def create_batch(days_ago=0):
+    """Create a batch as if it had been created `days_ago` days ago."""
+    batch = Batch.objects.create(name=f'Batch {str(uuid.uuid4())[:8]}')
+    Batch.objects.filter(id=batch.id).update(
+        created_at=timezone.now() - timedelta(days=days_ago))
+    return batch
+
+
+def create_product_stock(product, available_stock, **params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': product,
+        'batch': create_batch(),
+        'stock': available_stock,
+        'available_stock': available_stock,
+        'maximum_stock': 1000,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+class TestStockAllocationService(TestCase):
+    """Tests for splitting quantities across product stocks."""
+
+    def setUp(self):
+        self.product = create_product()
+
+    def test_fifo_takes_oldest_batch_first(self):
+        """Test FIFO consumes the oldest batch before the newest."""
+        newest = create_product_stock(
+            self.product, 50, batch=create_batch(days_ago=1))
+        oldest = create_product_stock(
+            self.product, 20, batch=create_batch(days_ago=10))
+
+        allocations = StockAllocationService(
+            [{'product': self.product.id, 'quantity': 30,
+              'unit_price': 15}]).allocate()
+
+        self.assertEqual(
+            [(a['product_stock'].id, a['quantity']) for a in allocations],
+            [(oldest.id, 20), (newest.id, 10)])
+        self.assertTrue(all(a['unit_price'] == 15 for a in allocations))
+
+    def test_largest_takes_biggest_stock_first(self):
+        """Test the largest policy prefers the stock with more units."""
+        create_product_stock(self.product, 20)
+        largest = create_product_stock(self.product, 50)
+
+        allocations = StockAllocationService(
+            [{'product': self.product, 'quantity': 30}],
+            policy='largest').allocate()
+
+        self.assertEqual(len(allocations), 1)
+        self.assertEqual(allocations[0]['product_stock'].id, largest.id)
+
+    def test_nearest_prefers_agency_location(self):
+        """Test the nearest policy prefers the agency's warehouses."""
+        agency = Agency.objects.create(
+            name='Agencia Central', location='Zona Sur', city='La Paz')
+        create_product_stock(self.product, 50)
+        near = create_product_stock(
+            self.product, 50,
+            warehouse=Warehouse.objects.create(
+                name='Almacen Sur', location='Zona Sur'))
+
+        allocations = StockAllocationService(
+            [{'product': self.product.id, 'quantity': 10}],
+            agency=agency, policy='nearest').allocate()
+
+        self.assertEqual(allocations[0]['product_stock'].id, near.id)
+
+    def test_nearest_ignores_blank_city(self):
+        """Test an agency without city does not match every warehouse."""
+        agency = Agency.objects.create(
+            name='Agencia Sin Ciudad', location='Zona Sur', city='')
+        create_product_stock(self.product, 50, batch=create_batch(days_ago=5))
+        near = create_product_stock(
+            self.product, 50,
+            warehouse=Warehouse.objects.create(
+                name='Almacen Sur', location='Zona Sur'))
+
+        allocations = StockAllocationService(
+            [{'product': self.product.id, 'quantity': 10}],
+            agency=agency, policy='nearest').allocate()
+
+        self.assertEqual(allocations[0]['product_stock'].id, near.id)
+
+    def test_repeated_product_does_not_overallocate(self):
+        """Test two lines of the same product share the stock."""
+        create_product_stock(self.product, 10)
+
+        with self.assertRaises(ValidationError):
+            StockAllocationService([
+                {'product': self.product.id, 'quantity': 6},
+                {'product': self.product.id, 'quantity': 6},
+            ]).allocate()
+
+    def test_allocation_uses_one_query(self):
+        """Test many lines are allocated with a single stock query."""
+        lines = []
+        for _ in range(20):
+            product = create_product()
+            create_product_stock(product, 5)
+            create_product_stock(product, 5)
+            lines.append({'product': product.id, 'quantity': 8})
+
+        with self.assertNumQueries(1):
+            allocations = StockAllocationService(lines).allocate()
+
+        self.assertEqual(len(allocations), 40)
@@ -0,0 +1,134 @@
+"""
+Tests for the product stock check constraints and guarded updates.
+"""
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from core.models import (
+    Batch, Category, MeasureUnit, Product, ProductStock, Warehouse,
+)
+from sale.services.stock_constraint_service import (
+    GuardedStockUpdateService,
+    stock_constraint_errors,
+)
+import uuid
+
+
+def create_product_stock(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 0,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+class TestProductStockConstraints(TestCase):
+    """Tests for the check constraints of ProductStock."""
+
+    def setUp(self):
+        self.product_stock = create_product_stock()
+        self.queryset = ProductStock.objects.filter(id=self.product_stock.id)
+
+    def test_negative_stock_is_rejected(self):
+        """Test the database rejects a negative bucket."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.queryset.update(stock=-10, available_stock=-20)
+
+    def test_unbalanced_available_stock_is_rejected(self):
+        """Test available stock must be stock minus reserved and damaged."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.queryset.update(stock=60)
+
+    def test_minimum_greater_than_maximum_is_mapped(self):
+        """Test the min/max violation is raised with its message."""
+        with self.assertRaises(ValidationError) as context:
+            with stock_constraint_errors():
+                self.queryset.update(minimum_stock=200)
+
+        self.assertIn(
+            "El stock mínimo no puede ser mayor al stock máximo.",
+            str(context.exception))
+
+
+class TestGuardedStockUpdateService(TestCase):
+    """Tests for single-statement product stock updates."""
+
+    def setUp(self):
+        self.product_stock = create_product_stock()
+
+    def test_increment_updates_buckets(self):
+        """Test an increment moves stock between buckets."""
+        GuardedStockUpdateService(self.product_stock.id).increment(
+            reserved_stock=15, available_stock=-15)
+
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.reserved_stock, 25)
+        self.assertEqual(self.product_stock.available_stock, 25)
+        self.assertEqual(self.product_stock.version, 1)
+
+    def test_increment_runs_single_update(self):
+        """Test no previous read is needed to validate the update."""
+        # Savepoint, update and release.
+        with self.assertNumQueries(3):
+            GuardedStockUpdateService(self.product_stock.id).increment(
+                stock=-5, available_stock=-5)
+
+    def test_exceeding_available_stock_is_mapped(self):
+        """Test a negative available stock raises the existing message."""
+        with self.assertRaises(ValidationError) as context:
+            GuardedStockUpdateService(self.product_stock.id).increment(
+                stock=-45, available_stock=-45)
+
+        self.assertIn(
+            "La cantidad excede el stock disponible",
+            str(context.exception))
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.stock, 50)
+
+    def test_exceeding_reserved_stock_is_mapped(self):
+        """Test a negative reserved stock raises the existing message."""
+        with self.assertRaises(ValidationError) as context:
+            GuardedStockUpdateService(self.product_stock.id).increment(
+                reserved_stock=-11, stock=-11)
+
+        self.assertIn(
+            "La cantidad excede el stock reservado.",
+            str(context.exception))
+
+    def test_message_override(self):
+        """Test callers can override the message of a constraint."""
+        with self.assertRaises(ValidationError) as context:
+            GuardedStockUpdateService(self.product_stock.id, messages={
+                'productstock_available_stock_non_negative': (
+                    "No se puede vender una cantidad mayor "
+                    "al stock actual."),
+            }).increment(reserved_stock=41, available_stock=-41)
+
+        self.assertIn(
+            "No se puede vender una cantidad mayor al stock actual.",
+            str(context.exception))
+
+    def test_missing_product_stock(self):
+        """Test updating a missing product stock raises an error."""
+        with self.assertRaises(ValidationError) as context:
+            GuardedStockUpdateService(0).increment(stock=1)
+
+        self.assertIn("El stock del producto no existe.",
+                      str(context.exception))
@@ -0,0 +1,152 @@
+"""
+Tests for the stock reservation service.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from core.models import (
+    Agency, Batch, Category, Client, MeasureUnit, Product, ProductStock,
+    Sale, SaleItem, SellingChannel, StockReservation, Warehouse,
+)
+from sale.services.stock_reservation_service import StockReservationService
+import uuid
+
+
+def create_product_stock(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 10,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+def create_sale(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    agency = Agency.objects.create(
+        name=f'Agency {unique_suffix}',
+        location='Test location',
+        city='La Paz',
+    )
+    defaults = {
+        'agency': agency,
+        'seller': get_user_model().objects.create_user(
+            email=f'seller{unique_suffix}@example.com',
+            password='testpass123',
+            ci=f'CI{unique_suffix}',
+            agency=agency,
+        ),
+        'client': Client.objects.create(
+            name=f'Client {unique_suffix}',
+            phone='78885521',
+            nit=f'NIT{unique_suffix}',
+            email=f'client{unique_suffix}@example.com',
+            address='Test Address 123',
+        ),
+        'selling_channel': SellingChannel.objects.create(
+            name=f'Channel {unique_suffix}'),
+        'status': 'realizado',
+        'sale_date': '2025-10-02',
+        'total': 200,
+        'balance_due': 200,
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+def create_reservation(sale, product_stock, quantity, **params):
+    sale_item = SaleItem.objects.create(
+        sale=sale,
+        product_stock=product_stock,
+        quantity=quantity,
+        unit_price=10,
+        total_price=10 * quantity,
+        dispatched_stock=params.pop('dispatched_stock', 0),
+    )
+    return StockReservation.objects.create(
+        sale=sale,
+        sale_item=sale_item,
+        product_stock=product_stock,
+        quantity=quantity,
+        **params,
+    )
+
+
+class TestStockReservationService(TestCase):
+    """Tests for releasing stock reservations."""
+
+    def setUp(self):
+        self.sale = create_sale()
+        self.product_stock = create_product_stock()
+
+    def test_release_returns_reserved_stock(self):
+        """Test releasing moves the reserved stock back to available."""
+        other_stock = create_product_stock()
+        create_reservation(self.sale, self.product_stock, 4)
+        create_reservation(self.sale, self.product_stock, 3)
+        create_reservation(self.sale, other_stock, 5)
+
+        released = StockReservationService(
+            self.sale.reservations.all()).release()
+
+        self.assertEqual(released, 3)
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.reserved_stock, 3)
+        self.assertEqual(self.product_stock.available_stock, 47)
+        other_stock.refresh_from_db()
+        self.assertEqual(other_stock.reserved_stock, 5)
+        self.assertFalse(
+            self.sale.reservations.filter(status='activa').exists())
+
+    def test_release_returns_held_quantity(self):
+        """Test only the quantity still held is released."""
+        partial = create_reservation(
+            self.sale, self.product_stock, 6, dispatched_stock=4)
+        create_reservation(
+            self.sale, self.product_stock, 2, dispatched_stock=2,
+            status='consumida')
+        StockReservation.objects.filter(id=partial.id).update(quantity=2)
+
+        released = StockReservationService(
+            self.sale.reservations.all()).release()
+
+        self.assertEqual(released, 1)
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.reserved_stock, 8)
+        self.assertEqual(self.product_stock.available_stock, 42)
+
+    def test_release_ignores_released_reservations(self):
+        """Test releasing twice does not return the stock twice."""
+        create_reservation(self.sale, self.product_stock, 4)
+        service = StockReservationService(self.sale.reservations.all())
+
+        service.release()
+        released = service.release()
+
+        self.assertEqual(released, 0)
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.reserved_stock, 6)
+
+    def test_release_query_count_is_constant(self):
+        """Test the release does not query once per reservation."""
+        for _ in range(5):
+            create_reservation(self.sale, create_product_stock(), 2)
+
+        # Savepoints of the service and the constraint guard, two UPDATEs.
+        with self.assertNumQueries(6):
+            StockReservationService(self.sale.reservations.all()).release()
@@ -0,0 +1,170 @@
+"""
+Tests for the optimistic stock update service.
+"""
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.test import TestCase
+from rest_framework import serializers
+from core.models import (
+    Batch, Category, MeasureUnit, Product, ProductStock, Warehouse,
+)
+from sale.serializers import ProductStockSerializer
+from sale.services.stock_version_service import OptimisticStockUpdateService
+import uuid
+
+
+def create_product_stock(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 0,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+@patch('sale.services.stock_version_service.time.sleep')
+class TestOptimisticStockUpdateService(TestCase):
+    """Tests for compare-and-swap updates of product stocks."""
+
+    def setUp(self):
+        self.product_stock = create_product_stock()
+
+    def test_increment_bumps_version(self, patched_sleep):
+        """Test an increment writes the stock and a new version."""
+        service = OptimisticStockUpdateService(self.product_stock.id)
+
+        updated = service.increment(stock=5, available_stock=5)
+
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.stock, 55)
+        self.assertEqual(self.product_stock.available_stock, 45)
+        self.assertEqual(self.product_stock.version, 1)
+        self.assertEqual(updated.version, 1)
+        self.assertEqual(service.attempts, 1)
+        patched_sleep.assert_not_called()
+
+    def test_concurrent_write_is_retried(self, patched_sleep):
+        """Test a write made between read and update is not lost."""
+        calls = []
+
+        def change(product_stock):
+            if not calls:
+                # Another writer updates the row after our read.
+                ProductStock.objects.filter(
+                    id=self.product_stock.id).update(
+                        stock=70, available_stock=60,
+                        version=F('version') + 1)
+            calls.append(product_stock.stock)
+            product_stock.stock += 1
+            product_stock.available_stock += 1
+
+        service = OptimisticStockUpdateService(self.product_stock.id)
+        service.apply(change)
+
+        self.product_stock.refresh_from_db()
+        self.assertEqual(calls, [50, 70])
+        self.assertEqual(self.product_stock.stock, 71)
+        self.assertEqual(self.product_stock.available_stock, 61)
+        self.assertEqual(self.product_stock.version, 2)
+        self.assertEqual(service.attempts, 2)
+        patched_sleep.assert_called_once()
+
+    def test_exhausted_retries_raise_error(self, patched_sleep):
+        """Test an error is raised when every attempt conflicts."""
+        def change(product_stock):
+            ProductStock.objects.filter(id=self.product_stock.id).update(
+                version=F('version') + 1)
+            product_stock.stock += 1
+
+        service = OptimisticStockUpdateService(
+            self.product_stock.id, max_retries=3)
+        with self.assertRaises(ValidationError) as context:
+            service.apply(change)
+
+        self.assertIn(
+            "El stock fue modificado por otro usuario",
+            str(context.exception))
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.stock, 50)
+        self.assertEqual(service.attempts, 3)
+
+    def test_change_validation_error_is_raised(self, patched_sleep):
+        """Test a rejected change does not write the row."""
+        def change(product_stock):
+            raise ValidationError("El nuevo stock no es válido.")
+
+        with self.assertRaises(ValidationError):
+            OptimisticStockUpdateService(self.product_stock.id).apply(change)
+
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.version, 0)
+
+    def test_missing_product_stock(self, patched_sleep):
+        """Test updating a missing product stock raises an error."""
+        with self.assertRaises(ValidationError) as context:
+            OptimisticStockUpdateService(0).increment(stock=1)
+
+        self.assertIn("El stock del producto no existe.",
+                      str(context.exception))
+
+
+class TestProductStockSerializerUpdate(TestCase):
+    """Tests for the compare-and-swap of product stock edits."""
+
+    def setUp(self):
+        self.product_stock = create_product_stock()
+
+    def update(self, instance, data):
+        serializer = ProductStockSerializer(instance, data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_update_bumps_version(self):
+        """Test an edit writes the fields and the next version."""
+        self.update(self.product_stock, {'maximum_stock': 90})
+
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.maximum_stock, 90)
+        self.assertEqual(self.product_stock.version, 1)
+
+    def test_stale_instance_keeps_concurrent_write(self):
+        """Test an edit of a stale instance is applied on the current row."""
+        stale = ProductStock.objects.get(id=self.product_stock.id)
+        OptimisticStockUpdateService(self.product_stock.id).increment(
+            stock=5, available_stock=5)
+
+        self.update(stale, {'maximum_stock': 90})
+
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.stock, 55)
+        self.assertEqual(self.product_stock.available_stock, 45)
+        self.assertEqual(self.product_stock.maximum_stock, 90)
+        self.assertEqual(self.product_stock.version, 2)
+
+    def test_minimum_above_maximum_is_rejected(self):
+        """Test the minimum stock cannot exceed the maximum stock."""
+        with self.assertRaises(serializers.ValidationError) as context:
+            self.update(self.product_stock, {'minimum_stock': 200})
+
+        self.assertIn(
+            "El stock mínimo no puede ser mayor al stock máximo.",
+            str(context.exception))
+        self.product_stock.refresh_from_db()
+        self.assertEqual(self.product_stock.minimum_stock, 0)
@@ -0,0 +1,204 @@
+"""
+Tests for the warehouse transfer service.
+"""
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+from core.models import (
+    Batch, Category, MeasureUnit, Product, ProductStock, Transfer,
+    TransferItem, Warehouse,
+)
+from sale.services.transfer_service import TransferService
+from django.contrib.auth import get_user_model
+import uuid
+
+
+def create_user(**params):
+    """Create and return a sample user."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'ci': f'1234567{unique_suffix}',
+        'phone': '12345678',
+        'address': 'Test Address',
+        'email': f't{unique_suffix}@test.com',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_warehouse():
+    unique_suffix = str(uuid.uuid4())[:8]
+    return Warehouse.objects.create(
+        name=f'Warehouse {unique_suffix}', location='Test location')
+
+
+def create_product_stock(warehouse, **params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': warehouse,
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 5,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+class TestTransferService(TestCase):
+    """Tests for moving stock between warehouses."""
+
+    def setUp(self):
+        self.source = create_warehouse()
+        self.destination = create_warehouse()
+        self.transfer = Transfer.objects.create(
+            source_warehouse=self.source,
+            destination_warehouse=self.destination,
+            user=create_user(),
+            transfer_date=timezone.now().date(),
+        )
+
+    def test_transfer_creates_destination_stock(self):
+        """Test a product batch missing in the destination is created."""
+        source_stock = create_product_stock(self.source)
+
+        items = TransferService(self.transfer, [
+            {'product_stock': source_stock, 'quantity': 15},
+        ]).transfer_items()
+
+        source_stock.refresh_from_db()
+        destination_stock = ProductStock.objects.get(
+            warehouse=self.destination,
+            product=source_stock.product,
+            batch=source_stock.batch,
+        )
+        self.assertEqual(source_stock.stock, 35)
+        self.assertEqual(source_stock.available_stock, 25)
+        self.assertEqual(source_stock.reserved_stock, 10)
+        self.assertEqual(destination_stock.stock, 15)
+        self.assertEqual(destination_stock.available_stock, 15)
+        self.assertEqual(destination_stock.minimum_stock, 5)
+        self.assertEqual(len(items), 1)
+        item = TransferItem.objects.get(transfer=self.transfer)
+        self.assertEqual(item.destination_product_stock, destination_stock)
+
+    def test_transfer_increments_existing_destination_stock(self):
+        """Test an existing destination stock is incremented."""
+        source_stock = create_product_stock(self.source)
+        destination_stock = create_product_stock(
+            self.destination,
+            product=source_stock.product,
+            batch=source_stock.batch,
+        )
+
+        TransferService(self.transfer, [
+            {'product_stock': source_stock, 'quantity': 10},
+            {'product_stock': source_stock, 'quantity': 5},
+        ]).transfer_items()
+
+        destination_stock.refresh_from_db()
+        self.assertEqual(destination_stock.stock, 65)
+        self.assertEqual(destination_stock.available_stock, 55)
+        self.assertEqual(destination_stock.version, 1)
+        self.assertEqual(self.transfer.transfer_items.count(), 2)
+
+    def test_transfer_destination_created_concurrently(self):
+        """Test a destination created after the lock is incremented."""
+        source_stock = create_product_stock(self.source)
+        service = TransferService(self.transfer, [
+            {'product_stock': source_stock, 'quantity': 15},
+        ])
+        lock = service._lock
+
+        def lock_then_create(ids):
+            locked = lock(ids)
+            # Another request creates the destination stock meanwhile.
+            create_product_stock(
+                self.destination,
+                product=source_stock.product,
+                batch=source_stock.batch,
+            )
+            return locked
+
+        with patch.object(service, '_lock', side_effect=lock_then_create):
+            service.transfer_items()
+
+        destination_stock = ProductStock.objects.get(
+            warehouse=self.destination,
+            product=source_stock.product,
+            batch=source_stock.batch,
+        )
+        self.assertEqual(destination_stock.stock, 65)
+        self.assertEqual(destination_stock.available_stock, 55)
+        self.assertEqual(
+            TransferItem.objects.get(
+                transfer=self.transfer).destination_product_stock,
+            destination_stock)
+
+    def test_transfer_exceeds_available_stock(self):
+        """Test the accumulated lines cannot exceed the available stock."""
+        source_stock = create_product_stock(self.source)
+
+        with self.assertRaises(ValidationError) as context:
+            TransferService(self.transfer, [
+                {'product_stock': source_stock, 'quantity': 30},
+                {'product_stock': source_stock, 'quantity': 11},
+            ]).transfer_items()
+
+        self.assertIn(
+            "La cantidad excede el stock disponible.",
+            str(context.exception))
+        source_stock.refresh_from_db()
+        self.assertEqual(source_stock.stock, 50)
+        self.assertFalse(ProductStock.objects.filter(
+            warehouse=self.destination).exists())
+
+    def test_transfer_stock_from_other_warehouse(self):
+        """Test only stock of the source warehouse can be transferred."""
+        other_stock = create_product_stock(create_warehouse())
+
+        with self.assertRaises(ValidationError) as context:
+            TransferService(self.transfer, [
+                {'product_stock': other_stock, 'quantity': 1},
+            ]).transfer_items()
+
+        self.assertIn(
+            "no pertenece al almacén de origen", str(context.exception))
+
+    def test_transfer_runs_constant_queries(self):
+        """Test the number of queries does not grow with the lines."""
+        def build_items(count):
+            items = []
+            for _ in range(count):
+                source_stock = create_product_stock(self.source)
+                create_product_stock(
+                    self.destination,
+                    product=source_stock.product,
+                    batch=source_stock.batch,
+                )
+                items.append({'product_stock': source_stock, 'quantity': 5})
+            return items
+
+        small_items = build_items(2)
+        large_items = build_items(8)
+
+        # Savepoint, lock the stocks, update them, insert the transfer
+        # items and release.
+        with self.assertNumQueries(5):
+            TransferService(self.transfer, small_items).transfer_items()
+        with self.assertNumQueries(5):
+            TransferService(self.transfer, large_items).transfer_items()
@@ -11,6 +11,7 @@ from django.contrib.auth import get_user_model
 from unittest import TestCase
 from django.core.exceptions import ValidationError
 import uuid
+from datetime import date
 
 
 def create_user(**params):
@@ -337,3 +338,103 @@ class UpdateTransactionServiceTest(TestCase):
         self.assertIn(
             "El pago excede el total de la venta.", str(
                 context.exception))
+
+    def test_update_sale_payment_summary(self):
+        """Test the payment summary adds up the payments of a sale."""
+        agency = create_user().agency
+        sale = Sale.objects.create(
+            agency=agency,
+            client=create_client(),
+            selling_channel=create_selling_channel(),
+            seller=create_user(),
+            total=100,
+            balance_due=100,
+            status='realizado',
+            sale_type='contado',
+            sale_date='2025-01-01',
+        )
+
+        UpdateTransactionService(
+            sale.id, 50, 'venta').update_transaction_payment_summary(
+                date(2025, 5, 6), 'efectivo')
+        UpdateTransactionService(
+            sale.id, 30, 'venta').update_transaction_payment_summary(
+                date(2025, 3, 1), 'qr')
+
+        sale.refresh_from_db()
+        self.assertEqual(sale.amount_paid, 80)
+        self.assertEqual(sale.payment_count, 2)
+        self.assertEqual(sale.last_payment_date, date(2025, 5, 6))
+        self.assertEqual(sale.get_payment_methods(), ['efectivo', 'qr'])
+
+    def test_update_purchase_payment_summary(self):
+        """Test the payment summary of a purchase."""
+        unique_suffix = str(uuid.uuid4())[:8]
+        purchase = Purchase.objects.create(
+            agency=create_user().agency,
+            buyer=create_user(),
+            supplier=Supplier.objects.create(
+                name=f'Test Supplier{unique_suffix}',
+                phone='12345678',
+                nit=f'NIT-{unique_suffix}',
+                email=f'test{unique_suffix}@example.com',
+                address='Test Address'
+            ),
+            purchase_type='contado',
+            purchase_date='2025-05-05',
+            invoice_number=f'INV-{unique_suffix}',
+            total=100,
+            balance_due=100,
+        )
+
+        UpdateTransactionService(
+            purchase.id, 40, 'compra').update_transaction_payment_summary(
+                date(2025, 5, 6), 'tarjeta')
+
+        purchase.refresh_from_db()
+        self.assertEqual(purchase.amount_paid, 40)
+        self.assertEqual(purchase.payment_count, 1)
+        self.assertEqual(purchase.last_payment_date, date(2025, 5, 6))
+        self.assertEqual(purchase.get_payment_methods(), ['tarjeta'])
+
+    def test_refresh_payment_summary(self):
+        """Test the payment summary is rebuilt from the payments."""
+        sale = Sale.objects.create(
+            agency=create_user().agency,
+            client=create_client(),
+            selling_channel=create_selling_channel(),
+            seller=create_user(),
+            total=100,
+            balance_due=100,
+            status='realizado',
+            sale_type='contado',
+            sale_date='2025-01-01',
+            amount_paid=90,
+            payment_count=3,
+            payment_methods=7,
+        )
+        for amount, method, payment_date in (
+                (20, 'qr', date(2025, 2, 1)), (15, 'qr', date(2025, 4, 1))):
+            Payment.objects.create(
+                transaction_id=sale.id, transaction_type='venta',
+                payment_type='venta', payment_method=method, amount=amount,
+                payment_date=payment_date)
+
+        UpdateTransactionService(
+            sale.id, 20, 'venta').refresh_transaction_payment_summary()
+
+        sale.refresh_from_db()
+        self.assertEqual(sale.amount_paid, 35)
+        self.assertEqual(sale.payment_count, 2)
+        self.assertEqual(sale.last_payment_date, date(2025, 4, 1))
+        self.assertEqual(sale.get_payment_methods(), ['qr'])
+
+    def test_update_payment_summary_invalid_type(self):
+        """Test the payment summary rejects unknown transaction types."""
+        service = UpdateTransactionService(1, 10, 'otro')
+
+        with self.assertRaises(ValidationError) as context:
+            service.update_transaction_payment_summary(
+                date(2025, 5, 6), 'efectivo')
+
+        self.assertIn("Tipo de transacción no válido", str(context.exception))
@@ -0,0 +1,109 @@
+"""
+Tests for the aging report APIs.
+"""
+from datetime import date, timedelta
+from io import BytesIO
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Agency, Client, Sale, SellingChannel
+import uuid
+
+AGING_URL = reverse('sale:aging-report')
+AGING_EXCEL_URL = reverse('sale:aging-report-excel')
+
+
+def create_user():
+    unique_suffix = str(uuid.uuid4())[:8]
+    agency = Agency.objects.create(
+        name=f'Agency {unique_suffix}',
+        location='Test location',
+        city='La Paz',
+    )
+    return get_user_model().objects.create_user(
+        email=f'user{unique_suffix}@example.com',
+        password='testpass123',
+        ci=f'CI{unique_suffix}',
+        agency=agency,
+    )
+
+
+def create_sale(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    seller = create_user()
+    defaults = {
+        'agency': seller.agency,
+        'seller': seller,
+        'client': Client.objects.create(
+            name=f'Client {unique_suffix}',
+            phone='78885521',
+            nit=f'NIT{unique_suffix}',
+            email=f'client{unique_suffix}@example.com',
+            address='Test Address 123',
+        ),
+        'selling_channel': SellingChannel.objects.create(
+            name=f'Channel {unique_suffix}'),
+        'status': 'realizado',
+        'sale_type': 'credito',
+        'sale_date': date(2025, 1, 1),
+        'total': 100,
+        'balance_due': 100,
+    }
+    defaults.update(params)
+    return Sale.objects.create(**defaults)
+
+
+class PublicAgingReportApiTests(TestCase):
+    """Test API requests for unauthenticated users."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test that authentication is required for the aging reports."""
+        for url in (AGING_URL, AGING_EXCEL_URL):
+            res = self.client.get(url, {'type': 'cobrar'})
+
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AgingReportApiTests(TestCase):
+    """Tests for the aging report endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user())
+        self.sale = create_sale(
+            sale_date=date.today() - timedelta(days=40), balance_due=80)
+
+    def test_aging_report(self):
+        """Test the receivable aging is returned with its totals."""
+        res = self.client.get(AGING_URL, {'type': 'cobrar'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['rows']), 1)
+        self.assertEqual(
+            res.data['rows'][0]['party_name'], self.sale.client.name)
+        self.assertEqual(res.data['totals']['days_31_60'], 80)
+        self.assertEqual(res.data['totals']['total'], 80)
+
+    def test_aging_report_invalid_type(self):
+        """Test an unknown report type is rejected."""
+        res = self.client.get(AGING_URL, {'type': 'otro'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_aging_report_excel(self):
+        """Test the aging report is exported to Excel."""
+        res = self.client.get(AGING_EXCEL_URL, {'type': 'cobrar'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sheet = load_workbook(BytesIO(res.content)).active
+        self.assertEqual(sheet.cell(row=2, column=1).value, 'CLIENTE')
+        self.assertEqual(
+            sheet.cell(row=3, column=1).value, self.sale.client.name)
+        self.assertEqual(sheet.cell(row=3, column=3).value, 80)
+        self.assertEqual(sheet.cell(row=4, column=1).value, 'TOTAL')
@@ -1,4 +1,9 @@
+import json
+from base64 import urlsafe_b64encode
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -151,3 +156,53 @@ class PrivatCategoryApiTests(TestCase):
         res = self.client.delete(url)
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
         self.assertTrue(Category.objects.filter(id=category.id).exists())
+
+    def test_cursor_pagination(self):
+        """Test cursor pages follow the -id ordering without overlap."""
+        categories = [create_category() for _ in range(5)]
+        expected = [category.id for category in reversed(categories)]
+
+        res = self.client.get(CATEGORY_URL, {'cursor': '', 'limit': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in res.data['rows']], expected[:2])
+        self.assertIsNone(res.data['total'])
+        ids = [row['id'] for row in res.data['rows']]
+        while res.data['next']:
+            res = self.client.get(
+                CATEGORY_URL, {'cursor': res.data['next'], 'limit': 2})
+            ids += [row['id'] for row in res.data['rows']]
+
+        self.assertEqual(ids, expected)
+
+    def test_cursor_pagination_skips_count(self):
+        """Test cursor pages only count on request, then use the cache."""
+        cache.clear()
+        create_category()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(CATEGORY_URL, {'cursor': ''})
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries))
+
+        res = self.client.get(
+            CATEGORY_URL, {'cursor': '', 'with_total': 'true'})
+        self.assertEqual(res.data['total'], 1)
+
+        res = self.client.get(CATEGORY_URL, {'cursor': ''})
+        self.assertEqual(res.data['total'], 1)
+
+    def test_cursor_pagination_invalid_cursor(self):
+        """Test an invalid cursor is rejected."""
+        res = self.client.get(CATEGORY_URL, {'cursor': 'invalido'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination_wrongly_typed_cursor(self):
+        """Test a readable cursor with values of other types is rejected."""
+        for values in (['abc'], [{'id': 1}]):
+            cursor = urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+            res = self.client.get(CATEGORY_URL, {'cursor': cursor})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -6,7 +6,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from core.models import Client
+from core.models import Client, Payment, Sale, SellingChannel
 from sale.serializers import ClientSerializer
 import uuid
 
@@ -18,6 +18,10 @@ def detail_url(client_id):
     return reverse('sale:client-detail', args=[client_id])
 
 
+def statement_url(client_id):
+    return reverse('sale:client-statement', args=[client_id])
+
+
 def create_user(**params):
     """Create and return a sample user."""
     from core.models import Agency
@@ -161,3 +165,37 @@ class PrivateClientApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
         self.assertTrue(Client.objects.filter(id=client.id).exists())
+
+    def test_client_statement(self):
+        """Test the statement merges sales and payments with a balance."""
+        client = create_client()
+        sale = Sale.objects.create(
+            agency=self.user.agency,
+            client=client,
+            seller=self.user,
+            selling_channel=SellingChannel.objects.create(name='Tienda'),
+            status='realizado',
+            sale_type='credito',
+            sale_date='2025-01-01',
+            total=100,
+            balance_due=60,
+        )
+        Payment.objects.create(
+            transaction_id=sale.id,
+            transaction_type='venta',
+            amount=40,
+            payment_date='2025-01-02',
+        )
+
+        res = self.client.get(statement_url(client.id), {'limit': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total'], 2)
+        self.assertEqual(len(res.data['rows']), 1)
+        self.assertEqual(res.data['rows'][0]['transaction_id'], sale.id)
+
+        res = self.client.get(
+            statement_url(client.id), {'limit': 1, 'offset': 1})
+
+        self.assertEqual(res.data['rows'][0]['type'], 'pago')
+        self.assertEqual(res.data['rows'][0]['balance'], 60)
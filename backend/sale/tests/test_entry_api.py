@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -284,3 +286,64 @@ class PrivateEntryApiTests(TestCase):
                 db_item.product_stock.batch.id,
                 payload_item['batch'])
             self.assertEqual(db_item.quantity, payload_item['quantity'])
+
+    def test_list_queries_do_not_scale_with_page_size(self):
+        """Listing does not run extra queries per row."""
+        create_entry(warehouse_keeper=self.user)
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(ENTRY_URL)
+
+        for _ in range(3):
+            create_entry(warehouse_keeper=self.user)
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(ENTRY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['rows']), 4)
+        self.assertEqual(len(many), len(single))
+
+    def test_nested_user_is_compact_reference(self):
+        """The nested user only exposes its reference fields."""
+        create_entry(warehouse_keeper=self.user)
+
+        res = self.client.get(ENTRY_URL)
+
+        user = res.data['rows'][0]['warehouse_keeper']
+        self.assertEqual(user['id'], self.user.id)
+        self.assertEqual(
+            user['name'], f'{self.user.first_name} {self.user.last_name}')
+        self.assertNotIn('groups', user)
+        self.assertNotIn('user_permissions', user)
+        self.assertNotIn('email', user)
+
+    def test_list_entries_sparse_nested_list_fields(self):
+        """Test ?fields= prunes the joins of the prefetched items too."""
+        entry = create_entry(warehouse_keeper=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                ENTRY_URL, {'fields': 'id,entry_items.quantity'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['rows'][0], {
+            'id': entry.id,
+            'entry_items': [{'quantity': '10.00'}],
+        })
+        # The page count, the page and the items prefetch.
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(all('JOIN' not in q['sql'] for q in queries))
+
+    def test_list_entries_normalized(self):
+        """Test ?normalize=true side-loads the products of the items."""
+        entry = create_entry(warehouse_keeper=self.user)
+        product_stock = entry.entry_items.get().product_stock
+
+        res = self.client.get(ENTRY_URL, {'normalize': 'true'})
+
+        item = res.data['rows'][0]['entry_items'][0]
+        self.assertEqual(
+            item['products_stock']['products'], product_stock.product_id)
+        self.assertEqual(
+            res.data['included']['products'][product_stock.product_id][
+                'name'],
+            product_stock.product.name)
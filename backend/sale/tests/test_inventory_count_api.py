@@ -0,0 +1,147 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import (
+    Batch, Category, InventoryCount, MeasureUnit, Product, ProductStock,
+    Warehouse,
+)
+import uuid
+
+INVENTORY_COUNT_URL = reverse('sale:inventorycount-list')
+
+
+def create_user(**params):
+    """Create and return a sample user."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'ci': f'1234567{unique_suffix}',
+        'phone': '12345678',
+        'address': 'Test Address',
+        'email': f't{unique_suffix}@test.com',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_product_stock(**params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Test location'),
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 0,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+def count_file(*rows):
+    content = 'ID_ALMACEN,ID_PRODUCTO,ID_LOTE,CANTIDAD\n' + ''.join(
+        f'{stock.warehouse_id},{stock.product_id},{stock.batch_id},'
+        f'{quantity}\n' for stock, quantity in rows)
+    return SimpleUploadedFile('conteo.csv', content.encode())
+
+
+class PublicInventoryCountApiTests(TestCase):
+    """Test API requests for unauthenticated users."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test that authentication is required for accessing the endpoint."""
+        res = self.client.get(INVENTORY_COUNT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateInventoryCountApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_upload_review_and_apply_count(self):
+        """Test a count is uploaded, reviewed and applied."""
+        counted_less = create_product_stock()
+        counted_equal = create_product_stock()
+
+        res = self.client.post(INVENTORY_COUNT_URL, {
+            'file': count_file((counted_less, 45), (counted_equal, 50)),
+            'note': 'Conteo mensual',
+        }, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['line_count'], 2)
+        self.assertEqual(res.data['variance_count'], 1)
+        count_id = res.data['id']
+
+        lines_url = reverse('sale:inventorycount-lines', args=[count_id])
+        res = self.client.get(lines_url, {'only_variances': 'true'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total'], 1)
+        self.assertEqual(
+            res.data['rows'][0]['product_stock'], counted_less.id)
+        self.assertEqual(float(res.data['rows'][0]['variance']), -5)
+
+        apply_url = reverse('sale:inventorycount-apply', args=[count_id])
+        res = self.client.post(apply_url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], 'aplicado')
+        counted_less.refresh_from_db()
+        self.assertEqual(counted_less.stock, 45)
+        self.assertEqual(counted_less.available_stock, 35)
+
+    def test_upload_invalid_file(self):
+        """Test uploading a file that is not CSV or XLSX fails."""
+        res = self.client.post(INVENTORY_COUNT_URL, {
+            'file': SimpleUploadedFile('conteo.txt', b'1,2,3,4'),
+        }, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(InventoryCount.objects.exists())
+
+    def test_upload_corrupt_xlsx(self):
+        """Test uploading an XLSX that can't be opened fails."""
+        res = self.client.post(INVENTORY_COUNT_URL, {
+            'file': SimpleUploadedFile('conteo.xlsx', b'no es un libro'),
+        }, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(InventoryCount.objects.exists())
+
+    def test_apply_twice(self):
+        """Test an applied count cannot be applied again."""
+        product_stock = create_product_stock()
+        res = self.client.post(INVENTORY_COUNT_URL, {
+            'file': count_file((product_stock, 45)),
+        }, format='multipart')
+        apply_url = reverse('sale:inventorycount-apply', args=[res.data['id']])
+        self.client.post(apply_url)
+
+        res = self.client.post(apply_url)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['detail'], 'El conteo ya fue aplicado.')
@@ -1,7 +1,9 @@
 """
 Tests for output APIs
 """
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -278,3 +280,32 @@ class PrivateOutputApiTests(TestCase):
                 db_item.product_stock.id,
                 payload_item['product_stock'])
             self.assertEqual(db_item.quantity, payload_item['quantity'])
+
+    def test_list_queries_do_not_scale_with_page_size(self):
+        """Listing does not run extra queries per row."""
+        create_output(warehouse_keeper=self.user)
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(OUTPUT_URL)
+
+        for _ in range(3):
+            create_output(warehouse_keeper=self.user)
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(OUTPUT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['rows']), 4)
+        self.assertEqual(len(many), len(single))
+
+    def test_nested_user_is_compact_reference(self):
+        """The nested user only exposes its reference fields."""
+        create_output(warehouse_keeper=self.user)
+
+        res = self.client.get(OUTPUT_URL)
+
+        user = res.data['rows'][0]['warehouse_keeper']
+        self.assertEqual(user['id'], self.user.id)
+        self.assertEqual(
+            user['name'], f'{self.user.first_name} {self.user.last_name}')
+        self.assertNotIn('groups', user)
+        self.assertNotIn('user_permissions', user)
+        self.assertNotIn('email', user)
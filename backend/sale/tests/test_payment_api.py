@@ -11,6 +11,8 @@ import uuid
 from datetime import date
 
 PAYMENT_URL = reverse('sale:payment-list')
+BULK_PAYMENT_URL = reverse('sale:payment-bulk')
+RECONCILIATION_URL = reverse('sale:balance-reconciliation')
 
 
 def detail_url(payment_id):
@@ -213,6 +215,100 @@ class PrivatePaymentApiTests(TestCase):
         self.assertEqual(payload['payment_date'], payment.payment_date)
         self.assertEqual(payload['payment_type'], payment.payment_type)
 
+    def test_create_payment_updates_payment_summary(self):
+        """Test creating a payment updates the sale payment summary."""
+        sale = create_sale()
+        payload = {
+            'transaction_id': sale.id,
+            'payment_method': 'qr',
+            'transaction_type': 'venta',
+            'amount': 40.00,
+            'payment_date': date(2024, 1, 2),
+            'payment_type': 'anticipo',
+        }
+
+        res = self.client.post(PAYMENT_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        sale.refresh_from_db()
+        self.assertEqual(sale.amount_paid, 40)
+        self.assertEqual(sale.payment_count, 1)
+        self.assertEqual(sale.last_payment_date, date(2024, 1, 2))
+        self.assertEqual(sale.get_payment_methods(), ['qr'])
+
+    def test_update_payment_refreshes_payment_summary(self):
+        """Test editing a payment rebuilds the sale payment summary."""
+        sale = create_sale()
+        res = self.client.post(PAYMENT_URL, {
+            'transaction_id': sale.id,
+            'payment_method': 'efectivo',
+            'transaction_type': 'venta',
+            'amount': 40.00,
+            'payment_date': date(2024, 1, 2),
+            'payment_type': 'anticipo',
+        })
+
+        res = self.client.patch(detail_url(res.data['id']), {
+            'payment_method': 'qr',
+            'amount': 30.00,
+            'payment_date': date(2024, 1, 5),
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sale.refresh_from_db()
+        self.assertEqual(sale.amount_paid, 30)
+        self.assertEqual(sale.payment_count, 1)
+        self.assertEqual(sale.last_payment_date, date(2024, 1, 5))
+        self.assertEqual(sale.get_payment_methods(), ['qr'])
+
+    def test_bulk_payments(self):
+        """Test applying many payments in one request."""
+        first_sale = create_sale()
+        second_sale = create_sale()
+        balance_due = first_sale.balance_due
+        payload = {'payments': [
+            {
+                'transaction_id': sale.id,
+                'transaction_type': 'venta',
+                'payment_type': 'venta',
+                'payment_method': 'efectivo',
+                'amount': 10.00,
+                'payment_date': '2024-01-02',
+            }
+            for sale in (first_sale, second_sale)
+        ]}
+
+        res = self.client.post(BULK_PAYMENT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        first_sale.refresh_from_db()
+        self.assertEqual(first_sale.payment_count, 1)
+        self.assertEqual(first_sale.balance_due, balance_due - 10)
+
+    def test_bulk_payments_rejects_invalid_batch(self):
+        """Test an invalid payment rejects the whole batch."""
+        sale = create_sale()
+        payload = {'payments': [
+            {
+                'transaction_id': sale.id,
+                'transaction_type': 'venta',
+                'payment_type': 'venta',
+                'amount': amount,
+                'payment_date': '2024-01-02',
+            }
+            for amount in (10, sale.balance_due)
+        ]}
+
+        res = self.client.post(BULK_PAYMENT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data['detail'],
+            f"El pago excede el saldo pendiente de la venta {sale.id}.")
+        self.assertFalse(Payment.objects.filter(
+            transaction_id=sale.id, transaction_type='venta').exists())
+
     def test_partial_update_payment(self):
         """Test for partial update a payment."""
         payment = create_payment(payment_method='tarjeta')
@@ -249,3 +345,29 @@ class PrivatePaymentApiTests(TestCase):
         self.assertEqual(payload['transaction_type'], payment.transaction_type)
         self.assertEqual(payload['amount'], payment.amount)
         self.assertEqual(payload['payment_date'], payment.payment_date)
+
+    def test_balance_reconciliation_requires_staff(self):
+        """Test only staff users can reconcile balances."""
+        res = self.client.get(RECONCILIATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_balance_reconciliation(self):
+        """Test staff users can report and repair balance drift."""
+        self.user.is_staff = True
+        self.user.save()
+        sale = create_sale(status='realizado')
+        expected = sale.total
+
+        res = self.client.get(RECONCILIATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['venta']['total'], 1)
+        self.assertEqual(res.data['venta']['rows'][0]['id'], sale.id)
+
+        res = self.client.post(RECONCILIATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['repaired'], {'venta': 1, 'compra': 0})
+        sale.refresh_from_db()
+        self.assertEqual(sale.balance_due, expected)
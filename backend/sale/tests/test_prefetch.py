@@ -0,0 +1,152 @@
+"""
+Tests for the prefetch planner of the sale serializers.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import (
+    Batch, Category, MeasureUnit, Product, ProductStock, Supplier, Warehouse,
+)
+from sale.prefetch import plan_prefetch
+from sale.serializers import (
+    EntrySerializer, ProductChannelPriceSerializer, PurchaseSerializer,
+)
+import uuid
+
+SUPPLIER_URL = reverse('sale:supplier-list')
+WAREHOUSE_URL = reverse('sale:warehouse-list')
+
+
+def create_user(**params):
+    """Create and return a sample User."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'email': f'test{unique_suffix}@example.com',
+        'ci': f'123{unique_suffix}',
+        'phone': f'7{unique_suffix}',
+        'password': 'testpass123',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_product(**params):
+    """Create and return a sample product."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'category': Category.objects.create(name=f'Cat {unique_suffix}'),
+        'measure_unit': MeasureUnit.objects.create(
+            name=f'Unit {unique_suffix}'),
+        'name': f'Product {unique_suffix}',
+        'code': f'P{unique_suffix}',
+        'minimum_sale_price': 10,
+        'maximum_sale_price': 20,
+    }
+    defaults.update(params)
+    return Product.objects.create(**defaults)
+
+
+def create_warehouse():
+    """Create and return a warehouse with two product stocks."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    warehouse = Warehouse.objects.create(
+        name=f'Warehouse {unique_suffix}', location='Location')
+    for _ in range(2):
+        ProductStock.objects.create(
+            product=create_product(),
+            warehouse=warehouse,
+            batch=Batch.objects.create(name=f'Batch {uuid.uuid4()}'[:30]),
+            stock=10,
+            available_stock=10,
+            minimum_stock=1,
+            maximum_stock=20,
+        )
+    return warehouse
+
+
+def create_supplier():
+    """Create and return a supplier with two products."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    supplier = Supplier.objects.create(
+        name=f'Supplier {unique_suffix}', phone=f'7{unique_suffix}')
+    supplier.product.set([create_product(), create_product()])
+    return supplier
+
+
+class PlanPrefetchTests(TestCase):
+    """Test the lookups planned from serializer trees."""
+
+    def test_plan_nested_items(self):
+        """Test nested lists are prefetched with their own joins."""
+        select_related, prefetch_related = plan_prefetch(EntrySerializer())
+
+        self.assertEqual(
+            select_related, ['supplier', 'warehouse_keeper'])
+        lookups = {
+            prefetch.prefetch_to: prefetch for prefetch in prefetch_related}
+        self.assertEqual(
+            set(lookups), {'supplier__product', 'entry_items'})
+        self.assertEqual(
+            lookups['entry_items'].queryset.query.select_related, {
+                'product_stock': {
+                    'batch': {},
+                    'product': {'category': {}, 'measure_unit': {}},
+                    'warehouse': {},
+                },
+            })
+
+    def test_plan_skips_non_relations(self):
+        """Test annotations, payments and method sources add no lookups."""
+        select_related, prefetch_related = plan_prefetch(
+            PurchaseSerializer())
+
+        self.assertEqual(select_related, ['buyer', 'supplier'])
+        self.assertEqual(
+            sorted(prefetch.prefetch_to for prefetch in prefetch_related),
+            ['purchase_items', 'supplier__product'])
+
+    def test_plan_primary_keys_only(self):
+        """Test primary key fields are read without joins."""
+        self.assertEqual(
+            plan_prefetch(ProductChannelPriceSerializer()), ([], []))
+
+
+class QueryBudgetTests(TestCase):
+    """Test list endpoints run a fixed number of queries per page."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def assertFixedQueries(self, url, create):
+        create()
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(url)
+
+        for _ in range(3):
+            create()
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(url)
+
+        self.assertEqual(len(res.data['rows']), 4)
+        self.assertEqual(len(many), len(single))
+        return single
+
+    def test_list_warehouses(self):
+        """Test warehouses load their product stocks in one query."""
+        queries = self.assertFixedQueries(WAREHOUSE_URL, create_warehouse)
+
+        # Count, page and the product stocks with their products.
+        self.assertEqual(len(queries), 3)
+
+    def test_list_suppliers(self):
+        """Test suppliers load their products in one query."""
+        queries = self.assertFixedQueries(SUPPLIER_URL, create_supplier)
+
+        self.assertEqual(len(queries), 3)
@@ -1,6 +1,7 @@
 from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from core.models import (
@@ -12,6 +13,7 @@ from core.models import (
     MeasureUnit,
 )
 from sale.serializers import ProductSerializer
+from sale.views import PersonalizedPagination
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
 import uuid
@@ -441,3 +443,22 @@ class PrivateProductApiTests(TestCase):
         res = self.client.delete(url)
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
         self.assertTrue(Product.objects.filter(id=product.id).exists())
+
+    def test_cursor_pagination_related_ordering(self):
+        """Test cursor pages follow an ordering across a relation."""
+        products = [
+            create_product(category=create_category(name=f'Categoria {name}'))
+            for name in ('C', 'A', 'B')
+        ]
+        queryset = Product.objects.order_by('category__name')
+        factory = APIRequestFactory()
+        paginator = PersonalizedPagination()
+
+        rows = paginator.paginate_queryset(queryset, Request(
+            factory.get('/', {'cursor': '', 'limit': 2})))
+        rows += PersonalizedPagination().paginate_queryset(queryset, Request(
+            factory.get('/', {'cursor': paginator.next_cursor, 'limit': 2})))
+
+        self.assertEqual(
+            [product.id for product in rows],
+            [products[1].id, products[2].id, products[0].id])
@@ -16,6 +16,7 @@ from core.models import (
     Category,
     Batch,
     MeasureUnit,
+    Supplier,
 )
 
 
@@ -108,7 +109,7 @@ class PrivateProductStockApiTests(TestCase):
     def test_increment_damaged_stock_success(self):
         """Test successfully incrementing damaged stock."""
         product_stock = create_product_stock(
-            stock=100,
+            stock=105,
             reserved_stock=20,
             available_stock=80,
             damaged_stock=5
@@ -275,3 +276,102 @@ class PrivateProductStockApiTests(TestCase):
         # Verify damaged_stock was not changed
         product_stock.refresh_from_db()
         self.assertEqual(product_stock.damaged_stock, 30)
+
+    def test_allocate_splits_quantity_across_batches(self):
+        """Test allocating a quantity larger than one stock splits it."""
+        oldest = create_product_stock(
+            stock=30, reserved_stock=0, available_stock=30)
+        newest = create_product_stock(
+            product=oldest.product,
+            stock=50, reserved_stock=0, available_stock=50)
+        url = reverse('sale:productstock-allocate')
+        payload = {
+            'lines': [{'product': oldest.product.id, 'quantity': 40}],
+        }
+
+        res = self.client.post(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(line['product_stock'], line['quantity']) for line in res.data],
+            [(oldest.id, '30.00'), (newest.id, '10.00')])
+
+    def test_allocate_insufficient_stock(self):
+        """Test allocating more than the available stock fails."""
+        product_stock = create_product_stock()
+        url = reverse('sale:productstock-allocate')
+        payload = {
+            'lines': [{'product': product_stock.product.id, 'quantity': 81}],
+        }
+
+        res = self.client.post(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('detail', res.data)
+
+    def test_allocate_nearest_requires_agency(self):
+        """Test the nearest policy needs an agency."""
+        product_stock = create_product_stock()
+        url = reverse('sale:productstock-allocate')
+        payload = {
+            'policy': 'nearest',
+            'lines': [{'product': product_stock.product.id, 'quantity': 1}],
+        }
+
+        res = self.client.post(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('agency', res.data)
+
+    def test_low_stock_lists_stocks_below_minimum(self):
+        """Test only the stocks below their minimum are listed."""
+        low = create_product_stock(
+            stock=25, reserved_stock=20, available_stock=5,
+            minimum_stock=10, maximum_stock=50)
+        create_product_stock()
+        url = reverse('sale:productstock-low-stock')
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total'], 1)
+        self.assertEqual(res.data['rows'][0]['id'], low.id)
+        self.assertEqual(res.data['rows'][0]['suggested_quantity'], '45.00')
+
+    def test_low_stock_reports_reject_invalid_warehouse(self):
+        """Test a non numeric warehouse filter is a bad request."""
+        for name in ('low-stock', 'reorder-suggestions'):
+            url = reverse(f'sale:productstock-{name}')
+
+            res = self.client.get(url, {'warehouse_id': 'abc'})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('warehouse_id', res.data)
+
+    def test_reorder_suggestions_grouped_by_supplier(self):
+        """Test suggested quantities are grouped by supplier."""
+        first = create_product_stock(
+            stock=25, reserved_stock=20, available_stock=5,
+            minimum_stock=10, maximum_stock=50)
+        create_product_stock(
+            product=first.product,
+            stock=8, reserved_stock=0, available_stock=8,
+            minimum_stock=10, maximum_stock=20)
+        without_supplier = create_product_stock(
+            stock=0, reserved_stock=0, available_stock=0,
+            minimum_stock=1, maximum_stock=10)
+        supplier = Supplier.objects.create(name='Proveedor Uno')
+        supplier.product.add(first.product)
+        url = reverse('sale:productstock-reorder-suggestions')
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        groups = {
+            group['supplier'] and group['supplier']['id']: group
+            for group in res.data
+        }
+        self.assertEqual(
+            groups[supplier.id]['products'][0]['suggested_quantity'], 57)
+        self.assertEqual(
+            groups[None]['products'][0]['id'], without_supplier.product.id)
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -227,6 +229,26 @@ class PrivatePurchaseApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['rows'], serializer.data)
 
+    def test_list_purchases_batches_payments(self):
+        """Test payments are loaded with one query per page."""
+        purchase = create_purchase()
+        create_payment(transaction_id=purchase.id, amount=20)
+        create_payment(transaction_id=purchase.id, amount=30)
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(PURCHASE_URL)
+
+        for _ in range(3):
+            other = create_purchase()
+            create_payment(transaction_id=other.id)
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(PURCHASE_URL)
+
+        self.assertEqual(len(many), len(single))
+        rows = {row['id']: row for row in res.data['rows']}
+        self.assertEqual(
+            [payment['amount'] for payment in rows[purchase.id]['payments']],
+            ['20.00', '30.00'])
+
     def test_create_purchase(self):
         """Test creating a purchase."""
         agency = create_agency()
@@ -272,3 +294,55 @@ class PrivatePurchaseApiTests(TestCase):
         self.assertEqual(purchase.invoice_number, payload['invoice_number'])
         self.assertEqual(float(purchase.total), payload['total'])
         self.assertEqual(float(purchase.balance_due), 0.0)
+
+    def test_list_purchases_sparse_fields(self):
+        """Test ?fields= returns only the requested fields in one query."""
+        purchase = create_purchase()
+        create_purchase()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                PURCHASE_URL, {'fields': 'id,invoice_number'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        row = next(r for r in res.data['rows'] if r['id'] == purchase.id)
+        self.assertEqual(row, {
+            'id': purchase.id, 'invoice_number': purchase.invoice_number})
+        # The page count and the page itself, no joins nor prefetches.
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('JOIN', queries[1]['sql'])
+
+    def test_list_purchases_sparse_nested_fields(self):
+        """Test dotted ?fields= prune nested objects and their prefetches."""
+        purchase = create_purchase()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                PURCHASE_URL, {'fields': 'id,suppliers.name'})
+
+        self.assertEqual(res.data['rows'][0], {
+            'id': purchase.id,
+            'suppliers': {'name': purchase.supplier.name},
+        })
+        self.assertEqual(len(queries), 2)
+
+    def test_list_purchases_expand(self):
+        """Test ?expand= embeds only the listed nested objects."""
+        create_purchase()
+
+        res = self.client.get(PURCHASE_URL, {'expand': 'purchase_items'})
+
+        row = res.data['rows'][0]
+        self.assertIn('purchase_items', row)
+        self.assertIn('invoice_number', row)
+        self.assertNotIn('suppliers', row)
+        self.assertNotIn('buyer', row)
+        self.assertNotIn('payments', row)
+
+    def test_retrieve_purchase_sparse_fields(self):
+        """Test ?fields= also applies to the detail endpoint."""
+        purchase = create_purchase()
+
+        res = self.client.get(detail_url(purchase.id), {'fields': 'id,total'})
+
+        self.assertEqual(set(res.data), {'id', 'total'})
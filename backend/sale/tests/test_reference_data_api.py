@@ -0,0 +1,133 @@
+"""
+Tests for the reference data bootstrap API.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Agency, Category, Sale
+import uuid
+
+BOOTSTRAP_URL = reverse('sale:bootstrap')
+
+
+def create_user(**params):
+    """Create and return a sample User."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'email': f'test{unique_suffix}@example.com',
+        'ci': f'123{unique_suffix}',
+        'phone': f'7{unique_suffix}',
+        'password': 'testpass123',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class PublicReferenceDataApiTests(TestCase):
+    """Test API requests for unauthenticated users."""
+
+    def test_auth_required(self):
+        """Test that authentication is required."""
+        res = APIClient().get(BOOTSTRAP_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateReferenceDataApiTests(TestCase):
+    """Test API requests for authenticated users."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_bootstrap(self):
+        """Test the reference lists and choices come in one payload."""
+        category = Category.objects.create(name='Cerámicos')
+
+        res = self.client.get(BOOTSTRAP_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            {'id': category.id, 'name': 'Cerámicos'}, res.data['categories'])
+        for key in ('agencies', 'warehouses', 'batches', 'measure_units',
+                    'selling_channels', 'clients', 'suppliers', 'products'):
+            self.assertIn(key, res.data)
+        self.assertEqual(
+            res.data['choices']['sale_statuses'],
+            [{'value': value, 'label': label}
+             for value, label in Sale.STATUS_CHOICES])
+        self.assertEqual(
+            len(res.data['choices']['agency_cities']),
+            len(Agency.CITY_CHOICES))
+        self.assertTrue(res['ETag'])
+
+    def test_bootstrap_cached(self):
+        """Test the payload is only built once per version."""
+        self.client.get(BOOTSTRAP_URL)
+
+        # Only the version is read.
+        with self.assertNumQueries(1):
+            res = self.client.get(BOOTSTRAP_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_bootstrap_not_modified(self):
+        """Test a matching If-None-Match is answered with 304."""
+        etag = self.client.get(BOOTSTRAP_URL)['ETag']
+
+        res = self.client.get(BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_bootstrap_not_modified_weak_etag_list(self):
+        """Test a weak ETag inside an If-None-Match list also matches."""
+        etag = self.client.get(BOOTSTRAP_URL)['ETag']
+
+        res = self.client.get(
+            BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_bootstrap_invalidated_on_change(self):
+        """Test a change of a reference model bumps the version."""
+        etag = self.client.get(BOOTSTRAP_URL)['ETag']
+
+        category = Category.objects.create(name='Porcelanatos')
+        res = self.client.get(BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertIn(
+            {'id': category.id, 'name': 'Porcelanatos'},
+            res.data['categories'])
+
+    def test_bootstrap_invalidated_on_delete(self):
+        """Test a deletion of a reference row changes the version."""
+        Category.objects.create(name='Porcelanatos')
+        category = Category.objects.create(name='Cerámicos')
+        etag = self.client.get(BOOTSTRAP_URL)['ETag']
+
+        category.delete()
+        res = self.client.get(BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn(
+            {'id': category.id, 'name': 'Cerámicos'}, res.data['categories'])
+
+    def test_bootstrap_version_shared_by_workers(self):
+        """Test the version survives a cache of its own per worker."""
+        etag = self.client.get(BOOTSTRAP_URL)['ETag']
+        # Another worker: nothing of this one in its cache.
+        cache.clear()
+
+        res = self.client.get(BOOTSTRAP_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -1,11 +1,13 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from core.models import (
     Agency, Batch, Category, Client, MeasureUnit, Product, ProductStock,
-    Sale, SaleItem, SellingChannel, Warehouse,
+    Sale, SaleItem, SellingChannel, StockReservation, Warehouse,
 )
 import uuid
 from datetime import datetime
@@ -320,7 +322,7 @@ class PrivateSaleApiTests(TestCase):
     def test_create_proforma_sale_allows_quantity_over_available_stock(self):
         """Proforma sales should not validate quantity against
         available stock."""
-        product_stock = create_product_stock(available_stock=5)
+        product_stock = create_product_stock(stock=15, available_stock=5)
         payload = {
             'agency': create_agency().id,
             'client': create_client().id,
@@ -351,7 +353,7 @@ class PrivateSaleApiTests(TestCase):
     def test_update_sale_to_realizado_rejects_quantity_over_available_stock(
             self):
         """Non-proforma sale updates should validate quantity against stock."""
-        product_stock = create_product_stock(available_stock=5)
+        product_stock = create_product_stock(stock=15, available_stock=5)
         sale = create_sale(
             status='proforma',
             sale_type='proforma',
@@ -401,3 +403,265 @@ class PrivateSaleApiTests(TestCase):
             res.data['sale_items'][0]['quantity'][0],
             "No se puede vender una cantidad mayor al stock actual.",
         )
+
+    def test_reject_sale_releases_reserved_stock(self):
+        """Rejecting a realizado sale should release its reservations."""
+        product_stock = create_product_stock(
+            stock=20, reserved_stock=0, available_stock=20)
+        sale = create_sale(
+            status='proforma',
+            sale_type='proforma',
+            seller=self.user,
+            sale_items=[{
+                'product_stock': product_stock,
+                'quantity': 5,
+                'unit_price': 10.00,
+                'sub_total_price': 50.00,
+                'total_price': 50.00,
+            }],
+        )
+        sale_item = sale.sale_items.first()
+        payload = {
+            'agency': sale.agency.id,
+            'client': sale.client.id,
+            'selling_channel': sale.selling_channel.id,
+            'total': 50.00,
+            'balance_due': 50.00,
+            'status': 'realizado',
+            'sale_type': 'contado',
+            'sale_date': '2024-01-01',
+            'sale_items': [
+                {
+                    'id': sale_item.id,
+                    'product_stock': product_stock.id,
+                    'quantity': 5,
+                    'unit_price': 10.00,
+                    'sub_total_price': 50.00,
+                    'total_price': 50.00,
+                }
+            ],
+        }
+        url = detail_url(sale.id)
+
+        res = self.client.put(
+            url,
+            payload,
+            format='json',
+            HTTP_IDEMPOTENCY_KEY='reject-idempotency-key',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        reservation = sale.reservations.get()
+        self.assertEqual(reservation.quantity, 5)
+        product_stock.refresh_from_db()
+        self.assertEqual(product_stock.reserved_stock, 5)
+
+        res = self.client.patch(url, {'status': 'rechazado'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'liberada')
+        product_stock.refresh_from_db()
+        self.assertEqual(product_stock.reserved_stock, 0)
+        self.assertEqual(product_stock.available_stock, 20)
+
+    def test_remove_item_releases_reserved_stock(self):
+        """Removing a reserved item should return its stock to available."""
+        product_stock = create_product_stock(
+            stock=20, reserved_stock=5, available_stock=15)
+        kept_stock = create_product_stock(
+            stock=20, reserved_stock=2, available_stock=18)
+        sale = create_sale(
+            status='realizado',
+            seller=self.user,
+            sale_items=[{
+                'product_stock': stock,
+                'quantity': quantity,
+                'unit_price': 10.00,
+                'sub_total_price': 10.00 * quantity,
+                'total_price': 10.00 * quantity,
+            } for stock, quantity in ((product_stock, 5), (kept_stock, 2))],
+        )
+        removed, kept = sale.sale_items.order_by('id')
+        for item in (removed, kept):
+            StockReservation.objects.create(
+                sale=sale, sale_item=item,
+                product_stock=item.product_stock, quantity=item.quantity)
+
+        res = self.client.patch(detail_url(sale.id), {
+            'sale_items': [{
+                'id': kept.id,
+                'product_stock': kept_stock.id,
+                'quantity': 2,
+                'unit_price': 10.00,
+                'sub_total_price': 20.00,
+                'total_price': 20.00,
+            }],
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(SaleItem.objects.filter(id=removed.id).exists())
+        product_stock.refresh_from_db()
+        self.assertEqual(product_stock.reserved_stock, 0)
+        self.assertEqual(product_stock.available_stock, 20)
+        kept_stock.refresh_from_db()
+        self.assertEqual(kept_stock.reserved_stock, 2)
+
+    def test_cursor_pagination_follows_sale_ordering(self):
+        """Cursor pages should keep the anticipation-first ordering."""
+        sales = [
+            create_sale(seller=self.user, sale_anticipation=anticipation)
+            for anticipation in (True, False, True, False, False)
+        ]
+        expected = [
+            sale.id for sale in sorted(
+                sales, key=lambda sale: (
+                    not sale.sale_anticipation, -sale.id))
+        ]
+
+        ids = []
+        params = {'cursor': '', 'limit': 2}
+        while True:
+            res = self.client.get(SALE_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [row['id'] for row in res.data['rows']]
+            if not res.data['next']:
+                break
+            params = {'cursor': res.data['next'], 'limit': 2}
+
+        self.assertEqual(ids, expected)
+
+    def test_search_sales(self):
+        """Search should match every term against the sale document."""
+        sale = create_sale(
+            seller=self.user, client=create_client(name='Ferreteria Andina'))
+        create_sale(
+            seller=self.user, client=create_client(name='Ferreteria Central'))
+        create_sale(seller=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                SALE_URL, {'search': 'andina ferreteria'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in res.data['rows']], [sale.id])
+        self.assertNotIn('search_document', res.data['rows'][0])
+        count_sql = queries[0]['sql']
+        self.assertNotIn('core_client', count_sql)
+        self.assertNotIn('core_user', count_sql)
+
+    def test_list_sales_summary_view(self):
+        """The summary view returns flat sales with annotated totals."""
+        sale = create_sale(seller=self.user)
+        SaleItem.objects.create(
+            sale=sale,
+            product_stock=create_product_stock(),
+            quantity=10,
+            unit_price=10.00,
+            total_price=10.00,
+            dispatched_stock=0,
+        )
+
+        res = self.client.get(SALE_URL, {'view': 'summary'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        row = res.data['rows'][0]
+        self.assertEqual(row['id'], sale.id)
+        self.assertEqual(row['client_name'], sale.client.name)
+        self.assertEqual(row['item_count'], 2)
+        self.assertEqual(row['quantity_total'], '20.00')
+        self.assertEqual(row['dispatched_total'], '5.00')
+        self.assertEqual(row['dispatch_progress'], 25)
+        self.assertNotIn('sale_items', row)
+        self.assertNotIn('outputs', row)
+
+    def test_list_sales_summary_view_query_count(self):
+        """The summary view does not grow with the size of the page."""
+        for _ in range(5):
+            create_sale(seller=self.user)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(SALE_URL, {'view': 'summary'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['rows']), 5)
+
+    def test_retrieve_sale_ignores_summary_view(self):
+        """Retrieving a sale always returns the full representation."""
+        sale = create_sale(seller=self.user)
+
+        res = self.client.get(detail_url(sale.id), {'view': 'summary'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('sale_items', res.data)
+
+    def test_list_sales_queries_do_not_scale_with_page_size(self):
+        """Listing sales does not run extra queries per sale."""
+        create_sale(seller=self.user)
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(SALE_URL)
+
+        for _ in range(3):
+            create_sale(seller=self.user)
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(SALE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['rows']), 4)
+        self.assertEqual(len(many), len(single))
+        seller = res.data['rows'][0]['seller']
+        self.assertEqual(
+            set(seller),
+            {'id', 'name', 'first_name', 'last_name', 'user_type', 'agency'})
+
+    def test_list_sales_normalized(self):
+        """Repeated related objects are sent once in `included`."""
+        product_stock = create_product_stock()
+        item = {
+            'product_stock': product_stock,
+            'quantity': 1,
+            'unit_price': 10.00,
+            'total_price': 10.00,
+        }
+        for _ in range(2):
+            create_sale(seller=self.user, sale_items=[item, item])
+
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(SALE_URL)
+        with CaptureQueriesContext(connection) as normalized:
+            res = self.client.get(SALE_URL, {'normalize': 'true'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(normalized), len(full))
+        product = product_stock.product
+        for row in res.data['rows']:
+            for sale_item in row['sale_items']:
+                stock = sale_item['products_stock']
+                self.assertEqual(stock['products'], product.id)
+                self.assertEqual(stock['batch'], product_stock.batch_id)
+                self.assertEqual(
+                    stock['warehouses'], product_stock.warehouse_id)
+        included = res.data['included']
+        self.assertEqual(list(included['products']), [product.id])
+        self.assertEqual(
+            included['products'][product.id]['category'],
+            product.category_id)
+        self.assertEqual(
+            included['categories'][product.category_id]['name'],
+            product.category.name)
+        self.assertEqual(
+            list(included['measure_units']), [product.measure_unit_id])
+        self.assertEqual(
+            list(included['batches']), [product_stock.batch_id])
+        self.assertEqual(
+            list(included['warehouses']), [product_stock.warehouse_id])
+
+    def test_list_sales_not_normalized_by_default(self):
+        """Without `normalize` the related objects stay nested."""
+        create_sale(seller=self.user)
+
+        res = self.client.get(SALE_URL)
+
+        self.assertNotIn('included', res.data)
+        stock = res.data['rows'][0]['sale_items'][0]['products_stock']
+        self.assertIn('name', stock['products'])
@@ -0,0 +1,196 @@
+"""
+Tests for the delta sync of the list endpoints.
+"""
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import (
+    Batch, Category, DeletedRecord, MeasureUnit, Product, ProductStock,
+    Warehouse,
+)
+from sale.services.stock_constraint_service import GuardedStockUpdateService
+import uuid
+
+CATEGORY_URL = reverse('sale:category-list')
+PRODUCT_STOCK_URL = reverse('sale:productstock-list')
+
+
+def create_user(**params):
+    """Create and return a sample User."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'email': f'test{unique_suffix}@example.com',
+        'ci': f'123{unique_suffix}',
+        'phone': f'7{unique_suffix}',
+        'password': 'testpass123',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_product_stock():
+    """Create and return a sample product stock."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    product = Product.objects.create(
+        category=Category.objects.create(name=f'Cat {unique_suffix}'),
+        measure_unit=MeasureUnit.objects.create(name=f'Unit {unique_suffix}'),
+        name=f'Product {unique_suffix}',
+        code=f'P{unique_suffix}',
+        minimum_sale_price=10,
+        maximum_sale_price=20,
+    )
+    return ProductStock.objects.create(
+        product=product,
+        warehouse=Warehouse.objects.create(
+            name=f'Warehouse {unique_suffix}', location='Location'),
+        batch=Batch.objects.create(name=f'Batch {unique_suffix}'),
+        stock=10,
+        available_stock=10,
+        minimum_stock=1,
+        maximum_stock=20,
+    )
+
+
+def token_of(moment):
+    """Return the sync token of a time."""
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class DeltaSyncApiTests(TestCase):
+    """Test API requests with updated_since."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def age(self, queryset):
+        """Move the rows of the queryset an hour into the past."""
+        queryset.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def test_full_sync(self):
+        """Test an empty updated_since lists everything with a token."""
+        categories = [
+            Category.objects.create(name=f'Cat {index}')
+            for index in range(2)
+        ]
+
+        res = self.client.get(CATEGORY_URL, {'updated_since': ''})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {row['id'] for row in res.data['rows']},
+            {category.id for category in categories})
+        self.assertEqual(res.data['deleted'], [])
+        self.assertTrue(res.data['sync_token'].endswith('Z'))
+
+    def test_delta_sync(self):
+        """Test only the rows saved or deleted since the token come back."""
+        unchanged = Category.objects.create(name='Sin cambios')
+        changed = Category.objects.create(name='Antes')
+        deleted = Category.objects.create(name='Eliminada')
+        self.age(Category.objects.all())
+        token = self.client.get(
+            CATEGORY_URL, {'updated_since': ''}).data['sync_token']
+
+        changed.name = 'Despues'
+        changed.save()
+        created = Category.objects.create(name='Nueva')
+        deleted_id = deleted.id
+        deleted.delete()
+        res = self.client.get(CATEGORY_URL, {'updated_since': token})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {row['id'] for row in res.data['rows']}, {changed.id, created.id})
+        self.assertEqual(res.data['deleted'], [deleted_id])
+        self.assertNotIn(
+            unchanged.id, [row['id'] for row in res.data['rows']])
+        self.assertGreater(res.data['sync_token'], token)
+
+    def test_tombstones_per_model(self):
+        """Test deletions are only reported for their own model."""
+        category = Category.objects.create(name='Eliminada')
+        category_id = category.id
+        category.delete()
+        DeletedRecord.objects.create(model='batch', object_id=99)
+
+        res = self.client.get(CATEGORY_URL, {
+            'updated_since': token_of(timezone.now() - timedelta(days=1))})
+
+        self.assertEqual(res.data['deleted'], [category_id])
+
+    def test_token_overlaps_running_requests(self):
+        """Test rows saved just before the read come again next time."""
+        self.age(Category.objects.all())
+        token = self.client.get(
+            CATEGORY_URL, {'updated_since': ''}).data['sync_token']
+        # Saved by a request that committed after the list was read.
+        late = Category.objects.create(name='Tardia')
+        Category.objects.filter(id=late.id).update(
+            updated_at=timezone.now() - timedelta(seconds=1))
+
+        res = self.client.get(CATEGORY_URL, {'updated_since': token})
+
+        self.assertEqual([row['id'] for row in res.data['rows']], [late.id])
+
+    def test_expired_token(self):
+        """Test a token older than the tombstones kept is rejected."""
+        res = self.client.get(CATEGORY_URL, {
+            'updated_since': token_of(timezone.now() - timedelta(days=365))})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stock_updates_are_synced(self):
+        """Test stock moves done with a single UPDATE bump updated_at."""
+        product_stock = create_product_stock()
+        create_product_stock()
+        self.age(ProductStock.objects.all())
+        token = self.client.get(
+            PRODUCT_STOCK_URL, {'updated_since': ''}).data['sync_token']
+
+        GuardedStockUpdateService(product_stock.id).increment(
+            stock=-2, available_stock=-2)
+        res = self.client.get(PRODUCT_STOCK_URL, {'updated_since': token})
+
+        self.assertEqual(
+            [row['id'] for row in res.data['rows']], [product_stock.id])
+
+    def test_invalid_token(self):
+        """Test an unreadable token is rejected."""
+        res = self.client.get(CATEGORY_URL, {'updated_since': 'ayer'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_without_updated_since(self):
+        """Test lists keep their shape without the parameter."""
+        Category.objects.create(name='Categoria')
+
+        res = self.client.get(CATEGORY_URL)
+
+        self.assertEqual(set(res.data), {'rows', 'total'})
+
+
+class PruneDeletedRecordsTests(TestCase):
+    """Test the pruning of the tombstones."""
+
+    def test_prune_deleted_records_command(self):
+        """Test only the tombstones past the retention are deleted."""
+        old = DeletedRecord.objects.create(model='category', object_id=1)
+        DeletedRecord.objects.filter(id=old.id).update(
+            deleted_at=timezone.now() - timedelta(days=365))
+        recent = DeletedRecord.objects.create(model='category', object_id=2)
+        out = StringIO()
+
+        call_command('prune_deleted_records', stdout=out)
+
+        self.assertEqual(list(DeletedRecord.objects.all()), [recent])
+        self.assertIn('depurados: 1', out.getvalue())
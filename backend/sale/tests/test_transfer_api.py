@@ -0,0 +1,162 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import (
+    Batch, Category, MeasureUnit, Product, ProductStock, Transfer, Warehouse,
+)
+import uuid
+
+TRANSFER_URL = reverse('sale:transfer-list')
+
+
+def create_user(**params):
+    """Create and return a sample user."""
+    unique_suffix = str(uuid.uuid4())[:4]
+    defaults = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'ci': f'1234567{unique_suffix}',
+        'phone': '12345678',
+        'address': 'Test Address',
+        'email': f't{unique_suffix}@test.com',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def create_warehouse():
+    unique_suffix = str(uuid.uuid4())[:8]
+    return Warehouse.objects.create(
+        name=f'Warehouse {unique_suffix}', location='Test location')
+
+
+def create_product_stock(warehouse, **params):
+    unique_suffix = str(uuid.uuid4())[:8]
+    defaults = {
+        'warehouse': warehouse,
+        'product': Product.objects.create(
+            name=f'Sample Product {unique_suffix}',
+            category=Category.objects.create(
+                name=f'Category {unique_suffix}'),
+            code=f'CODE-{unique_suffix}',
+            measure_unit=MeasureUnit.objects.create(name='Unidad'),
+            minimum_sale_price=10,
+            maximum_sale_price=100,
+        ),
+        'batch': Batch.objects.create(name=f'Batch {unique_suffix}'),
+        'stock': 50,
+        'reserved_stock': 10,
+        'available_stock': 40,
+        'minimum_stock': 5,
+        'maximum_stock': 100,
+    }
+    defaults.update(params)
+    return ProductStock.objects.create(**defaults)
+
+
+class PublicTransferApiTests(TestCase):
+    """Test API requests for unauthenticated users."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test that authentication is required for accessing the endpoint."""
+        res = self.client.get(TRANSFER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateTransferApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.source = create_warehouse()
+        self.destination = create_warehouse()
+
+    def test_create_transfer(self):
+        """Test creating a transfer moves the stock of every line."""
+        first_stock = create_product_stock(self.source)
+        second_stock = create_product_stock(self.source)
+        payload = {
+            'source_warehouse': self.source.id,
+            'destination_warehouse': self.destination.id,
+            'transfer_date': str(timezone.now().date()),
+            'transfer_items': [
+                {'product_stock': first_stock.id, 'quantity': 10},
+                {'product_stock': second_stock.id, 'quantity': 40},
+            ],
+        }
+
+        res = self.client.post(TRANSFER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        transfer = Transfer.objects.get(id=res.data['id'])
+        self.assertEqual(transfer.user, self.user)
+        self.assertEqual(transfer.transfer_items.count(), 2)
+        second_stock.refresh_from_db()
+        self.assertEqual(second_stock.available_stock, 0)
+        self.assertEqual(
+            ProductStock.objects.filter(
+                warehouse=self.destination).count(), 2)
+
+    def test_create_transfer_same_warehouse(self):
+        """Test a transfer to the same warehouse is rejected."""
+        product_stock = create_product_stock(self.source)
+        payload = {
+            'source_warehouse': self.source.id,
+            'destination_warehouse': self.source.id,
+            'transfer_date': str(timezone.now().date()),
+            'transfer_items': [
+                {'product_stock': product_stock.id, 'quantity': 1},
+            ],
+        }
+
+        res = self.client.post(TRANSFER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transfer.objects.exists())
+
+    def test_create_transfer_exceeds_available_stock(self):
+        """Test a transfer over the available stock is rolled back."""
+        product_stock = create_product_stock(self.source)
+        payload = {
+            'source_warehouse': self.source.id,
+            'destination_warehouse': self.destination.id,
+            'transfer_date': str(timezone.now().date()),
+            'transfer_items': [
+                {'product_stock': product_stock.id, 'quantity': 45},
+            ],
+        }
+
+        res = self.client.post(TRANSFER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data['detail'], 'La cantidad excede el stock disponible.')
+        self.assertFalse(Transfer.objects.exists())
+
+    def test_list_transfers(self):
+        """Test listing transfers with their items."""
+        product_stock = create_product_stock(self.source)
+        self.client.post(TRANSFER_URL, {
+            'source_warehouse': self.source.id,
+            'destination_warehouse': self.destination.id,
+            'transfer_date': str(timezone.now().date()),
+            'transfer_items': [
+                {'product_stock': product_stock.id, 'quantity': 5},
+            ],
+        }, format='json')
+
+        res = self.client.get(TRANSFER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total'], 1)
+        self.assertEqual(
+            len(res.data['rows'][0]['transfer_items']), 1)
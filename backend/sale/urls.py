@@ -17,6 +17,8 @@ router.register('product-stocks', views.ProductStockViewSet)
 router.register('suppliers', views.SupplierViewSet)
 router.register('entries', views.EntryViewSet)
 router.register('outputs', views.OutputViewSet)
+router.register('inventory-counts', views.InventoryCountViewSet)
+router.register('transfers', views.TransferViewSet)
 router.register('clients', views.ClientViewSet)
 router.register('product-channel-prices', views.ProductChannelPriceViewSet)
 router.register('selling-channels', views.SellingChannelViewSet)
@@ -44,6 +46,14 @@ urlpatterns = [
         'output-pdf/<int:id>/',
         views.OutputInvoicePdfView.as_view(),
         name='output-pdf'),
+    path(
+        'bootstrap/',
+        views.ReferenceDataView.as_view(),
+        name='bootstrap'),
+    path(
+        'balance-reconciliation/',
+        views.BalanceReconciliationView.as_view(),
+        name='balance-reconciliation'),
     path(
         'buy-report-pdf/',
         views.BuyReportPdfView.as_view(),
@@ -68,6 +78,14 @@ urlpatterns = [
         'sale-report-excel/',
         views.SaleReportExcelView.as_view(),
         name='sale-report-excel'),
+    path(
+        'aging-report/',
+        views.AgingReportView.as_view(),
+        name='aging-report'),
+    path(
+        'aging-report-excel/',
+        views.AgingReportExcelView.as_view(),
+        name='aging-report-excel'),
     path(
         'entry-report-excel/',
         views.EntryReportExcelView.as_view(),
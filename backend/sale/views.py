@@ -11,27 +11,41 @@ from django.views import View
 from django.http import HttpResponse, Http404
 from django.template.loader import render_to_string
 from weasyprint import HTML
-from django.db.models import Subquery, OuterRef, CharField, Q
+from django.db.models import Count, DecimalField, F, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Concat
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime
+from decimal import Decimal
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import NotFound
 from django_filters.rest_framework import DjangoFilterBackend
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
-from django.db.models import Prefetch
+from django.core.exceptions import ValidationError as DjangoValidationError
 
 from core.models import (
-    Agency, Batch, Category, Client, Entry, EntryItem, MeasureUnit,
-    Output, OutputItem, Payment, Product, ProductChannelPrice,
+    Agency, Batch, Category, Client, Entry, EntryItem, InventoryCount,
+    MeasureUnit, Output, OutputItem, Payment, Product, ProductChannelPrice,
     ProductStock, Purchase, PurchaseItem, Sale, SaleItem,
-    SellingChannel, Supplier, Warehouse,
+    SellingChannel, Supplier, Transfer, Warehouse,
 )
 from .serializers import (
     AgencySerializer,
     BatchSerializer,
+    BulkPaymentSerializer,
     CatalogProductSerializer,
     CategorySerializer,
     ClientSerializer,
     EntrySerializer,
     IncrementDamagedStockSerializer,
+    InventoryCountLineSerializer,
+    InventoryCountSerializer,
+    LowStockProductStockSerializer,
+    LowStockQuerySerializer,
     OutputSerializer,
     PaymentSerializer,
     ProductChannelPriceSerializer,
@@ -39,25 +53,167 @@ from .serializers import (
     ProductStockSerializer,
     PurchaseSerializer,
     SaleSerializer,
+    SaleSummarySerializer,
     SellingChannelLightSerializer,
     SellingChannelSerializer,
+    StockAllocationResultSerializer,
+    StockAllocationSerializer,
     SupplierSerializer,
+    TransferSerializer,
     WarehouseSerializer,
     MeasureUnitSerializer,
 )
+from sale.filters import DocumentSearchFilter
+from sale.mixins import (
+    DeltaSyncMixin, NormalizedResponseMixin, PrefetchPlanMixin,
+    SerializerProfilingMixin, SparseFieldsetMixin,
+)
+from sale.services.account_statement_service import AccountStatementService
+from sale.services.aging_report_service import AgingReportService
+from sale.services.balance_reconciliation_service import (
+    BalanceReconciliationService,
+)
+from sale.services.inventory_count_service import InventoryCountService
+from sale.services.low_stock_service import LowStockService
+from sale.services.reference_data_service import ReferenceDataService
+from sale.services.payment_prefetch_service import prefetch_payments
+from sale.services.stock_allocation_service import StockAllocationService
+from sale.services.stock_constraint_service import GuardedStockUpdateService
 
 
 class PersonalizedPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination returning `{'rows', 'total'}`.
+
+    Sending `cursor` (empty for the first page) switches to keyset
+    pagination on the queryset ordering: pages are fetched with a WHERE on
+    the last row seen instead of OFFSET and no COUNT(*) is run. The
+    response adds `next`, and `total` is only counted with
+    `with_total=true`; otherwise the last counted total is returned from
+    the cache, or null.
+    """
     default_limit = 10
     max_limit = 100
+    cursor_query_param = 'cursor'
+    total_query_param = 'with_total'
+    count_cache_timeout = 300
+    cursor_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (self.cursor_query_param not in request.query_params
+                or not all(isinstance(field, str)
+                           for field in queryset.query.order_by)):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.cursor_mode = True
+        self.request = request
+        self.limit = self.get_limit(request)
+        ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*ordering)
+        self.count = self.get_cached_count(queryset, request)
+
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            try:
+                values = json.loads(
+                    urlsafe_b64decode(cursor.encode()).decode())
+            except (ValueError, TypeError):
+                raise NotFound('El cursor no es válido.')
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise NotFound('El cursor no es válido.')
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(
+                    ordering, values))
+            except (ValueError, TypeError, DjangoValidationError):
+                # Well-formed, but with values the fields don't accept.
+                raise NotFound('El cursor no es válido.')
+
+        rows = list(queryset[:self.limit + 1])
+        self.next_cursor = None
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            self.next_cursor = self.encode_cursor(ordering, rows[-1])
+        return rows
+
+    def get_ordering(self, queryset):
+        """Queryset ordering with the primary key as the last tie-breaker."""
+        ordering = list(queryset.query.order_by) or ['-pk']
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering.append('-pk' if ordering[-1].startswith('-') else 'pk')
+        return ordering
+
+    def get_keyset_filter(self, ordering, values):
+        """Rows after `values` in `ordering`: (a, b) > (x, y) as ORs."""
+        keyset = Q()
+        for position, field in enumerate(ordering):
+            condition = Q(**{
+                previous.lstrip('-'): value
+                for previous, value in zip(
+                    ordering[:position], values[:position])
+            })
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition &= Q(**{
+                f'{field.lstrip("-")}__{lookup}': values[position]})
+            keyset |= condition
+        return keyset
+
+    def encode_cursor(self, ordering, row):
+        values = [self.get_row_value(row, field) for field in ordering]
+        return urlsafe_b64encode(json.dumps(
+            values, cls=DjangoJSONEncoder).encode()).decode()
+
+    def get_row_value(self, row, field):
+        """Value of an ordering field of a row, following `a__b` paths."""
+        value = row
+        for name in field.lstrip('-').split('__'):
+            if value is None:
+                break
+            value = getattr(value, name)
+        return value
+
+    def get_cached_count(self, queryset, request):
+        """Count only on request; the last count is cached per query."""
+        sql, params = queryset.query.sql_with_params()
+        key = 'pagination-count:' + hashlib.md5(
+            f'{sql}{params}'.encode()).hexdigest()
+        if request.query_params.get(self.total_query_param) == 'true':
+            count = queryset.count()
+            cache.set(key, count, self.count_cache_timeout)
+            return count
+        return cache.get(key)
 
     def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response({
+                'rows': data,
+                'next': self.next_cursor,
+                'total': self.count,
+            })
         return Response({
             'rows': data,
             'total': self.count
         })
 
 
+class AccountStatementMixin:
+    """Adds the `statement` action of a client or supplier."""
+    statement_party = None
+
+    @action(detail=True, methods=['get'], url_path='statement')
+    def statement(self, request, pk=None):
+        """
+        Chronological charges and payments of the party with their running
+        balance, paginated with `limit` and `offset`.
+        """
+        party = self.get_object()
+        limit = self.paginator.get_limit(request)
+        offset = self.paginator.get_offset(request)
+        rows, total = AccountStatementService(
+            self.statement_party, party.id).get_page(limit, offset)
+        self.paginator.count = total
+        return self.paginator.get_paginated_response(rows)
+
+
 class CatalogView(APIView):
     def get(self, request, *args, **kwargs):
         data = []
@@ -205,7 +361,9 @@ class CatalogView(APIView):
         return Response(CatalogProductSerializer(data, many=True).data)
 
 
-class AgencyViewSet(viewsets.ModelViewSet):
+class AgencyViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing agency APIs."""
     serializer_class = AgencySerializer
     queryset = Agency.objects.all()
@@ -236,7 +394,9 @@ class AgencyViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class WarehouseViewSet(viewsets.ModelViewSet):
+class WarehouseViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing warehouse APIs."""
     serializer_class = WarehouseSerializer
     queryset = Warehouse.objects.all()
@@ -258,7 +418,9 @@ class WarehouseViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing category APIs."""
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
@@ -280,7 +442,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class BatchViewSet(viewsets.ModelViewSet):
+class BatchViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing batch APIs."""
     serializer_class = BatchSerializer
     queryset = Batch.objects.all()
@@ -302,7 +466,9 @@ class BatchViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class MeasureUnitViewSet(viewsets.ModelViewSet):
+class MeasureUnitViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing measure unit APIs."""
     serializer_class = MeasureUnitSerializer
     queryset = MeasureUnit.objects.all()
@@ -324,7 +490,9 @@ class MeasureUnitViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing product APIs."""
     serializer_class = ProductSerializer
     queryset = Product.objects.all()
@@ -336,8 +504,7 @@ class ProductViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve products ordered by id."""
-        return self.queryset.order_by('-id').select_related(
-            'category', 'measure_unit')
+        return self.queryset.order_by('-id')
 
     def update(self, request, *args, **kwargs):
         """Custom update method to handle image deletion."""
@@ -364,7 +531,9 @@ class ProductViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class ProductStockViewSet(viewsets.ModelViewSet):
+class ProductStockViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing product stock APIs."""
     serializer_class = ProductStockSerializer
     queryset = ProductStock.objects.all()
@@ -376,12 +545,7 @@ class ProductStockViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve product stocks ordered by id."""
-        return self.queryset.order_by('-id').select_related(
-            'product',
-            'product__measure_unit',
-            'warehouse',
-            'batch',
-        )
+        return self.queryset.order_by('-id')
 
     @action(detail=True, methods=['post'], url_path='increment-damaged-stock')
     def increment_damaged_stock(self, request, pk=None):
@@ -394,12 +558,16 @@ class ProductStockViewSet(viewsets.ModelViewSet):
 
         if serializer.is_valid():
             quantity = serializer.validated_data['quantity']
-            product_stock.damaged_stock += quantity
-            product_stock.available_stock -= quantity
-            product_stock.save(
-                update_fields=[
-                    'damaged_stock',
-                    'available_stock'])
+            try:
+                GuardedStockUpdateService(product_stock.id, messages={
+                    'productstock_available_stock_non_negative': (
+                        f"La cantidad ({quantity}) no puede ser mayor "
+                        f"al stock disponible."),
+                }).increment(
+                    damaged_stock=quantity, available_stock=-quantity)
+            except DjangoValidationError as e:
+                return Response({'quantity': e.messages}, status=400)
+            product_stock.refresh_from_db(fields=['damaged_stock'])
 
             return Response({
                 'message': (
@@ -410,14 +578,65 @@ class ProductStockViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=400)
 
+    @action(detail=False, methods=['get'], url_path='low-stock')
+    def low_stock(self, request):
+        """List the product stocks below their minimum stock."""
+        queryset = LowStockService(
+            self.get_low_stock_warehouse(request)).get_queryset()
+        queryset = self.filter_queryset(queryset.order_by(
+            'warehouse_id', 'product_id', 'id').select_related(
+                'product',
+                'product__measure_unit',
+                'warehouse',
+                'batch',
+        ))
+
+        page = self.paginate_queryset(queryset)
+        serializer = LowStockProductStockSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='reorder-suggestions')
+    def reorder_suggestions(self, request):
+        """Suggested order quantities of the low stock grouped by supplier."""
+        return Response(LowStockService(
+            self.get_low_stock_warehouse(request),
+        ).get_reorder_suggestions())
+
+    def get_low_stock_warehouse(self, request):
+        """The validated `warehouse_id` filter of the low stock reports."""
+        params = LowStockQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data.get('warehouse_id')
+
+    @action(detail=False, methods=['post'], url_path='allocate')
+    def allocate(self, request):
+        """Split product quantities across the available product stocks."""
+        serializer = StockAllocationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            allocations = StockAllocationService(
+                serializer.validated_data['lines'],
+                agency=serializer.validated_data.get('agency'),
+                policy=serializer.validated_data['policy'],
+            ).allocate()
+        except DjangoValidationError as e:
+            return Response({'detail': e.messages[0]}, status=400)
+
+        return Response(
+            StockAllocationResultSerializer(allocations, many=True).data)
 
-class ClientViewSet(viewsets.ModelViewSet):
+
+class ClientViewSet(
+        AccountStatementMixin, SparseFieldsetMixin, PrefetchPlanMixin,
+        DeltaSyncMixin, SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing client APIs."""
+    statement_party = 'client'
     serializer_class = ClientSerializer
     queryset = Client.objects.all()
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'post', 'patch', 'put']
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [DocumentSearchFilter, DjangoFilterBackend]
     search_fields = ['id', 'name', 'phone', 'email', 'nit']
     filterset_fields = ['client_type']
     pagination_class = PersonalizedPagination
@@ -443,8 +662,11 @@ class ClientViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(
+        AccountStatementMixin, SparseFieldsetMixin, PrefetchPlanMixin,
+        DeltaSyncMixin, SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing supplier APIs."""
+    statement_party = 'supplier'
     serializer_class = SupplierSerializer
     queryset = Supplier.objects.all()
     permission_classes = [IsAuthenticated]
@@ -465,13 +687,15 @@ class SupplierViewSet(viewsets.ModelViewSet):
         return Response(list(queryset))
 
 
-class EntryViewSet(viewsets.ModelViewSet):
+class EntryViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, NormalizedResponseMixin,
+        DeltaSyncMixin, SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing entry APIs."""
     serializer_class = EntrySerializer
     queryset = Entry.objects.all()
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'post', 'patch', 'put']
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [DocumentSearchFilter]
     search_fields = [
         'id',
         'invoice_number',
@@ -486,27 +710,21 @@ class EntryViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Retrieve entries ordered by id."""
         user = self.request.user
+        queryset = self.queryset.order_by('-id')
         if user.is_superuser or user.is_staff:
-            return self.queryset.order_by('-id').select_related(
-                'purchase',
-                'purchase__buyer',
-                'purchase__supplier',
-            )
-        return self.queryset.filter(
-            warehouse_keeper=user).order_by('-id').select_related(
-            'purchase',
-            'purchase__buyer',
-            'purchase__supplier',
-        )
+            return queryset
+        return queryset.filter(warehouse_keeper=user)
 
 
-class OutputViewSet(viewsets.ModelViewSet):
+class OutputViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, NormalizedResponseMixin,
+        DeltaSyncMixin, SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing output APIs."""
     serializer_class = OutputSerializer
     queryset = Output.objects.all()
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'post', 'patch', 'put']
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [DocumentSearchFilter]
     search_fields = [
         'id',
         'warehouse_keeper__first_name',
@@ -520,21 +738,89 @@ class OutputViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Retrieve outputs ordered by id."""
         user = self.request.user
+        queryset = self.queryset.order_by('-id')
         if user.is_superuser or user.is_staff:
-            return self.queryset.order_by('-id').select_related(
-                'sale',
-                'sale__client',
-                'warehouse_keeper',
-            )
-        return self.queryset.filter(
-            warehouse_keeper=user).order_by('-id').select_related(
-            'sale',
-            'sale__client',
-            'warehouse_keeper',
+            return queryset
+        return queryset.filter(warehouse_keeper=user)
+
+
+class InventoryCountViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
+    """View for uploading, reviewing and applying inventory counts."""
+    serializer_class = InventoryCountSerializer
+    queryset = InventoryCount.objects.all()
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'post']
+    pagination_class = PersonalizedPagination
+
+    def perform_create(self, serializer):
+        serializer.save(counted_by=self.request.user)
+
+    def get_queryset(self):
+        """Retrieve inventory counts with their line totals."""
+        return self.queryset.order_by('-id').annotate(
+            line_count=Count('lines'),
+            variance_count=Count('lines', filter=~Q(lines__variance=0)),
         )
 
+    @action(detail=True, methods=['get'], url_path='lines')
+    def lines(self, request, pk=None):
+        """List the counted lines; `only_variances=true` hides matches."""
+        inventory_count = self.get_object()
+        queryset = inventory_count.lines.select_related(
+            'warehouse', 'product', 'batch').order_by('id')
+        if request.query_params.get('only_variances') == 'true':
+            queryset = queryset.exclude(variance=0)
+
+        page = self.paginate_queryset(queryset)
+        serializer = InventoryCountLineSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'], url_path='apply')
+    def apply(self, request, pk=None):
+        """Post the adjustments of a reviewed inventory count."""
+        inventory_count = self.get_object()
+        try:
+            InventoryCountService(inventory_count).apply(request.user)
+        except DjangoValidationError as e:
+            return Response(
+                {'detail': e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(self.get_queryset().get(
+            id=inventory_count.id))
+        return Response(serializer.data)
+
 
-class ProductChannelPriceViewSet(viewsets.ModelViewSet):
+class TransferViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
+    """View for managing transfers between warehouses."""
+    serializer_class = TransferSerializer
+    queryset = Transfer.objects.all()
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'post']
+    filter_backends = [filters.SearchFilter]
+    search_fields = [
+        'id',
+        'source_warehouse__name',
+        'destination_warehouse__name',
+        'user__first_name',
+        'user__last_name']
+    pagination_class = PersonalizedPagination
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def get_queryset(self):
+        """Retrieve transfers ordered by id."""
+        return self.queryset.order_by('-id')
+
+
+class ProductChannelPriceViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing product channel price APIs."""
     serializer_class = ProductChannelPriceSerializer
     queryset = ProductChannelPrice.objects.all()
@@ -546,13 +832,12 @@ class ProductChannelPriceViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve product channel prices ordered by id."""
-        return self.queryset.order_by('-id').select_related(
-            'product',
-            'selling_channel'
-        )
+        return self.queryset.order_by('-id')
 
 
-class SellingChannelViewSet(viewsets.ModelViewSet):
+class SellingChannelViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing selling channel APIs."""
     serializer_class = SellingChannelSerializer
     queryset = SellingChannel.objects.all()
@@ -564,15 +849,7 @@ class SellingChannelViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve selling channels ordered by id."""
-        queryset = self.queryset.order_by('-id')
-        if self.action == 'all_selling_channels':
-            return queryset
-        return queryset.prefetch_related(
-            Prefetch(
-                'product_channel_price',
-                queryset=ProductChannelPrice.objects.select_related('product')
-            )
-        )
+        return self.queryset.order_by('-id')
 
     @action(
         detail=False,
@@ -586,13 +863,15 @@ class SellingChannelViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class PurchaseViewSet(viewsets.ModelViewSet):
+class PurchaseViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, NormalizedResponseMixin,
+        DeltaSyncMixin, SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing purchase APIs."""
     serializer_class = PurchaseSerializer
     queryset = Purchase.objects.all()
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'post', 'patch', 'put']
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [DocumentSearchFilter, DjangoFilterBackend]
     search_fields = [
         'id',
         'buyer__first_name',
@@ -614,23 +893,31 @@ class PurchaseViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(
                 status=status).order_by('-id')
 
-        queryset = queryset.prefetch_related(
-            Prefetch(
-                'purchase_items',
-                queryset=PurchaseItem.objects.select_related('product'),
-            )
-        ).select_related('buyer', 'supplier')
-
         return queryset.order_by('-id')
 
+    def list(self, request, *args, **kwargs):
+        """List purchases, batching payments in a single query per page."""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        purchases = page if page is not None else queryset
+        if self.is_field_requested('payments'):
+            purchases = prefetch_payments(purchases, 'compra')
+
+        serializer = self.get_serializer(purchases, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
 
-class SaleViewSet(viewsets.ModelViewSet):
+class SaleViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, NormalizedResponseMixin,
+        DeltaSyncMixin, SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managin Sale APIs."""
     serializer_class = SaleSerializer
     queryset = Sale.objects.all()
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'post', 'patch', 'put']
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [DocumentSearchFilter, DjangoFilterBackend]
     search_fields = [
         'id',
         'client__name',
@@ -692,32 +979,42 @@ class SaleViewSet(viewsets.ModelViewSet):
         if not user.is_superuser:
             queryset = queryset.filter(seller=user)
 
-        queryset = queryset.prefetch_related(
-            Prefetch(
-                'sale_items',
-                queryset=SaleItem.objects.select_related(
-                    'product_stock__batch',
-                    'product_stock__product__measure_unit',
-                ),
-            ),
-            Prefetch(
-                'outputs',
-                queryset=Output.objects.select_related(
-                    'warehouse_keeper', 'client',
-                ).prefetch_related(
-                    Prefetch(
-                        'output_items',
-                        queryset=OutputItem.objects.select_related(
-                            'product_stock__batch',
-                            'product_stock__product__measure_unit',
-                        ),
-                    )
-                ),
-            ),
-        ).select_related('client', 'selling_channel', 'seller')
+        if self.is_summary_view():
+            queryset = self.annotate_summary(queryset)
 
         return queryset.order_by('-sale_anticipation', '-id')
 
+    def is_summary_view(self):
+        return (
+            self.action == 'list'
+            and self.request.query_params.get('view') == 'summary'
+        )
+
+    def annotate_summary(self, queryset):
+        """
+        Names, item count and dispatch totals of every sale computed in
+        the list query itself, for the summary representation.
+        """
+        quantity = DecimalField(max_digits=12, decimal_places=2)
+        return queryset.annotate(
+            client_name=F('client__name'),
+            seller_name=Concat(
+                'seller__first_name', Value(' '), 'seller__last_name'),
+            selling_channel_name=F('selling_channel__name'),
+            item_count=Count('sale_items'),
+            quantity_total=Coalesce(
+                Sum('sale_items__quantity'), Value(0),
+                output_field=quantity),
+            dispatched_total=Coalesce(
+                Sum('sale_items__dispatched_stock'), Value(0),
+                output_field=quantity),
+        )
+
+    def get_serializer_class(self):
+        if self.is_summary_view():
+            return SaleSummarySerializer
+        return super().get_serializer_class()
+
     @action(detail=False, methods=['get'])
     def choices(self, request):
         """Get sale status choices."""
@@ -739,16 +1036,9 @@ class SaleViewSet(viewsets.ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
         sales = page if page is not None else queryset
-
-        payments_by_sale = {}
-        for payment in Payment.objects.filter(
-            transaction_id__in=[sale.id for sale in sales],
-            transaction_type='venta',
-        ):
-            payments_by_sale.setdefault(
-                payment.transaction_id, []).append(payment)
-        for sale in sales:
-            sale.prefetched_payments = payments_by_sale.get(sale.id, [])
+        # The summary only shows the payment summary stored on the sale.
+        if self.is_field_requested('payments'):
+            sales = prefetch_payments(sales, 'venta')
 
         serializer = self.get_serializer(sales, many=True)
         if page is not None:
@@ -756,7 +1046,9 @@ class SaleViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(
+        SparseFieldsetMixin, PrefetchPlanMixin, DeltaSyncMixin,
+        SerializerProfilingMixin, viewsets.ModelViewSet):
     """View for managing Payment APIs."""
     serializer_class = PaymentSerializer
     queryset = Payment.objects.all()
@@ -771,6 +1063,69 @@ class PaymentViewSet(viewsets.ModelViewSet):
         """Retrieve payments ordered by id."""
         return self.queryset.order_by('-id')
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Apply many payments to sales and purchases at once."""
+        serializer = BulkPaymentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payments = serializer.save()
+        return Response(
+            PaymentSerializer(payments, many=True).data,
+            status=status.HTTP_201_CREATED)
+
+
+class ReferenceDataView(APIView):
+    """
+    Every reference list and choice table the frontend loads on start in
+    one cached payload. The ETag is the version of the cached data, a
+    matching If-None-Match is answered with 304 without building it.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        service = ReferenceDataService()
+        version = service.get_version()
+        etag = f'"{version}"'
+        if self.etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            _, data = service.get(version)
+            response = Response(data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def etag_matches(self, request, etag):
+        """
+        Weak comparison of `etag` with the If-None-Match list, so the
+        ETags weakened by a compressing proxy still match.
+        """
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        return '*' in etags or etag in {
+            tag[2:] if tag.startswith('W/') else tag for tag in etags}
+
+
+class BalanceReconciliationView(APIView):
+    """
+    Report the sales and purchases whose balance does not match their
+    payments (GET, the count and the first rows of each type) and repair
+    them (POST). Staff only.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        if not (request.user.is_superuser or request.user.is_staff):
+            self.permission_denied(
+                request, message='No tiene permiso para conciliar saldos.')
+
+    def get(self, request):
+        return Response(BalanceReconciliationService().report())
+
+    def post(self, request):
+        repaired = BalanceReconciliationService().repair()
+        return Response({'repaired': repaired})
+
 
 class InvoicePdfView(View):
     """Generate Proforma PDF."""
@@ -893,16 +1248,13 @@ class SellReportPdfView(View):
         end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
         today = datetime.now().date()
         try:
-            payments = Payment.objects.filter(
-                transaction_id=OuterRef('sale__id'),
-                transaction_type='venta').values(
-                    'payment_method'
-                )[:1]
             sale_items = SaleItem.objects.filter(
                 sale__sale_date__range=(start_date, end_date)
-            ).select_related("sale").order_by("sale__id").annotate(
-                payment_method=Subquery(payments, output_field=CharField())
-            ).filter(Q(sale__status='realizado') | Q(sale__status='terminado'))
+            ).select_related(
+                "sale__agency", "sale__client", "sale__seller",
+                "sale__selling_channel", "product_stock__product",
+            ).order_by("sale__id").filter(
+                Q(sale__status='realizado') | Q(sale__status='terminado'))
         except SaleItem.DoesNotExist:
             raise Http404("Ventas no encontradas.")
 
@@ -1176,16 +1528,13 @@ class SaleReportExcelView(APIView):
         start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
         end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
         try:
-            payments = Payment.objects.filter(
-                transaction_id=OuterRef('sale__id'),
-                transaction_type='venta').values(
-                    'payment_method'
-                )[:1]
             sale_items = SaleItem.objects.filter(
                 sale__sale_date__range=(start_date, end_date)
-            ).select_related("sale").order_by("sale__id").annotate(
-                payment_method=Subquery(payments, output_field=CharField())
-            ).filter(Q(sale__status='realizado') | Q(sale__status='terminado'))
+            ).select_related(
+                "sale__agency", "sale__client", "sale__seller",
+                "sale__selling_channel", "product_stock__product",
+            ).order_by("sale__id").filter(
+                Q(sale__status='realizado') | Q(sale__status='terminado'))
         except SaleItem.DoesNotExist:
             raise Http404("Ventas no encontradas.")
         wb = Workbook()
@@ -1272,7 +1621,7 @@ class SaleReportExcelView(APIView):
                 sale_item.unit_price,
                 sale_item.sub_total_price,
                 sale_item.total_price,
-                sale_item.payment_method,
+                ", ".join(sale_item.sale.get_payment_methods()),
                 sale_item.status,
             ])
 
@@ -1290,6 +1639,138 @@ class SaleReportExcelView(APIView):
         return response
 
 
+AGING_REPORTS = {
+    'cobrar': ('get_receivables', 'CUENTAS POR COBRAR', 'CLIENTE'),
+    'pagar': ('get_payables', 'CUENTAS POR PAGAR', 'PROVEEDOR'),
+}
+AGING_FIELDS = ['current', 'days_31_60', 'days_61_90', 'over_90', 'total']
+
+
+def get_aging_report(request):
+    """Return the aging report kind, date and rows of the request."""
+    kind = request.GET.get("type", "cobrar")
+    if kind not in AGING_REPORTS:
+        raise DjangoValidationError(
+            "El tipo de reporte debe ser cobrar o pagar.")
+    as_of_str = request.GET.get("as_of")
+    try:
+        as_of = (datetime.strptime(as_of_str, "%Y-%m-%d").date()
+                 if as_of_str else datetime.now().date())
+    except ValueError:
+        raise DjangoValidationError(
+            "La fecha debe tener el formato AAAA-MM-DD.")
+    method = AGING_REPORTS[kind][0]
+    return kind, as_of, getattr(AgingReportService(as_of), method)()
+
+
+class AgingReportView(APIView):
+    """Aging of receivables (type=cobrar) or payables (type=pagar)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            kind, as_of, rows = get_aging_report(request)
+        except DjangoValidationError as e:
+            return Response(
+                {'detail': e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST)
+        totals = {
+            field: sum((row[field] for row in rows), Decimal('0'))
+            for field in AGING_FIELDS
+        }
+        return Response({
+            'type': kind,
+            'as_of': as_of,
+            'rows': rows,
+            'totals': totals,
+        })
+
+
+class AgingReportExcelView(APIView):
+    """Generate Aging Excel Report."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        header_font = Font(
+            bold=True,
+            color="FFFFFF"
+        )
+
+        header_fill = PatternFill(
+            start_color="1F4E78",
+            end_color="1F4E78",
+            fill_type="solid"
+        )
+
+        header_alignment = Alignment(
+            horizontal="center",
+            vertical="center"
+        )
+        try:
+            kind, as_of, rows = get_aging_report(request)
+        except DjangoValidationError as e:
+            return Response(
+                {'detail': e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST)
+        _, title, party = AGING_REPORTS[kind]
+        wb = Workbook()
+        ws = wb.active
+        as_of_formatted = as_of.strftime("%d-%m-%y")
+        ws.title = f"{title.title()} {as_of_formatted}"[:31]
+        ws.append([f"{title} AL {as_of_formatted}"])
+        headers = ([party,
+                    "0 - 30 DIAS",
+                    "31 - 60 DIAS",
+                    "61 - 90 DIAS",
+                    "MAS DE 90 DIAS",
+                    "TOTAL",
+                    ])
+        # Unir todas las celdas de la fila 1 (título) y centrarlo
+        num_columns = len(headers)
+        ws.merge_cells(f'A1:{chr(64 + num_columns)}1')
+        title_cell = ws.cell(row=1, column=1)
+        title_cell.alignment = Alignment(
+            horizontal="center", vertical="center")
+        title_cell.font = Font(bold=True, size=14)
+        ws.append(headers)
+        for col_num in range(1, len(headers) + 1):
+            cell = ws.cell(row=2, column=col_num)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+        column_widths = [
+            30,  # CLIENTE / PROVEEDOR
+            18,  # 0 - 30 DIAS
+            18,  # 31 - 60 DIAS
+            18,  # 61 - 90 DIAS
+            18,  # MAS DE 90 DIAS
+            18,  # TOTAL
+        ]
+        for i, width in enumerate(column_widths, start=1):
+            ws.column_dimensions[chr(64 + i)].width = width
+
+        for row in rows:
+            ws.append([row['party_name']] + [
+                row[field] for field in AGING_FIELDS])
+        ws.append(["TOTAL"] + [
+            sum((row[field] for row in rows), Decimal('0'))
+            for field in AGING_FIELDS
+        ])
+        ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
+
+        response = HttpResponse(
+            content_type=(
+                'application/vnd.openxmlformats-officedocument'
+                '.spreadsheetml.sheet'
+            ))
+        response['Content-Disposition'] = (
+            f'inline; filename="antiguedad_{kind}_{as_of}.xlsx"'
+        )
+
+        wb.save(response)
+        return response
+
+
 class EntryReportExcelView(APIView):
     """Generate Excel Report."""
 